@@ -1,8 +1,38 @@
 from __future__ import annotations
 
+import argparse
+import csv
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Dict, List
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Built-in categories live in DATASETS_DIR: a manifest.json naming each
+# category's prompt and data file, plus the files themselves. Only the manifest
+# is read at startup; a dataset's items are loaded the first time a round is
+# drawn from it.
+#
+# Data files are either
+#   - .csv (header with `title,rating`) or .jsonl ({"title": ..., "rating": ...}),
+#     parsed into arrays on first use - fine for small and hand-edited sets;
+#   - .bin, the compact format written by `python -m app.datasets build`, which
+#     is memory-mapped as is (ratings, title offsets and UTF-8 titles as flat
+#     arrays), so even very large sets cost no parsing and little resident memory.
+DATASETS_DIR = Path(os.getenv("DATASETS_DIR", str(Path(__file__).with_name("data"))))
+MANIFEST_NAME = "manifest.json"
+
+_BIN_MAGIC = b"EGDSET01"
+# magic, item count, rating scale, size of the titles blob
+_BIN_HEADER = struct.Struct("<8sIIQ")
 
 
 @dataclass(frozen=True)
@@ -11,26 +41,224 @@ class DatasetItem:
     rating: Decimal
 
 
-DATASETS: Dict[str, Dict[str, object]] = {
-    "movies": {
-        "prompt": "Find the lowest-rated movie.",
-        "items": [
-            DatasetItem("The Room (2003)", Decimal("3.7")),
-            DatasetItem("Batman & Robin (1997)", Decimal("3.8")),
-            DatasetItem("Cats (2019)", Decimal("2.8")),
-            DatasetItem("Battlefield Earth (2000)", Decimal("2.5")),
-            DatasetItem("Jack and Jill (2011)", Decimal("3.1")),
-            DatasetItem("Movie 43 (2013)", Decimal("3.0")),
-            DatasetItem("The Last Airbender (2010)", Decimal("4.0")),
-            DatasetItem("Gigli (2003)", Decimal("2.6")),
-            DatasetItem("Wild Wild West (1999)", Decimal("4.3")),
-            DatasetItem("Twilight (2008)", Decimal("5.3")),
-            DatasetItem("Morbius (2022)", Decimal("5.2")),
-        ],
+class _Columns:
+    """
+    Items sorted by rating: ratings as integers scaled by `scale`, titles as
+    one UTF-8 blob sliced by `offsets` (count + 1 entries).
+    """
+
+    def __init__(self, ratings: Sequence[int], offsets: Sequence[int], titles: bytes | memoryview, scale: int):
+        self.ratings = ratings
+        self.offsets = offsets
+        self.titles = titles
+        self.scale = scale
+
+    def __len__(self) -> int:
+        return len(self.ratings)
+
+    def item(self, i: int) -> DatasetItem:
+        title = bytes(self.titles[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+        return DatasetItem(title, Decimal(self.ratings[i]).scaleb(-(len(str(self.scale)) - 1)))
+
+
+def _rating_scale(ratings: Iterable[Decimal]) -> int:
+    """Smallest power of ten that makes every rating an integer."""
+    places = max((max(0, -r.as_tuple().exponent) for r in ratings), default=0)
+    return 10 ** places
+
+
+def _columns_from_items(items: List[Tuple[str, Decimal]]) -> _Columns:
+    items = sorted(items, key=lambda it: it[1])
+    scale = _rating_scale(r for _, r in items)
+
+    ratings = array("q", (int(r * scale) for _, r in items))
+    offsets = array("Q", [0])
+    blob = bytearray()
+    for title, _ in items:
+        blob += title.encode("utf-8")
+        offsets.append(len(blob))
+    return _Columns(ratings, offsets, bytes(blob), scale)
+
+
+def read_source(path: Path) -> List[Tuple[str, Decimal]]:
+    """(title, rating) pairs from a .csv or .jsonl file."""
+    items: List[Tuple[str, Decimal]] = []
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.suffix == ".csv":
+            for row in csv.DictReader(f):
+                items.append((row["title"].strip(), Decimal(row["rating"].strip())))
+        elif path.suffix == ".jsonl":
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    items.append((str(row["title"]).strip(), Decimal(str(row["rating"]))))
+        else:
+            raise ValueError(f"Unsupported dataset file: {path.name}")
+    return items
+
+
+def write_binary(path: Path, items: List[Tuple[str, Decimal]]) -> int:
+    """Write items in the memory-mappable format; returns the item count."""
+    cols = _columns_from_items(items)
+    ratings = array("i", cols.ratings)              # int32 on disk
+    offsets = array("Q", cols.offsets)
+    if sys.byteorder != "little":
+        ratings.byteswap()
+        offsets.byteswap()
+
+    with open(path, "wb") as f:
+        f.write(_BIN_HEADER.pack(_BIN_MAGIC, len(ratings), cols.scale, len(cols.titles)))
+        f.write(ratings.tobytes())
+        f.write(b"\0" * (-f.tell() % 8))           # keep offsets 8-byte aligned
+        f.write(offsets.tobytes())
+        f.write(cols.titles)
+    return len(ratings)
+
+
+def _map_binary(path: Path) -> _Columns:
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    magic, count, scale, titles_size = _BIN_HEADER.unpack_from(mm, 0)
+    if magic != _BIN_MAGIC:
+        raise ValueError(f"{path.name} is not a dataset file")
+
+    view = memoryview(mm)
+    pos = _BIN_HEADER.size
+    ratings_view = view[pos:pos + 4 * count]
+    pos += 4 * count
+    pos += -pos % 8
+    offsets_view = view[pos:pos + 8 * (count + 1)]
+    pos += 8 * (count + 1)
+    titles = view[pos:pos + titles_size]
+
+    if sys.byteorder == "little":
+        ratings: Sequence[int] = ratings_view.cast("i")
+        offsets: Sequence[int] = offsets_view.cast("Q")
+    else:
+        ratings = array("i", ratings_view.tobytes())
+        ratings.byteswap()
+        offsets = array("Q", offsets_view.tobytes())
+        offsets.byteswap()
+    return _Columns(ratings, offsets, titles, scale)
+
+
+class Dataset:
+    """One category. Items are loaded (or mapped) on first use, then kept."""
+
+    def __init__(self, name: str, prompt: str, path: Path, count: int):
+        self.name = name
+        self.prompt = prompt
+        self.path = path
+        self.count = count
+        self._cols: Optional[_Columns] = None
+        self._lock = threading.Lock()
+
+    def _columns(self) -> _Columns:
+        if self._cols is None:
+            with self._lock:
+                if self._cols is None:
+                    if self.path.suffix == ".bin":
+                        self._cols = _map_binary(self.path)
+                    else:
+                        self._cols = _columns_from_items(read_source(self.path))
+        return self._cols
+
+    def sample(self, k: int, difficulty: Optional[float] = None, rng: random.Random | None = None) -> List[DatasetItem]:
+        """
+        `k` distinct items with a single lowest-rated one: the lowest pick is
+        always rated strictly below the other k-1.
+
+        Without `difficulty` the lowest pick is the lowest of a uniform draw
+        and the rest are drawn uniformly from the items rated above it. With
+        it (0..1), they come from a random window of neighbouring ratings that
+        narrows from the whole set (0) to exactly `k` items (1), so the
+        lowest-rated item gets harder to spot. The window starts at an item
+        rated strictly below the next one, and that item is picked.
+        """
+        cols = self._columns()
+        ratings = cols.ratings
+        rng = rng or random
+        n = len(cols)
+        if n < k:
+            raise ValueError(f"Dataset {self.name} has fewer than {k} items")
+
+        if difficulty is None:
+            low = min(rng.sample(range(n), k))
+            # At least k-1 items must be rated above it: below the (k-1)-th highest.
+            top = ratings[n - k + 1]
+            if ratings[low] >= top:
+                low = bisect_left(ratings, top) - 1
+            end = n
+        else:
+            window = max(k, round(n - (n - k) * min(max(difficulty, 0.0), 1.0)))
+            # Last item of a random item's tie group; if that group runs past
+            # the last window start, the item just before the group.
+            low = bisect_right(ratings, ratings[rng.randrange(n - window + 1)]) - 1
+            if low > n - window:
+                low = bisect_left(ratings, ratings[n - window + 1]) - 1
+            end = low + window
+        if low < 0:
+            raise ValueError(f"Dataset {self.name} has no {k} items with a single lowest rating")
+
+        picked = [low] + rng.sample(range(bisect_right(ratings, ratings[low]), end), k - 1)
+        rng.shuffle(picked)
+        return [cols.item(i) for i in picked]
+
+
+def _load_manifest(directory: Path) -> Dict[str, Dataset]:
+    path = directory / MANIFEST_NAME
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    return {
+        name.lower(): Dataset(name.lower(), entry["prompt"], directory / entry["file"], int(entry["count"]))
+        for name, entry in manifest.get("categories", {}).items()
     }
-}
+
+
+DATASETS: Dict[str, Dataset] = _load_manifest(DATASETS_DIR)
+
+
+def get_dataset(name: str) -> Optional[Dataset]:
+    return DATASETS.get(name.strip().lower())
 
 
 def list_categories() -> List[str]:
     return sorted(DATASETS.keys())
 
+
+def build(source: Path, name: str, prompt: str, directory: Path = DATASETS_DIR) -> int:
+    """Convert a .csv/.jsonl source into `<name>.bin` and register it in the manifest."""
+    directory.mkdir(parents=True, exist_ok=True)
+    count = write_binary(directory / f"{name}.bin", read_source(source))
+
+    manifest_path = directory / MANIFEST_NAME
+    manifest = {"categories": {}}
+    if manifest_path.exists():
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    manifest.setdefault("categories", {})[name] = {"prompt": prompt, "file": f"{name}.bin", "count": count}
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+        f.write("\n")
+    return count
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.datasets", description="Manage built-in categories.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    b = sub.add_parser("build", help="convert a .csv/.jsonl file into a memory-mapped dataset")
+    b.add_argument("source", type=Path)
+    b.add_argument("--name", required=True)
+    b.add_argument("--prompt", required=True)
+    b.add_argument("--dir", type=Path, default=DATASETS_DIR)
+    args = parser.parse_args(argv)
+
+    count = build(args.source, args.name.strip().lower(), args.prompt, args.dir)
+    print(f"{args.name}: {count} items -> {args.dir / (args.name + '.bin')}")
+
+
+if __name__ == "__main__":
+    main()
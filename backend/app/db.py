@@ -1,12 +1,25 @@
 from __future__ import annotations
 
+import asyncio
+import logging
 import os
 import time
-from contextlib import contextmanager
+from contextlib import AsyncExitStack, asynccontextmanager, contextmanager
+from typing import Awaitable, Callable, Dict, Optional
 
-from psycopg_pool import ConnectionPool
+from psycopg import AsyncConnection, AsyncCursor
+from psycopg_pool import AsyncConnectionPool, ConnectionPool, PoolTimeout
+
+from .metrics import DB_POOL_WAIT
+from .tracing import SQL_TRACE, request_stats
+
+logger = logging.getLogger(__name__)
 
 _pool: ConnectionPool | None = None
+_async_pool: AsyncConnectionPool | None = None
+# background task opening the async pool's first connections, and whether it finished
+_async_fill: asyncio.Task | None = None
+_async_ready = False
 
 
 def get_database_url() -> str:
@@ -16,13 +29,119 @@ def get_database_url() -> str:
     return url
 
 
+def get_direct_database_url() -> str:
+    """
+    Connection string for session-level work (LISTEN, advisory locks). With
+    DATABASE_URL pointing at PgBouncer in transaction mode, set
+    DATABASE_DIRECT_URL to Postgres itself.
+    """
+    return os.getenv("DATABASE_DIRECT_URL") or get_database_url()
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, str(default)))
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, str(default)))
+
+
+# DB_PGBOUNCER=1: DATABASE_URL goes through a transaction-pooling PgBouncer, so
+# no session state may outlive a transaction (server-side prepared statements
+# included). Session-level work uses get_direct_database_url().
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER", "0").lower() in ("1", "true", "yes")
+
+
+def web_concurrency() -> int:
+    """API worker processes sharing this container's connection budget (uvicorn reads the same variable)."""
+    return max(1, _env_int("WEB_CONCURRENCY", 1))
+
+
+# Direct connections each worker opens outside its pool: the LISTEN connection
+# (realtime.py) and the retention job's advisory lock (retention.py).
+SESSION_CONNECTIONS = 2
+
+
+def pool_kwargs() -> dict:
+    """
+    Pool sizing shared by the sync and async pools (DB_POOL_* environment variables).
+
+    With DB_CONNECTION_BUDGET, the connections one container may open are
+    split across its WEB_CONCURRENCY workers, less each worker's
+    SESSION_CONNECTIONS. An explicit DB_POOL_MAX_SIZE still caps the share.
+    """
+    min_size = _env_int("DB_POOL_MIN_SIZE", 1)
+    max_size = _env_int("DB_POOL_MAX_SIZE", 10)
+    budget = os.getenv("DB_CONNECTION_BUDGET")
+    if budget:
+        share = int(budget) // web_concurrency() - SESSION_CONNECTIONS
+        if share < 1:
+            raise RuntimeError(  # noqa: TRY003
+                f"DB_CONNECTION_BUDGET={budget} leaves no pool connections for {web_concurrency()} workers"
+            )
+        max_size = min(max_size, share) if os.getenv("DB_POOL_MAX_SIZE") else share
+        min_size = min(min_size, max_size)
+    return {
+        "min_size": min_size,
+        "max_size": max_size,
+        # seconds a request may wait for a free connection before failing
+        "timeout": _env_float("DB_POOL_TIMEOUT", 30.0),
+        # seconds an idle connection above min_size is kept open
+        "max_idle": _env_float("DB_POOL_MAX_IDLE", 600.0),
+    }
+
+
+def connection_kwargs() -> dict:
+    """psycopg.connect() arguments for pooled connections."""
+    # prepare_threshold=None: never prepare server-side, PgBouncer may hand the
+    # next transaction to another backend.
+    return {"prepare_threshold": None} if DB_PGBOUNCER else {}
+
+
+class StatsCursor(AsyncCursor):
+    """
+    Cursor of the async pool. Counts statements towards the current request's
+    metrics and, with SQL_TRACE on, records each one's duration and row count.
+    """
+
+    async def execute(self, query, params=None, **kwargs):
+        stats = request_stats.get()
+        if stats is None:
+            return await super().execute(query, params, **kwargs)
+        stats.queries += 1
+        if not SQL_TRACE:
+            return await super().execute(query, params, **kwargs)
+        start = time.perf_counter()
+        try:
+            return await super().execute(query, params, **kwargs)
+        finally:
+            took = time.perf_counter() - start
+            stats.db_seconds += took
+            stats.statements.append((query, took, self.rowcount))
+
+    async def executemany(self, query, params_seq, **kwargs):
+        stats = request_stats.get()
+        if stats is None:
+            return await super().executemany(query, params_seq, **kwargs)
+        stats.queries += 1
+        if not SQL_TRACE:
+            return await super().executemany(query, params_seq, **kwargs)
+        start = time.perf_counter()
+        try:
+            return await super().executemany(query, params_seq, **kwargs)
+        finally:
+            took = time.perf_counter() - start
+            stats.db_seconds += took
+            stats.statements.append((query, took, self.rowcount))
+
+
 def init_pool() -> ConnectionPool:
     global _pool
     if _pool is not None:
         return _pool
 
     url = get_database_url()
-    pool = ConnectionPool(conninfo=url, min_size=1, max_size=10, open=False)
+    pool = ConnectionPool(conninfo=url, open=False, kwargs=connection_kwargs(), **pool_kwargs())
 
     last_err: Exception | None = None
     for _ in range(30):
@@ -49,7 +168,110 @@ def pool() -> ConnectionPool:
 
 @contextmanager
 def db_conn():
+    """Blocking connection, for scripts and worker threads outside the event loop."""
     p = pool()
     with p.connection() as conn:
         yield conn
 
+
+async def start_async_pool(
+    configure: Optional[Callable[[AsyncConnection], Awaitable[None]]] = None,
+) -> AsyncConnectionPool:
+    """
+    Open the async pool without waiting for the database. Connections are
+    made in the background, retried with backoff; `async_pool_ready()` turns
+    true once `DB_POOL_MIN_SIZE` of them are open. `configure` runs on every
+    new connection (e.g. to prepare statements).
+    """
+    global _async_pool, _async_fill
+    if _async_pool is not None:
+        return _async_pool
+
+    pool = AsyncConnectionPool(
+        conninfo=get_database_url(),
+        open=False,
+        configure=configure,
+        kwargs={**connection_kwargs(), "cursor_factory": StatsCursor},
+        **pool_kwargs(),
+    )
+    await pool.open(wait=False)
+    _async_pool = pool
+    _async_fill = asyncio.get_running_loop().create_task(_fill_async_pool(pool))
+    return pool
+
+
+async def _fill_async_pool(pool: AsyncConnectionPool) -> None:
+    """Hold min_size connections at once, so all of them are open (and configured) before reporting ready."""
+    global _async_ready
+    delay = 1.0
+    while True:
+        try:
+            async with AsyncExitStack() as stack:
+                for _ in range(max(pool.min_size, 1)):
+                    await stack.enter_async_context(pool.connection(timeout=delay))
+            _async_ready = True
+            logger.info("database pool ready (%d connections)", pool.min_size)
+            return
+        except PoolTimeout:
+            # Waiting clients make the pool keep reconnecting; just wait longer each time.
+            logger.warning("database not ready, waiting up to %.0fs more", min(delay * 2, 30.0))
+        except Exception:
+            # Anything else (bad credentials, a failing warm-up) would end the
+            # task and leave readiness false for good: log it and try again.
+            logger.exception("database pool: filling failed, retrying in %.0fs", delay)
+            await asyncio.sleep(delay)
+        delay = min(delay * 2, 30.0)
+
+
+def async_pool_ready() -> bool:
+    """True once the async pool has opened its minimum connections."""
+    return _async_ready
+
+
+async def init_async_pool(timeout: float = 30.0) -> AsyncConnectionPool:
+    """Open the async pool and wait until it is ready (for scripts; the API starts without waiting)."""
+    pool = await start_async_pool()
+    if _async_fill is not None and not _async_ready:
+        try:
+            await asyncio.wait_for(asyncio.shield(_async_fill), timeout)
+        except asyncio.TimeoutError:
+            raise RuntimeError(f"Database is not ready after {timeout:.0f}s") from None  # noqa: TRY003
+    return pool
+
+
+async def async_pool() -> AsyncConnectionPool:
+    if _async_pool is None:
+        return await init_async_pool()
+    return _async_pool
+
+
+async def close_pools() -> None:
+    global _pool, _async_pool, _async_fill, _async_ready
+    _async_ready = False
+    if _async_fill is not None:
+        _async_fill.cancel()
+        try:
+            await _async_fill
+        except asyncio.CancelledError:
+            pass
+        _async_fill = None
+    if _async_pool is not None:
+        await _async_pool.close()
+        _async_pool = None
+    if _pool is not None:
+        _pool.close()
+        _pool = None
+
+
+def async_pool_stats() -> Dict[str, int]:
+    """psycopg_pool statistics of the async pool (empty before it is opened)."""
+    return _async_pool.get_stats() if _async_pool is not None else {}
+
+
+@asynccontextmanager
+async def async_db_conn(timeout: Optional[float] = None):
+    p = await async_pool()
+    start = time.perf_counter()
+    async with p.connection(timeout=timeout) as conn:
+        DB_POOL_WAIT.observe(time.perf_counter() - start)
+        yield conn
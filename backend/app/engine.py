@@ -0,0 +1,415 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import psycopg
+from fastapi import HTTPException
+from psycopg_pool import PoolTimeout
+
+from .db import async_db_conn
+from .metrics import ROUND_EVENTS_FAILED
+
+logger = logging.getLogger(__name__)
+
+# ROUND_ENGINE=memory keeps active rounds inside the API process and persists
+# eliminations write-behind. It assumes a single API process owns the rounds
+# it serves; the default ("db") goes to Postgres on every request.
+ROUND_ENGINE = os.getenv("ROUND_ENGINE", "db").strip().lower()
+ROUND_ENGINE_MAX_ROUNDS = int(os.getenv("ROUND_ENGINE_MAX_ROUNDS", "10000"))
+ROUND_ENGINE_FLUSH_BATCH = int(os.getenv("ROUND_ENGINE_FLUSH_BATCH", "200"))
+# Attempts at persisting a turn that the database rejects (connection errors
+# are retried until the database is back); then it goes to round_event_failures.
+ROUND_ENGINE_FLUSH_ATTEMPTS = int(os.getenv("ROUND_ENGINE_FLUSH_ATTEMPTS", "5"))
+
+STATUS_ACTIVE = "active"
+STATUS_FINISHED = "finished"
+
+
+@dataclass(slots=True)
+class HotItem:
+    id: uuid.UUID
+    title: str
+    rating: object
+    secret_text: Optional[str]
+    image_hash: Optional[str]
+    eliminated: bool
+    eliminated_by_team: Optional[int]
+    version: int
+
+
+@dataclass(slots=True)
+class HotRound:
+    id: uuid.UUID
+    game_set: str
+    category: str
+    prompt: str
+    kind: str
+    image_hash: Optional[str]
+    target_item_id: uuid.UUID
+    current_team: int
+    status: str
+    winner_team: Optional[int]
+    loser_team: Optional[int]
+    version: int
+    remaining_count: int
+    items: List[HotItem]                          # ordered by title, like the SQL read path
+    by_id: Dict[uuid.UUID, HotItem] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class TurnEvent:
+    """One applied elimination plus the round state it produced."""
+    round_id: uuid.UUID
+    version: int
+    item_id: uuid.UUID
+    team: int
+    current_team: int
+    status: str
+    winner_team: Optional[int]
+    loser_team: Optional[int]
+    at: datetime
+    # items left after the turn; not kept in round_events, so None when read back
+    remaining_count: Optional[int] = None
+
+
+# (current_team, remaining_count, picked_target) -> (next_team, status, winner, loser)
+NextTurn = Callable[[int, int, bool], Tuple[int, str, Optional[int], Optional[int]]]
+ApplyTurn = Callable[..., Awaitable[bool]]
+
+
+class HotRoundEngine:
+    """
+    In-memory round state with a write-behind elimination log.
+
+    Reads and turns on cached rounds never touch the database. Every turn is
+    queued as a TurnEvent; a writer task appends it to `round_events` and
+    projects it onto rounds/items with the regular SQL turn statement. On a
+    cache miss the round is loaded from the tables and any logged or still
+    queued events beyond its stored version are replayed.
+
+    State is only touched from the event loop and a turn has no await between
+    its checks and its update, so turns on one round never interleave.
+    """
+
+    def __init__(self, *, next_turn: NextTurn, apply_turn: ApplyTurn, max_rounds: int = ROUND_ENGINE_MAX_ROUNDS):
+        self._next_turn = next_turn
+        self._apply_turn = apply_turn
+        self._max_rounds = max_rounds
+        self._rounds: "OrderedDict[uuid.UUID, HotRound]" = OrderedDict()
+        self._pending: Dict[uuid.UUID, List[TurnEvent]] = {}
+        self._queue: "asyncio.Queue[Optional[TurnEvent]]" = asyncio.Queue()
+        self._writer: Optional[asyncio.Task] = None
+
+    # ----- lifecycle -----
+    def start(self) -> None:
+        if self._writer is None:
+            self._writer = asyncio.get_running_loop().create_task(self._write_loop())
+
+    async def close(self) -> None:
+        """Flush every queued event and stop the writer."""
+        if self._writer is not None:
+            self._queue.put_nowait(None)
+            await self._writer
+            self._writer = None
+
+    # ----- reads -----
+    async def get(self, round_id: uuid.UUID, game_set: str) -> HotRound:
+        hot = self._rounds.get(round_id)
+        if hot is not None:
+            self._rounds.move_to_end(round_id)
+        else:
+            hot = await self._load(round_id, game_set)
+        if hot is None or hot.game_set != game_set:
+            raise HTTPException(status_code=404, detail="Round not found")
+        return hot
+
+    def cached_status(self, round_id: uuid.UUID) -> Optional[str]:
+        """Status of a cached or still-flushing round; None when the stored row is current."""
+        state = self.cached_state(round_id)
+        return state[1] if state is not None else None
+
+    def cached_state(self, round_id: uuid.UUID) -> Optional[Tuple[int, str, int, Optional[int], Optional[int]]]:
+        """
+        (remaining_count, status, current_team, winner_team, loser_team) of a
+        cached or still-flushing round; None when the stored row is current.
+        """
+        hot = self._rounds.get(round_id)
+        if hot is not None:
+            return hot.remaining_count, hot.status, hot.current_team, hot.winner_team, hot.loser_team
+        pending = self._pending.get(round_id)
+        if not pending:
+            return None
+        e = pending[-1]
+        return e.remaining_count, e.status, e.current_team, e.winner_team, e.loser_team
+
+    async def snapshot(self, round_id: uuid.UUID, game_set: str, since: Optional[int] = None):
+        """Rows shaped like the SQL read path: (round_row, item_rows)."""
+        hot = await self.get(round_id, game_set)
+        row = (
+            hot.id,
+            hot.category,
+            hot.prompt,
+            hot.kind,
+            hot.current_team,
+            hot.status,
+            hot.target_item_id,
+            hot.winner_team,
+            hot.loser_team,
+            hot.image_hash,
+            hot.version,
+        )
+        reveal_all = hot.status == STATUS_FINISHED and (since is None or since < hot.version)
+        items_rows = [
+            (it.id, it.title, it.eliminated, it.rating, it.secret_text, it.eliminated_by_team, it.image_hash)
+            for it in hot.items
+            if since is None or reveal_all or it.version > since
+        ]
+        return row, items_rows
+
+    # ----- writes -----
+    async def eliminate(self, round_id: uuid.UUID, game_set: str, item_id: uuid.UUID) -> int:
+        """Apply a turn in memory and queue it for persistence. Returns the pre-turn version."""
+        hot = await self.get(round_id, game_set)
+
+        if hot.status != STATUS_ACTIVE:
+            raise HTTPException(status_code=409, detail="Round already finished")
+        item = hot.by_id.get(item_id)
+        if item is None:
+            raise HTTPException(status_code=404, detail="Item not found")
+        if item.eliminated:
+            raise HTTPException(status_code=409, detail="Item already eliminated")
+
+        prev_version = hot.version
+        team = hot.current_team
+        next_team, status, winner, loser = self._next_turn(
+            team, hot.remaining_count, item_id == hot.target_item_id
+        )
+        event = TurnEvent(
+            round_id=hot.id,
+            version=hot.version + 1,
+            item_id=item_id,
+            team=team,
+            current_team=next_team,
+            status=status,
+            winner_team=winner,
+            loser_team=loser,
+            at=datetime.now(timezone.utc),
+            remaining_count=hot.remaining_count - 1,
+        )
+        _apply_event(hot, event)
+
+        self._pending.setdefault(hot.id, []).append(event)
+        self._queue.put_nowait(event)
+        return prev_version
+
+    # ----- internals -----
+    async def _load(self, round_id: uuid.UUID, game_set: str) -> Optional[HotRound]:
+        # Turns still queued before the snapshot below is taken: each one is
+        # either in it (and skipped by version) or replayed on top of it.
+        queued = list(self._pending.get(round_id, ()))
+        async with async_db_conn() as conn:
+            async with conn.cursor() as cur:
+                # The row, its items and its log from one snapshot, so a batch
+                # the writer commits in between is seen in all of them or none.
+                await cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+                await cur.execute(
+                    """
+                    SELECT id, game_set, category, prompt, kind, image_hash, target_item_id, current_team, status,
+                           winner_team, loser_team, version, remaining_count
+                    FROM rounds
+                    WHERE id = %s AND game_set = %s
+                    """,
+                    (round_id, game_set),
+                )
+                row = await cur.fetchone()
+                if not row:
+                    return None
+                await cur.execute(
+                    """
+                    SELECT id, title, rating, secret_text, image_hash, eliminated, eliminated_by_team, version
+                    FROM items
+                    WHERE round_id = %s
+                    ORDER BY title ASC
+                    """,
+                    (round_id,),
+                )
+                item_rows = await cur.fetchall()
+                await cur.execute(
+                    """
+                    SELECT round_id, version, item_id, team, current_team, status, winner_team, loser_team, created_at
+                    FROM round_events
+                    WHERE round_id = %s AND version > %s
+                    ORDER BY version ASC
+                    """,
+                    (round_id, row[11]),
+                )
+                logged = [TurnEvent(*r) for r in await cur.fetchall()]
+
+        items = [HotItem(*r) for r in item_rows]
+        hot = HotRound(
+            id=row[0],
+            game_set=row[1],
+            category=row[2],
+            prompt=row[3],
+            kind=row[4],
+            image_hash=row[5],
+            target_item_id=row[6],
+            current_team=int(row[7]),
+            status=str(row[8]),
+            winner_team=row[9],
+            loser_team=row[10],
+            version=int(row[11]),
+            remaining_count=int(row[12]),
+            items=items,
+            by_id={it.id: it for it in items},
+        )
+
+        # Another request may have loaded the round while we were waiting.
+        cached = self._rounds.get(round_id)
+        if cached is not None:
+            return cached
+        replay = {e.version: e for e in logged + queued + self._pending.get(round_id, [])}
+        for version in sorted(replay):
+            if version > hot.version:
+                _apply_event(hot, replay[version])
+        self._rounds[round_id] = hot
+        while len(self._rounds) > self._max_rounds:
+            self._rounds.popitem(last=False)
+        return hot
+
+    async def _write_loop(self) -> None:
+        stopping = False
+        while not stopping:
+            event = await self._queue.get()
+            if event is None:
+                break
+            batch = [event]
+            while len(batch) < ROUND_ENGINE_FLUSH_BATCH:
+                try:
+                    nxt = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if nxt is None:
+                    stopping = True
+                    break
+                batch.append(nxt)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[TurnEvent]) -> None:
+        error = await self._persist_with_retry(batch)
+        if error is None:
+            for event in batch:
+                self._done(event)
+            return
+
+        # Something in the batch is rejected for good: find it one turn at a time.
+        for event in batch:
+            error = await self._persist_with_retry([event]) if len(batch) > 1 else error
+            self._done(event)
+            if error is not None:
+                await self._dead_letter(event, error)
+
+    async def _persist_with_retry(self, batch: List[TurnEvent]) -> Optional[Exception]:
+        """None once persisted; the last error after ROUND_ENGINE_FLUSH_ATTEMPTS rejections."""
+        delay = 0.5
+        failures = 0
+        while True:
+            try:
+                await self._persist(batch)
+                return None
+            except (psycopg.OperationalError, PoolTimeout):
+                logger.warning("round engine: database unavailable, retrying %d events", len(batch), exc_info=True)
+            except Exception as e:
+                failures += 1
+                logger.exception(
+                    "round engine: failed to persist %d events (attempt %d of %d)",
+                    len(batch), failures, ROUND_ENGINE_FLUSH_ATTEMPTS,
+                )
+                if failures >= ROUND_ENGINE_FLUSH_ATTEMPTS:
+                    return e
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+
+    def _done(self, event: TurnEvent) -> None:
+        pending = self._pending.get(event.round_id)
+        if pending and pending[0] is event:
+            pending.pop(0)
+            if not pending:
+                del self._pending[event.round_id]
+
+    async def _dead_letter(self, event: TurnEvent, error: Exception) -> None:
+        """Give up on a turn: keep it in round_event_failures and reload its round from the tables."""
+        ROUND_EVENTS_FAILED.inc()
+        logger.error(
+            "round engine: dropping turn %d of round %s (item %s): %s",
+            event.version, event.round_id, event.item_id, error,
+        )
+        self._rounds.pop(event.round_id, None)
+        try:
+            async with async_db_conn() as conn:
+                await conn.execute(
+                    """
+                    INSERT INTO round_event_failures
+                        (round_id, version, item_id, team, current_team, status, winner_team, loser_team,
+                         created_at, error)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    """,
+                    (event.round_id, event.version, event.item_id, event.team, event.current_team,
+                     event.status, event.winner_team, event.loser_team, event.at, str(error)),
+                )
+                await conn.commit()
+        except Exception:
+            logger.exception("round engine: could not record failed turn %r", event)
+
+    async def _persist(self, batch: List[TurnEvent]) -> None:
+        async with async_db_conn() as conn:
+            async with conn.cursor() as cur:
+                await cur.executemany(
+                    """
+                    INSERT INTO round_events
+                        (round_id, version, item_id, team, current_team, status, winner_team, loser_team, created_at)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    ON CONFLICT (round_id, version) DO NOTHING
+                    """,
+                    [
+                        (e.round_id, e.version, e.item_id, e.team, e.current_team, e.status,
+                         e.winner_team, e.loser_team, e.at)
+                        for e in batch
+                    ],
+                )
+                for e in batch:
+                    await self._apply_turn(
+                        cur,
+                        item_id=e.item_id,
+                        round_id=e.round_id,
+                        team=e.team,
+                        version=e.version,
+                        current_team=e.current_team,
+                        status=e.status,
+                        winner_team=e.winner_team,
+                        loser_team=e.loser_team,
+                        eliminated_at=e.at,
+                    )
+            await conn.commit()
+
+
+def _apply_event(hot: HotRound, event: TurnEvent) -> None:
+    item = hot.by_id.get(event.item_id)
+    if item is None or item.eliminated:
+        return
+    item.eliminated = True
+    item.eliminated_by_team = event.team
+    item.version = event.version
+    hot.remaining_count -= 1
+    hot.version = event.version
+    hot.current_team = event.current_team
+    hot.status = event.status
+    hot.winner_team = event.winner_team
+    hot.loser_team = event.loser_team
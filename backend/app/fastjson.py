@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import os
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Any, Hashable, Optional
+
+import orjson
+from fastapi.responses import Response
+
+# Hot endpoints build plain dicts and encode them once with orjson instead of
+# building pydantic models that FastAPI validates and serializes again. Their
+# routes keep `response_model` for the OpenAPI schema; returning a Response
+# skips the second pass.
+
+# Finished rounds kept pre-encoded per API process; 0 disables the cache.
+FINISHED_ROUND_CACHE_SIZE = int(os.getenv("FINISHED_ROUND_CACHE_SIZE", "1000"))
+
+
+def _default(obj: Any) -> Any:
+    # Same representation pydantic uses for Decimal in JSON mode.
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj: Any) -> bytes:
+    return orjson.dumps(obj, default=_default)
+
+
+class FastJSONResponse(Response):
+    """JSON response from a dict (encoded with orjson) or from already encoded bytes."""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return content if isinstance(content, bytes) else dumps(content)
+
+
+class EncodedCache:
+    """
+    Small LRU of encoded payloads that never change once stored (e.g. finished
+    rounds). They can still go away: `discard` drops one that was deleted.
+    """
+
+    def __init__(self, max_entries: int):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if self._max_entries <= 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import multiprocessing
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+
+from . import imaging
+
+# Images live in the `images` table keyed by the hex sha256 of their bytes.
+# Rounds, items and templates only keep that hash; clients fetch the bytes
+# from /api/images/{hash}, which can be cached forever.
+IMAGE_URL_PREFIX = "/api/images/"
+IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+ALLOWED_MIME_TYPES = ("image/jpeg", "image/png", "image/gif", "image/webp")
+
+# Uploads are decoded and re-encoded in worker processes (imaging.py): a main
+# image capped at IMAGE_MAX_SIDE pixels plus a thumbnail that responses link to.
+IMAGE_MAX_BYTES = int(os.getenv("IMAGE_MAX_BYTES", str(20 * 1024 * 1024)))
+IMAGE_MAX_SIDE = int(os.getenv("IMAGE_MAX_SIDE", "1600"))
+IMAGE_THUMB_SIDE = int(os.getenv("IMAGE_THUMB_SIDE", "320"))
+IMAGE_QUALITY = int(os.getenv("IMAGE_QUALITY", "82"))
+IMAGE_WORKERS = int(os.getenv("IMAGE_WORKERS", "2"))
+THUMB_SUFFIX = "/thumb"
+# Streamed uploads are written to their temporary file in pieces of this size.
+SPOOL_WRITE_BYTES = 1024 * 1024
+
+_HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+_DATA_URL_RE = re.compile(r"^data:([^;,]*)(;[^,]*)?,", re.IGNORECASE)
+
+
+def is_image_hash(value: str) -> bool:
+    return bool(_HASH_RE.match(value))
+
+
+def image_url(image_hash: Optional[str]) -> Optional[str]:
+    if not image_hash:
+        return None
+    return f"{IMAGE_URL_PREFIX}{image_hash}"
+
+
+def thumb_url(image_hash: Optional[str]) -> Optional[str]:
+    if not image_hash:
+        return None
+    return f"{IMAGE_URL_PREFIX}{image_hash}{THUMB_SUFFIX}"
+
+
+def image_etag(image_hash: str, thumb: bool = False) -> str:
+    return f'"{image_hash}-thumb"' if thumb else f'"{image_hash}"'
+
+
+def sniff_mime(data: bytes) -> Optional[str]:
+    if data.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "image/png"
+    if data.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def parse_image_ref(value: str) -> Optional[str]:
+    """Return the blob hash if `value` points at an already stored image (or its thumbnail)."""
+    if value.startswith(IMAGE_URL_PREFIX):
+        value = value[len(IMAGE_URL_PREFIX):]
+        if value.endswith(THUMB_SUFFIX):
+            value = value[: -len(THUMB_SUFFIX)]
+    value = value.strip().lower()
+    return value if is_image_hash(value) else None
+
+
+def decode_image_data(value: str) -> Tuple[bytes, str]:
+    """Decode a data URL or bare base64 string into (bytes, mime)."""
+    s = value.strip()
+    declared: Optional[str] = None
+
+    m = _DATA_URL_RE.match(s)
+    if m:
+        declared = (m.group(1) or "").lower() or None
+        s = s[m.end():]
+
+    try:
+        data = base64.b64decode(s, validate=False)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="image_data must be base64 or a data URL") from None
+
+    if not data:
+        raise HTTPException(status_code=400, detail="image_data is empty")
+    if len(data) > IMAGE_MAX_BYTES:
+        raise HTTPException(status_code=413, detail="Image is too large")
+
+    mime = sniff_mime(data) or declared
+    if mime not in ALLOWED_MIME_TYPES:
+        raise HTTPException(status_code=400, detail="Unsupported image format")
+
+    return data, mime
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _image_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        # spawn: forking a process that runs an event loop and pool threads is unsafe
+        _executor = ProcessPoolExecutor(max_workers=IMAGE_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def shutdown_image_workers() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def process_upload(data: imaging.Source, mime: str) -> Tuple[imaging.Encoded, imaging.Encoded]:
+    """(main, thumbnail) for uploaded bytes (or a file holding them), computed off the event loop."""
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(
+            _image_executor(), imaging.process_image, data, mime, IMAGE_MAX_SIDE, IMAGE_THUMB_SIDE, IMAGE_QUALITY
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from None
+
+
+async def thumbnail_for(data: bytes) -> imaging.Encoded:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _image_executor(), imaging.make_thumbnail, data, IMAGE_THUMB_SIDE, IMAGE_QUALITY
+    )
+
+
+async def insert_processed(cur, processed: Sequence[Tuple[imaging.Encoded, imaging.Encoded]]) -> List[str]:
+    """
+    Store (main, thumbnail) pairs; returns the main hashes. Existing blobs
+    keep their bytes, and storing one again restarts its retention grace period.
+    """
+    thumbs: Dict[str, Tuple[str, bytes]] = {}
+    mains: Dict[str, Tuple[str, bytes, str]] = {}
+    hashes: List[str] = []
+    for (main, main_mime), (thumb, thumb_mime) in processed:
+        th = hashlib.sha256(thumb).hexdigest()
+        mh = hashlib.sha256(main).hexdigest()
+        thumbs.setdefault(th, (thumb_mime, thumb))
+        mains.setdefault(mh, (main_mime, main, th))
+        hashes.append(mh)
+
+    if thumbs:
+        await cur.executemany(
+            """
+            INSERT INTO images (hash, mime, data)
+            VALUES (%s, %s, %s)
+            ON CONFLICT (hash) DO NOTHING
+            """,
+            [(h, mime, data) for h, (mime, data) in thumbs.items()],
+        )
+    if mains:
+        await cur.executemany(
+            """
+            INSERT INTO images (hash, mime, data, thumb_hash)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (hash) DO UPDATE
+            SET thumb_hash = coalesce(images.thumb_hash, EXCLUDED.thumb_hash),
+                created_at = now()
+            """,
+            [(h, mime, data, th) for h, (mime, data, th) in mains.items()],
+        )
+    return hashes
+
+
+async def store_images(cur, values: Sequence[Optional[str]]) -> List[Optional[str]]:
+    """
+    Resolve request `image_data` values into blob hashes.
+
+    Each value may be empty, a reference to a stored image (`/api/images/<hash>`)
+    or inline base64 / data URL. Inline images are processed into a main image
+    and thumbnail once per distinct upload; existing blobs are left untouched.
+    """
+    hashes: List[Optional[str]] = []
+    uploads: Dict[str, Tuple[bytes, str]] = {}
+    refs: set[str] = set()
+
+    for value in values:
+        if not (value and value.strip()):
+            hashes.append(None)
+            continue
+
+        ref = parse_image_ref(value)
+        if ref is not None:
+            refs.add(ref)
+            hashes.append(ref)
+            continue
+
+        data, mime = decode_image_data(value)
+        h = hashlib.sha256(data).hexdigest()
+        uploads.setdefault(h, (data, mime))
+        hashes.append(h)
+
+    stored: Dict[str, str] = {}
+    if uploads:
+        processed = await asyncio.gather(*(process_upload(data, mime) for data, mime in uploads.values()))
+        stored = dict(zip(uploads, await insert_processed(cur, processed)))
+        hashes = [stored.get(h, h) if h is not None else None for h in hashes]
+
+    missing = refs - set(stored.values())
+    if missing:
+        await cur.execute("SELECT hash FROM images WHERE hash = ANY(%s)", (list(missing),))
+        found = {r[0] for r in await cur.fetchall()}
+        if missing - found:
+            raise HTTPException(status_code=400, detail="Unknown image reference")
+
+    return hashes
+
+
+@asynccontextmanager
+async def spool_upload(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[str, str, str]]:
+    """
+    Write a streamed raw upload to a temporary file, hashing it on the way.
+    Yields (path, mime, sha256 hex); the file is removed on exit. At most
+    SPOOL_WRITE_BYTES are held in memory, and no database connection is
+    needed. Hashing and file I/O run in a thread, off the event loop.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    pending = bytearray()
+
+    tmp = await asyncio.to_thread(tempfile.NamedTemporaryFile, prefix="upload-")
+    try:
+        async for chunk in chunks:
+            size += len(chunk)
+            if size > IMAGE_MAX_BYTES:
+                raise HTTPException(status_code=413, detail="Image is too large")
+            if len(head) < 16:
+                head += chunk[:16]
+            pending += chunk
+            if len(pending) >= SPOOL_WRITE_BYTES:
+                await asyncio.to_thread(_spool_write, tmp, digest, bytes(pending))
+                pending.clear()
+        await asyncio.to_thread(_spool_write, tmp, digest, bytes(pending))
+        await asyncio.to_thread(tmp.flush)
+
+        if not size:
+            raise HTTPException(status_code=400, detail="Image is empty")
+        mime = sniff_mime(head)
+        if mime not in ALLOWED_MIME_TYPES:
+            raise HTTPException(status_code=400, detail="Unsupported image format")
+
+        yield tmp.name, mime, digest.hexdigest()
+    finally:
+        await asyncio.to_thread(tmp.close)
+
+
+def _spool_write(tmp, digest, data: bytes) -> None:
+    digest.update(data)
+    tmp.write(data)
+
+
+async def store_image(cur, value: Optional[str]) -> Optional[str]:
+    return (await store_images(cur, [value]))[0]
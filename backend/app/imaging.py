@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import os
+from io import BytesIO
+from typing import Tuple, Union
+
+from PIL import Image, ImageOps
+
+# Pure, CPU-bound image work. Functions here run inside worker processes (see
+# images.py), so this module imports nothing but Pillow and raises only
+# picklable exceptions (ValueError).
+
+# Refuse to decode anything larger than this many pixels (decompression bombs).
+MAX_PIXELS = 40_000_000
+Image.MAX_IMAGE_PIXELS = MAX_PIXELS
+
+OUTPUT_MIME = "image/webp"
+
+# (bytes, mime)
+Encoded = Tuple[bytes, str]
+# raw bytes, or the path of a file holding them (streamed uploads)
+Source = Union[bytes, str]
+
+
+def _read(source: Source) -> bytes:
+    if isinstance(source, bytes):
+        return source
+    with open(source, "rb") as f:
+        return f.read()
+
+
+def _size(source: Source) -> int:
+    return len(source) if isinstance(source, bytes) else os.path.getsize(source)
+
+
+def _open(source: Source) -> Image.Image:
+    try:
+        im = Image.open(BytesIO(source) if isinstance(source, bytes) else source)
+        im.load()
+    except Image.DecompressionBombError:
+        raise ValueError("Image is too large") from None
+    except Exception:
+        raise ValueError("Image could not be decoded") from None
+    return im
+
+
+def _encode(im: Image.Image, max_side: int, quality: int) -> bytes:
+    im = ImageOps.exif_transpose(im)
+    if im.mode not in ("RGB", "RGBA"):
+        im = im.convert("RGBA" if "A" in im.getbands() or "transparency" in im.info else "RGB")
+    im.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+
+    out = BytesIO()
+    im.save(out, format="WEBP", quality=quality, method=4)
+    return out.getvalue()
+
+
+def process_image(source: Source, mime: str, max_side: int, thumb_side: int, quality: int) -> Tuple[Encoded, Encoded]:
+    """
+    Return (main, thumbnail). The main image is capped at `max_side` pixels
+    and re-encoded as WebP, unless the upload is already small enough and the
+    re-encode would not save bytes, in which case the original is kept.
+    Animated images are always kept as uploaded, so ones larger than
+    `max_side` are refused rather than downscaled.
+    """
+    im = _open(source)
+
+    if getattr(im, "is_animated", False):
+        if max(im.size) > max_side:
+            raise ValueError(f"Animated images must be at most {max_side} pixels on each side")
+        main: Encoded = (_read(source), mime)
+    else:
+        encoded = _encode(im, max_side, quality)
+        fits = max(im.size) <= max_side
+        main = (_read(source), mime) if fits and len(encoded) >= _size(source) else (encoded, OUTPUT_MIME)
+
+    im.seek(0)
+    thumb = (_encode(im, thumb_side, quality), OUTPUT_MIME)
+    return main, thumb
+
+
+def make_thumbnail(data: bytes, thumb_side: int, quality: int) -> Encoded:
+    """Thumbnail for a blob stored before processing existed."""
+    return _encode(_open(data), thumb_side, quality), OUTPUT_MIME
@@ -1,27 +1,81 @@
 from __future__ import annotations
 
-import random
+import asyncio
+import base64
+import hashlib
+import logging
 import uuid
 
+from datetime import datetime
 from decimal import Decimal
-from typing import Any, Dict, List, Optional, Literal
+from typing import Any, AsyncIterator, Dict, List, Optional, Literal, Tuple, Union
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, Header, Depends
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field, conlist
-from .db import db_conn, init_pool
-from .datasets import DATASETS, list_categories
+from fastapi import FastAPI, HTTPException, Header, Depends, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+import orjson
+from pydantic import BaseModel, Field, ValidationError, conlist
+from .db import async_db_conn, async_pool_ready, async_pool_stats, close_pools, start_async_pool, web_concurrency
+from .datasets import DatasetItem, get_dataset, list_categories
+from .engine import ROUND_ENGINE, HotRoundEngine
+from .realtime import ROUND_CHANNEL, ROUND_DELETE_CHANNEL, TEMPLATE_CHANNEL, PgListener, RoundBroker
+from .retention import RetentionJob
+from .template_cache import TemplateCache
+from .metrics import (
+    ROUND_ELIMINATIONS,
+    ROUNDS_CREATED,
+    MetricsMiddleware,
+    mark_process_dead,
+    register_pool_collector,
+    render as render_metrics,
+)
+from .tracing import TracedRoute
+from .fastjson import FINISHED_ROUND_CACHE_SIZE, EncodedCache, FastJSONResponse, dumps
+from .images import (
+    IMAGE_CACHE_CONTROL,
+    IMAGE_MAX_BYTES,
+    decode_image_data,
+    image_etag,
+    image_url,
+    insert_processed,
+    is_image_hash,
+    parse_image_ref,
+    process_upload,
+    shutdown_image_workers,
+    store_image,
+    store_images,
+    spool_upload,
+    thumb_url,
+    thumbnail_for,
+)
+
+logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    init_pool()
+    # Serve (and answer liveness probes) right away; readiness waits for the pool.
+    await start_async_pool(configure=warm_connection)
+    if hot_rounds is not None:
+        hot_rounds.start()
+    pg_listener.start()
+    retention_job.start()
     yield
+    await retention_job.close()
+    await pg_listener.close()
+    await round_broker.close()
+    if hot_rounds is not None:
+        await hot_rounds.close()
+    await close_pools()
+    shutdown_image_workers()
+    mark_process_dead()
 
 app = FastAPI(
     title="The Eliminator’s Gambit API",
     version="0.1.0",
     lifespan=lifespan,
 )
+app.router.route_class = TracedRoute
+app.add_middleware(MetricsMiddleware)
+register_pool_collector(async_pool_stats)
 
 # =========================
 # Core round models
@@ -34,6 +88,8 @@ STATUS_FINISHED: RoundStatus = "finished"
 
 class CreateRoundRequest(BaseModel):
     category: str = Field(default="movies")
+    # 0..1; when set, items are drawn from a narrower band of neighbouring ratings
+    difficulty: Optional[float] = Field(default=None, ge=0, le=1)
 
 
 class EliminateRequest(BaseModel):
@@ -61,6 +117,18 @@ class RoundOut(BaseModel):
     loser_team: Optional[TeamId] = None
     items: List[ItemOut]
     image_data: Optional[str] = None
+    version: int = 0
+
+
+class RoundDelta(BaseModel):
+    """Compact round state: only items changed after the client's `since` version."""
+    id: uuid.UUID
+    version: int
+    current_team: TeamId
+    status: RoundStatus
+    winner_team: Optional[TeamId] = None
+    loser_team: Optional[TeamId] = None
+    items: List[ItemOut]
 
 
 # =========================
@@ -74,7 +142,7 @@ class TemplateItemIn(BaseModel):
     rating: Optional[Decimal] = None          # rated
     secret_text: Optional[str] = None         # manual/carousel (hidden info)
     is_target: bool = False                   # manual/carousel (exactly 1)
-    image_data: Optional[str] = None          # per-item image (base64 or data URL)
+    image_data: Optional[str] = None          # per-item image (base64, data URL or /api/images/<hash>)
 
 
 class TemplateCreate(BaseModel):
@@ -85,6 +153,35 @@ class TemplateCreate(BaseModel):
     image_data: Optional[str] = None
 
 
+class TemplateItemOut(TemplateItemIn):
+    id: uuid.UUID                             # stable across PATCH edits
+
+
+class TemplateItemUpdate(BaseModel):
+    """Fields of an existing item to change; omitted fields are left as they are."""
+    id: uuid.UUID
+    title: Optional[str] = Field(default=None, min_length=1, max_length=200)
+    rating: Optional[Decimal] = None
+    secret_text: Optional[str] = None
+    is_target: Optional[bool] = None
+    image_data: Optional[str] = None
+
+
+class TemplatePatch(BaseModel):
+    """
+    Incremental template edit. Top-level fields are changed only when present;
+    items are added, updated by id or removed by id. Unchanged items (and their
+    images) are not rewritten.
+    """
+    kind: Optional[TemplateKind] = None
+    name: Optional[str] = Field(default=None, min_length=1, max_length=120)
+    prompt: Optional[str] = Field(default=None, min_length=1, max_length=300)
+    image_data: Optional[str] = None
+    add: List[TemplateItemIn] = Field(default_factory=list)
+    update: List[TemplateItemUpdate] = Field(default_factory=list)
+    remove: List[uuid.UUID] = Field(default_factory=list)
+
+
 class TemplateSummary(BaseModel):
     id: uuid.UUID
     name: str
@@ -98,51 +195,240 @@ class TemplateOut(BaseModel):
     name: str
     prompt: str
     kind: str
-    items: List[TemplateItemIn]
+    items: List[TemplateItemOut]
     image_data: Optional[str] = None
 
 
+class TemplatePage(BaseModel):
+    templates: List[TemplateSummary]
+    next_cursor: Optional[str] = None         # pass back as ?cursor= for the next page
+
+
 class CreateRoundFromTemplateRequest(BaseModel):
     template_id: uuid.UUID
 
 
+GAME_PLAN_MAX_ROUNDS = 10
+
+
+class GamePlanRoundIn(BaseModel):
+    """One round of a plan: either a template or a built-in category."""
+    template_id: Optional[uuid.UUID] = None
+    category: Optional[str] = None
+    difficulty: Optional[float] = Field(default=None, ge=0, le=1)
+
+
+class CreateGamePlanRequest(BaseModel):
+    rounds: conlist(GamePlanRoundIn, min_length=1, max_length=GAME_PLAN_MAX_ROUNDS)
+
+
+class GamePlanPatch(BaseModel):
+    current_index: int = Field(ge=0)
+
+
+class RoundHandle(BaseModel):
+    id: uuid.UUID
+    kind: RoundKind
+    category: str
+    status: RoundStatus
+
+
+class GamePlanOut(BaseModel):
+    id: uuid.UUID
+    current_index: int
+    rounds: List[RoundHandle]                 # in play order; fetch each with GET /api/rounds/{id}
+
+
+class RoundSummary(BaseModel):
+    """A round as listed by GET /api/rounds: no items, no images."""
+    id: uuid.UUID
+    kind: RoundKind
+    category: str
+    prompt: str
+    status: RoundStatus
+    created_at: datetime
+    current_team: TeamId
+    winner_team: Optional[TeamId] = None
+    loser_team: Optional[TeamId] = None
+    item_count: int
+    remaining_count: int
+    template_id: Optional[uuid.UUID] = None
+    plan_id: Optional[uuid.UUID] = None
+    plan_index: Optional[int] = None
+
+
+class RoundPage(BaseModel):
+    rounds: List[RoundSummary]
+    next_cursor: Optional[str] = None         # pass back as ?cursor= for the next page
+
+
+class TeamStats(BaseModel):
+    team: TeamId
+    wins: int
+    losses: int
+
+
+class SourceStats(BaseModel):
+    """Finished rounds of one template or built-in category."""
+    template_id: Optional[uuid.UUID] = None   # None for built-in categories
+    category: Optional[str] = None            # category, or the template's current name (None once deleted)
+    kind: RoundKind
+    rounds: int
+    team1_wins: int
+    team2_wins: int
+    draws: int
+
+
+class TargetHitStats(BaseModel):
+    turn: int                                 # the elimination that picked the target (1 = first)
+    rounds: int
+
+
+class GameSetStats(BaseModel):
+    game_set: str
+    rounds: int
+    draws: int                                # finished with only the target left
+    teams: List[TeamStats]
+    sources: List[SourceStats]                # most played first
+    target_hits: List[TargetHitStats]         # earliest turn first
+
+
+class GameSetImport(BaseModel):
+    templates: int                            # templates added to the game set
+    images: int                               # image lines read (blobs already stored included)
+
+
 # =========================
 # Startup / misc
 # =========================
 @app.get("/api/health")
-def health() -> Dict[str, str]:
+@app.get("/api/health/live")
+async def health() -> Dict[str, str]:
+    """Liveness: the process serves requests, whatever the database is doing."""
     return {"status": "ok"}
 
+# A readiness probe gives up on the database after this many seconds.
+HEALTH_DB_TIMEOUT = 2.0
+
+@app.get("/api/health/ready")
+async def ready() -> JSONResponse:
+    """
+    Readiness: 200 once the pool has opened its minimum connections and one
+    of them answers within HEALTH_DB_TIMEOUT, 503 otherwise (still starting,
+    database unreachable or pool exhausted).
+    """
+    stats = async_pool_stats()
+    pool = {"size": stats.get("pool_size", 0), "available": stats.get("pool_available", 0),
+            "waiting": stats.get("requests_waiting", 0)}
+    if not async_pool_ready():
+        return JSONResponse({"status": "starting", "pool": pool}, status_code=503)
+    try:
+        async with async_db_conn(timeout=HEALTH_DB_TIMEOUT) as conn:
+            await asyncio.wait_for(conn.execute("SELECT 1"), HEALTH_DB_TIMEOUT)
+    except Exception:
+        return JSONResponse({"status": "unavailable", "pool": pool}, status_code=503)
+    return JSONResponse({"status": "ok", "pool": pool})
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 @app.get("/api/categories")
-def categories() -> Dict[str, List[str]]:
+async def categories() -> Dict[str, List[str]]:
     return {"categories": list_categories()}
 
 @app.get("/api/game-sets/{name}")
-def game_set_exists(name: str) -> dict:
+async def game_set_exists(name: str) -> dict:
     _validate_game_set(name)
-    with db_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT 1 FROM game_sets WHERE name=%s", (name,))
-            exists = cur.fetchone() is not None
+    async with async_db_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT 1 FROM game_sets WHERE name=%s", (name,))
+            exists = await cur.fetchone() is not None
 
     return {"exists": exists}
 
 
 @app.post("/api/game-sets/{name}")
-def create_game_set(name: str) -> dict:
+async def create_game_set(name: str) -> dict:
     if len(name) != 6:
         raise HTTPException(status_code=400, detail="Game set name must be exactly 6 characters")
 
-    with db_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
+    async with async_db_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
                 "INSERT INTO game_sets(name) VALUES (%s) ON CONFLICT DO NOTHING",
                 (name,),
             )
-        conn.commit()
+        await conn.commit()
 
     return {"created": True}
 
+@app.get("/api/game-sets/{name}/stats", response_model=GameSetStats)
+async def game_set_stats(name: str) -> Any:
+    """
+    Results of a game set's finished rounds, read from the game_set_stats
+    counters (one row per template/category, kind and round length), so the
+    cost does not grow with the number of rounds played.
+    """
+    _validate_game_set(name)
+    async with async_db_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                """
+                SELECT s.template_id,
+                       coalesce(
+                         s.category,
+                         t.name,
+                         -- deleted template: the name its rounds were played under
+                         (SELECT r.category FROM rounds r WHERE r.template_id = s.template_id LIMIT 1)
+                       ),
+                       s.kind, s.turns,
+                       s.rounds, s.team1_wins, s.team2_wins, s.draws
+                FROM game_sets g
+                LEFT JOIN game_set_stats s ON s.game_set = g.name
+                LEFT JOIN templates t ON t.id = s.template_id
+                WHERE g.name = %s
+                """,
+                (name,),
+            )
+            rows = await cur.fetchall()
+
+    if not rows:
+        raise HTTPException(status_code=404, detail="Game set not found")
+
+    sources: Dict[Tuple[Optional[uuid.UUID], Optional[str], str], List[int]] = {}
+    hits: Dict[int, int] = {}
+    for template_id, category, kind, turns, rounds, team1_wins, team2_wins, draws in rows:
+        if kind is None:
+            continue  # game set without finished rounds
+        totals = sources.setdefault((template_id, category, kind), [0, 0, 0, 0])
+        for i, n in enumerate((rounds, team1_wins, team2_wins, draws)):
+            totals[i] += n
+        # turns = 0: rounds archived before their turn count was kept
+        if rounds > draws and turns > 0:
+            hits[turns] = hits.get(turns, 0) + rounds - draws
+
+    team1_wins = sum(t[1] for t in sources.values())
+    team2_wins = sum(t[2] for t in sources.values())
+    return GameSetStats(
+        game_set=name,
+        rounds=sum(t[0] for t in sources.values()),
+        draws=sum(t[3] for t in sources.values()),
+        teams=[
+            TeamStats(team=1, wins=team1_wins, losses=team2_wins),
+            TeamStats(team=2, wins=team2_wins, losses=team1_wins),
+        ],
+        sources=[
+            SourceStats(
+                template_id=template_id, category=category, kind=kind,
+                rounds=t[0], team1_wins=t[1], team2_wins=t[2], draws=t[3],
+            )
+            for (template_id, category, kind), t in sorted(sources.items(), key=lambda kv: -kv[1][0])
+        ],
+        target_hits=[TargetHitStats(turn=turn, rounds=n) for turn, n in sorted(hits.items())],
+    )
+
 # =========================
 # Helpers
 # =========================
@@ -156,6 +442,40 @@ def _validate_game_set(name: str | None) -> str:
 def get_game_set(x_game_set: str | None = Header(default=None)) -> str:
     return _validate_game_set(x_game_set)
 
+# Rounds and templates belong to a game set (X-Game-Set), so caches must keep
+# them private and per set; clients revalidate with the ETag on every use.
+PRIVATE_REVALIDATE_HEADERS = {"Cache-Control": "private, no-cache", "Vary": "X-Game-Set"}
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match check (weak comparison, as RFC 9110 asks for GET)."""
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in [t.removeprefix("W/") for t in tags]
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, **PRIVATE_REVALIDATE_HEADERS})
+
+def _encode_cursor(at_us: int, row_id: uuid.UUID) -> str:
+    """Opaque keyset cursor: a timestamp (microseconds since the epoch) and the row id."""
+    return base64.urlsafe_b64encode(f"{at_us}:{row_id}".encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[int, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        at_us, row_id = raw.split(":", 1)
+        return int(at_us), uuid.UUID(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+
+def get_stream_game_set(
+    x_game_set: str | None = Header(default=None),
+    game_set: str | None = Query(default=None),
+) -> str:
+    # EventSource cannot send custom headers, so streams also accept ?game_set=.
+    return _validate_game_set(x_game_set or game_set)
+
 def _validate_template(kind: str, items: List[TemplateItemIn]) -> None:
     if kind not in ("rated", "manual", "carousel"):
         raise HTTPException(status_code=400, detail="Unknown template kind")
@@ -207,543 +527,1898 @@ def winner_loser_from_loser(loser: TeamId) -> tuple[TeamId, TeamId]:
     winner = other_team(loser)
     return winner, loser
 
-def _finish_round(
+
+def next_turn(
+    current_team: TeamId,
+    remaining: int,
+    picked_target: bool,
+) -> tuple[TeamId, RoundStatus, TeamId | None, TeamId | None]:
+    """Round state after `current_team` eliminates one of `remaining` items."""
+    if picked_target:
+        # Picked the target -> immediate loss for current team.
+        winner, loser = winner_loser_from_loser(current_team)
+        return current_team, STATUS_FINISHED, winner, loser
+    if remaining - 1 <= 1:
+        # Only the target can be left standing (picking it ends the round earlier): a tie.
+        return current_team, STATUS_FINISHED, None, None
+    return other_team(current_team), STATUS_ACTIVE, None, None
+
+async def repo_get_round(cur, *, round_id: uuid.UUID, game_set: str, for_update: bool = False):
+    """
+    Load the turn state of a round. `for_update` takes the row lock that
+    serializes concurrent eliminations of the same round.
+    """
+    await cur.execute(
+        """
+        SELECT id, kind, status, current_team, target_item_id, version, remaining_count
+        FROM rounds
+        WHERE id=%s AND game_set=%s
+        """
+        + (" FOR UPDATE" if for_update else ""),
+        (round_id, game_set),
+    )
+    return await cur.fetchone()
+
+
+async def repo_eliminate_item(
     cur,
     *,
+    item_id: uuid.UUID,
     round_id: uuid.UUID,
-    game_set: str,
-    winner_team: TeamId | None,
-    loser_team: TeamId | None,
-) -> None:
-    cur.execute(
+    team: TeamId,
+    version: int,
+    current_team: TeamId,
+    status: RoundStatus,
+    winner_team: TeamId | None = None,
+    loser_team: TeamId | None = None,
+    eliminated_at: datetime | None = None,
+) -> bool:
+    """
+    Apply a whole turn in one statement: eliminate the item and move the
+    round to its next state. Returns False (and changes nothing) if the item
+    does not belong to the round or is already eliminated.
+    """
+    await cur.execute(
         """
+        WITH it AS (
+            UPDATE items
+            SET eliminated = true, eliminated_by_team = %s, eliminated_at = coalesce(%s, now()), version = %s
+            WHERE id = %s AND round_id = %s AND NOT eliminated
+            RETURNING id
+        )
         UPDATE rounds
-        SET status=%s, winner_team=%s, loser_team=%s
-        WHERE id=%s AND game_set=%s
+        SET remaining_count = remaining_count - 1,
+            version = %s,
+            current_team = %s,
+            status = %s,
+            winner_team = %s,
+            loser_team = %s
+        WHERE id = %s AND EXISTS (SELECT 1 FROM it)
+        RETURNING id
         """,
-        (STATUS_FINISHED, winner_team, loser_team, round_id, game_set),
+        (
+            team,
+            eliminated_at,
+            version,
+            item_id,
+            round_id,
+            version,
+            current_team,
+            status,
+            winner_team,
+            loser_team,
+            round_id,
+        ),
     )
+    return await cur.fetchone() is not None
 
-def repo_get_round(cur, *, round_id: uuid.UUID, game_set: str):
-    cur.execute(
+async def repo_create_round_from_items(
+    cur,
+    *,
+    game_set: str,
+    category: str,
+    prompt: str,
+    titles: List[str],
+    ratings: List[Decimal],
+) -> uuid.UUID:
+    """
+    Insert a rated round and its items in one statement.
+
+    Item ids are generated up front so the target (lowest rating, first in
+    input order on ties) is known when the round row is written.
+    """
+    await cur.execute(
         """
-        SELECT id, kind, status, current_team, target_item_id
-        FROM rounds
-        WHERE id=%s AND game_set=%s
+        WITH src AS (
+            SELECT uuid_generate_v4() AS id, s.title, s.rating, s.ord
+            FROM unnest(%s::text[], %s::numeric[]) WITH ORDINALITY AS s(title, rating, ord)
+        ), r AS (
+            INSERT INTO rounds (
+                game_set, category, prompt, kind, current_team, status, target_item_id, remaining_count, item_count
+            )
+            SELECT %s, %s, %s, 'rated', 1, %s,
+                   (SELECT id FROM src ORDER BY rating ASC, ord ASC LIMIT 1),
+                   n.n, n.n
+            FROM (SELECT count(*) AS n FROM src) n
+            RETURNING id
+        ), ins AS (
+            INSERT INTO items (id, round_id, title, rating, secret_text, eliminated)
+            SELECT src.id, r.id, src.title, src.rating, NULL, false
+            FROM src CROSS JOIN r
+        )
+        SELECT id FROM r
         """,
-        (round_id, game_set),
+        (titles, ratings, game_set, category, prompt, STATUS_ACTIVE),
     )
-    return cur.fetchone()
+    (round_id,) = await cur.fetchone()
+    return round_id
+
+
+# Aggregate over a template's items (`src`, grouped with `tpl`): the same
+# checks as _validate_template, so an unplayable template never becomes a round.
+_TEMPLATE_PLAYABLE_SQL = """
+    count(src.id) >= 2
+    AND CASE tpl.kind
+        WHEN 'rated' THEN count(*) FILTER (WHERE src.rating IS NULL) = 0
+        WHEN 'manual' THEN count(*) FILTER (WHERE src.is_target) = 1
+            AND count(*) FILTER (WHERE btrim(coalesce(src.secret_text, '')) = '') = 0
+        WHEN 'carousel' THEN count(*) FILTER (WHERE src.is_target) = 1
+            AND count(*) FILTER (WHERE btrim(coalesce(src.secret_text, '')) = '') = 0
+            AND count(*) FILTER (WHERE src.image_hash IS NULL OR src.rating IS NOT NULL) = 0
+        ELSE false
+    END
+"""
+
+
+async def repo_create_round_from_template(cur, *, template_id: uuid.UUID, game_set: str):
+    """
+    Copy a template into a new round with a single INSERT ... SELECT.
+
+    Returns (template_found, round_id). round_id is None when the template
+    fails the same checks as _validate_template, in which case nothing is
+    written.
+    """
+    await cur.execute(
+        f"""
+        WITH tpl AS (
+            SELECT id, name, prompt, kind, image_hash
+            FROM templates
+            WHERE id = %s AND game_set = %s
+        ), src AS (
+            SELECT uuid_generate_v4() AS id, ti.title, ti.rating, ti.secret_text, ti.is_target, ti.image_hash
+            FROM template_items ti
+            JOIN tpl ON ti.template_id = tpl.id
+        ), chk AS (
+            SELECT {_TEMPLATE_PLAYABLE_SQL} AS playable
+            FROM tpl
+            LEFT JOIN src ON true
+            GROUP BY tpl.kind
+        ), target AS (
+            SELECT src.id
+            FROM src, tpl
+            WHERE tpl.kind = 'rated' OR src.is_target
+            ORDER BY src.rating ASC, src.title ASC
+            LIMIT 1
+        ), r AS (
+            INSERT INTO rounds (
+                game_set, category, prompt, kind, image_hash, current_team, status, target_item_id, remaining_count,
+                item_count, template_id
+            )
+            SELECT %s, tpl.name, tpl.prompt, tpl.kind, tpl.image_hash, 1, %s,
+                   (SELECT id FROM target),
+                   n.n, n.n,
+                   tpl.id
+            FROM tpl, chk, (SELECT count(*) AS n FROM src) n
+            WHERE chk.playable
+            RETURNING id
+        ), ins AS (
+            INSERT INTO items (id, round_id, title, rating, secret_text, image_hash, eliminated)
+            SELECT
+                src.id,
+                r.id,
+                src.title,
+                CASE WHEN tpl.kind = 'rated' THEN src.rating END,
+                CASE WHEN tpl.kind IN ('manual', 'carousel') THEN src.secret_text END,
+                src.image_hash,
+                false
+            FROM src CROSS JOIN r CROSS JOIN tpl
+        )
+        SELECT EXISTS (SELECT 1 FROM tpl), (SELECT id FROM r)
+        """,
+        (template_id, game_set, game_set, STATUS_ACTIVE),
+    )
+    found, round_id = await cur.fetchone()
+    return bool(found), round_id
 
 
-def repo_eliminate_item(cur, *, item_id: uuid.UUID, round_id: uuid.UUID, team: TeamId):
-    cur.execute(
+async def repo_create_plan_rated_rounds(
+    cur,
+    *,
+    game_set: str,
+    plan_id: uuid.UUID,
+    rounds: List[Tuple[int, str, str, List[DatasetItem]]],
+) -> None:
+    """
+    Insert the rated rounds of a game plan, given as (plan_index, category,
+    prompt, items), with one statement for all rounds and their items.
+    """
+    await cur.execute(
         """
-        UPDATE items
-        SET eliminated = true, eliminated_by_team = %s
-        WHERE id = %s AND round_id = %s
+        WITH src AS (
+            SELECT uuid_generate_v4() AS id, s.plan_index, s.title, s.rating, s.ord
+            FROM unnest(%s::int[], %s::text[], %s::numeric[]) WITH ORDINALITY AS s(plan_index, title, rating, ord)
+        ), target AS (
+            SELECT DISTINCT ON (plan_index) plan_index, id
+            FROM src
+            ORDER BY plan_index, rating ASC, ord ASC
+        ), r AS (
+            INSERT INTO rounds (
+                game_set, category, prompt, kind, current_team, status, target_item_id, remaining_count,
+                item_count, plan_id, plan_index
+            )
+            SELECT %s, p.category, p.prompt, 'rated', 1, %s, target.id,
+                   n.n, n.n,
+                   %s, p.plan_index
+            FROM unnest(%s::int[], %s::text[], %s::text[]) AS p(plan_index, category, prompt)
+            JOIN target ON target.plan_index = p.plan_index
+            CROSS JOIN LATERAL (SELECT count(*) AS n FROM src WHERE src.plan_index = p.plan_index) n
+            RETURNING id, plan_index
+        )
+        INSERT INTO items (id, round_id, title, rating, secret_text, eliminated)
+        SELECT src.id, r.id, src.title, src.rating, NULL, false
+        FROM src
+        JOIN r ON r.plan_index = src.plan_index
+        """,
+        (
+            [index for index, _, _, items in rounds for _ in items],
+            [it.title for _, _, _, items in rounds for it in items],
+            [it.rating for _, _, _, items in rounds for it in items],
+            game_set,
+            STATUS_ACTIVE,
+            plan_id,
+            [index for index, _, _, _ in rounds],
+            [category for _, category, _, _ in rounds],
+            [prompt for _, _, prompt, _ in rounds],
+        ),
+    )
+
+
+async def repo_create_plan_template_rounds(
+    cur,
+    *,
+    game_set: str,
+    plan_id: uuid.UUID,
+    templates: List[Tuple[int, uuid.UUID]],
+) -> List[Tuple[int, bool, Optional[uuid.UUID]]]:
+    """
+    Copy templates, given as (plan_index, template_id), into rounds of a game
+    plan with a single statement; the batch form of
+    repo_create_round_from_template.
+
+    Returns (plan_index, template_found, round_id) per entry, round_id being
+    None for unplayable templates. Callers roll back unless every entry got a
+    round.
+    """
+    await cur.execute(
+        f"""
+        WITH req AS (
+            SELECT x.plan_index, x.template_id
+            FROM unnest(%s::int[], %s::uuid[]) AS x(plan_index, template_id)
+        ), tpl AS (
+            SELECT req.plan_index, t.id, t.name, t.prompt, t.kind, t.image_hash
+            FROM req
+            JOIN templates t ON t.id = req.template_id AND t.game_set = %s
+        ), src AS (
+            SELECT tpl.plan_index, uuid_generate_v4() AS id, ti.title, ti.rating, ti.secret_text, ti.is_target,
+                   ti.image_hash
+            FROM tpl
+            JOIN template_items ti ON ti.template_id = tpl.id
+        ), chk AS (
+            SELECT tpl.plan_index, {_TEMPLATE_PLAYABLE_SQL} AS playable
+            FROM tpl
+            LEFT JOIN src ON src.plan_index = tpl.plan_index
+            GROUP BY tpl.plan_index, tpl.kind
+        ), target AS (
+            SELECT DISTINCT ON (src.plan_index) src.plan_index, src.id
+            FROM src
+            JOIN tpl ON tpl.plan_index = src.plan_index
+            WHERE tpl.kind = 'rated' OR src.is_target
+            ORDER BY src.plan_index, src.rating ASC, src.title ASC
+        ), r AS (
+            INSERT INTO rounds (
+                game_set, category, prompt, kind, image_hash, current_team, status, target_item_id, remaining_count,
+                item_count, plan_id, plan_index, template_id
+            )
+            SELECT %s, tpl.name, tpl.prompt, tpl.kind, tpl.image_hash, 1, %s, target.id,
+                   n.n, n.n,
+                   %s, tpl.plan_index, tpl.id
+            FROM tpl
+            JOIN chk ON chk.plan_index = tpl.plan_index
+            JOIN target ON target.plan_index = tpl.plan_index
+            CROSS JOIN LATERAL (SELECT count(*) AS n FROM src WHERE src.plan_index = tpl.plan_index) n
+            WHERE chk.playable
+            RETURNING id, plan_index
+        ), ins AS (
+            INSERT INTO items (id, round_id, title, rating, secret_text, image_hash, eliminated)
+            SELECT
+                src.id,
+                r.id,
+                src.title,
+                CASE WHEN tpl.kind = 'rated' THEN src.rating END,
+                CASE WHEN tpl.kind IN ('manual', 'carousel') THEN src.secret_text END,
+                src.image_hash,
+                false
+            FROM src
+            JOIN r ON r.plan_index = src.plan_index
+            JOIN tpl ON tpl.plan_index = src.plan_index
+        )
+        SELECT req.plan_index, tpl.id IS NOT NULL, r.id
+        FROM req
+        LEFT JOIN tpl ON tpl.plan_index = req.plan_index
+        LEFT JOIN r ON r.plan_index = req.plan_index
+        ORDER BY req.plan_index
         """,
-        (team, item_id, round_id),
+        (
+            [index for index, _ in templates],
+            [template_id for _, template_id in templates],
+            game_set,
+            game_set,
+            STATUS_ACTIVE,
+            plan_id,
+        ),
     )
+    return [(index, bool(found), round_id) for index, found, round_id in await cur.fetchall()]
 
-def repo_remaining_items(cur, *, round_id: uuid.UUID, game_set: str) -> list[uuid.UUID]:
-    cur.execute(
+
+async def repo_load_game_plan(cur, *, plan_id: uuid.UUID, game_set: str):
+    """Return (current_index, [(round_id, kind, category, status), ...]) in plan order, or None."""
+    await cur.execute(
+        """
+        SELECT gp.current_index, r.id, r.kind, r.category, r.status
+        FROM game_plans gp
+        JOIN rounds r ON r.plan_id = gp.id
+        WHERE gp.id = %s AND gp.game_set = %s
+        ORDER BY r.plan_index
+        """,
+        (plan_id, game_set),
+    )
+    rows = await cur.fetchall()
+    if not rows:
+        return None
+    return rows[0][0], [row[1:] for row in rows]
+
+
+_ROUND_ITEMS_SQL = """
+    SELECT id, title, eliminated, rating, secret_text, eliminated_by_team, image_hash
+    FROM items
+    WHERE round_id = %s
+    ORDER BY title ASC
+"""
+_ROUND_ITEMS_SINCE_SQL = """
+    SELECT id, title, eliminated, rating, secret_text, eliminated_by_team, image_hash
+    FROM items
+    WHERE round_id = %s AND version > %s
+    ORDER BY title ASC
+"""
+
+
+async def repo_load_round(cur, *, round_id: uuid.UUID, game_set: str, since: Optional[int] = None):
+    """
+    Return (round_row, item_rows) for the response builder, or None.
+    With `since`, only items changed after that version are read.
+    """
+    await cur.execute(
         """
-        SELECT id
-        FROM items
-        WHERE round_id=%s AND game_set=%s AND eliminated_by_team IS NULL
+        SELECT id, category, prompt, kind, current_team, status, target_item_id, winner_team, loser_team,
+               image_hash, version
+        FROM rounds
+        WHERE id = %s AND game_set = %s
         """,
         (round_id, game_set),
     )
-    return [row["id"] for row in cur.fetchall()]
+    row = await cur.fetchone()
+    if not row:
+        return None
 
-def _round_to_response(round_id: uuid.UUID, game_set: str) -> RoundOut:
-    with db_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT id, category, prompt, kind, current_team, status, target_item_id, winner_team, loser_team, image_data
-                FROM rounds
-                WHERE id = %s AND game_set = %s
-                """,
-                (round_id, game_set),
-            )
-            row = cur.fetchone()
-            if not row:
-                raise HTTPException(status_code=404, detail="Round not found")
+    rid, status, version = row[0], row[5], row[10]
 
-            (
-                rid,
-                category,
-                prompt,
-                kind,
-                current_team,
-                status,
-                target_item_id,
-                winner_team,
-                loser_team,
-                image_data,
-            ) = row
-
-            cur.execute(
-                """
-                SELECT id, title, eliminated, rating, secret_text, eliminated_by_team, image_data
-                FROM items
-                WHERE round_id = %s
-                ORDER BY title ASC
-                """,
-                (rid,),
-            )
-            items_rows = cur.fetchall()
+    # The finishing turn reveals every item and the round never changes after
+    # that, so a client behind a finished round gets all items back.
+    if since is None or (str(status) == STATUS_FINISHED and since < int(version)):
+        await cur.execute(_ROUND_ITEMS_SQL, (rid,))
+    else:
+        await cur.execute(_ROUND_ITEMS_SINCE_SQL, (rid, since))
+    return row, await cur.fetchall()
+
+
+def _build_round_response(row, items_rows, since: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Full round payload (RoundOut), or a RoundDelta when `since` (a version
+    the client already holds) is given, as a plain dict for FastJSONResponse.
+    """
+    (
+        rid,
+        category,
+        prompt,
+        kind,
+        current_team,
+        status,
+        target_item_id,
+        winner_team,
+        loser_team,
+        image_hash,
+        version,
+    ) = row
     reveal_all = str(status) == STATUS_FINISHED
-    items: List[ItemOut] = []
-    for iid, title, eliminated, rating, secret_text, eliminated_by_team, item_image_data in items_rows:
+
+    items: List[Dict[str, Any]] = []
+    for iid, title, eliminated, rating, secret_text, eliminated_by_team, item_image_hash in items_rows:
         show_hidden = reveal_all or bool(eliminated)
 
         # Carousel reveals images during active play.
         show_image = (str(kind) == "carousel") or show_hidden
 
         items.append(
-            ItemOut(
-                id=iid,
-                title=title,
-                eliminated=bool(eliminated),
-                eliminated_by_team=int(eliminated_by_team) if eliminated_by_team is not None else None,
-                rating=rating if (show_hidden and rating is not None) else None,
-                secret_text=secret_text if (show_hidden and secret_text is not None) else None,
-                image_data=item_image_data if (show_image and item_image_data is not None) else None,
-                is_target=(iid == target_item_id) if reveal_all else None,
-            )
+            {
+                "id": iid,
+                "title": title,
+                "eliminated": bool(eliminated),
+                "eliminated_by_team": int(eliminated_by_team) if eliminated_by_team is not None else None,
+                "rating": rating if (show_hidden and rating is not None) else None,
+                "secret_text": secret_text if (show_hidden and secret_text is not None) else None,
+                "is_target": (iid == target_item_id) if reveal_all else None,
+                "image_data": thumb_url(item_image_hash) if show_image else None,
+            }
         )
 
-    return RoundOut(
-        id=rid,
-        category=category,
-        prompt=prompt,
-        kind=str(kind),
-        current_team=int(current_team),
-        status=str(status),
-        winner_team=int(winner_team) if winner_team is not None else None,
-        loser_team=int(loser_team) if loser_team is not None else None,
-        items=items,
-        image_data=image_data,
-    )
+    if since is not None:
+        return {
+            "id": rid,
+            "version": int(version),
+            "current_team": int(current_team),
+            "status": str(status),
+            "winner_team": int(winner_team) if winner_team is not None else None,
+            "loser_team": int(loser_team) if loser_team is not None else None,
+            "items": items,
+        }
+
+    return {
+        "id": rid,
+        "category": category,
+        "prompt": prompt,
+        "kind": str(kind),
+        "current_team": int(current_team),
+        "status": str(status),
+        "winner_team": int(winner_team) if winner_team is not None else None,
+        "loser_team": int(loser_team) if loser_team is not None else None,
+        "items": items,
+        "image_data": thumb_url(image_hash),
+        "version": int(version),
+    }
+
+
+async def _load_round_response(
+    cur,
+    round_id: uuid.UUID,
+    game_set: str,
+    since: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Read through the caller's cursor, so a round created in the current transaction is visible."""
+    loaded = await repo_load_round(cur, round_id=round_id, game_set=game_set, since=since)
+    if loaded is None:
+        raise HTTPException(status_code=404, detail="Round not found")
+    return _build_round_response(*loaded, since)
+
+
+async def _round_to_response(
+    round_id: uuid.UUID,
+    game_set: str,
+    since: Optional[int] = None,
+) -> Dict[str, Any]:
+    if hot_rounds is not None:
+        return _build_round_response(*await hot_rounds.snapshot(round_id, game_set, since), since)
+
+    async with async_db_conn() as conn:
+        async with conn.cursor() as cur:
+            return await _load_round_response(cur, round_id, game_set, since)
+
+
+if ROUND_ENGINE == "memory" and web_concurrency() > 1:
+    raise RuntimeError("ROUND_ENGINE=memory owns rounds in a single process; run it with WEB_CONCURRENCY=1")  # noqa: TRY003
+
+hot_rounds: HotRoundEngine | None = (
+    HotRoundEngine(next_turn=next_turn, apply_turn=repo_eliminate_item) if ROUND_ENGINE == "memory" else None
+)
+
+round_broker = RoundBroker(build_delta=_round_to_response)
+# (game_set, round_id) -> (version, encoded RoundOut); finished rounds never
+# change, but retention deletes them.
+finished_rounds = EncodedCache(FINISHED_ROUND_CACHE_SIZE)
+template_cache = TemplateCache()
+
+
+async def _drop_deleted_round(payload: str) -> None:
+    try:
+        msg = orjson.loads(payload)
+        finished_rounds.discard((str(msg["game_set"]), uuid.UUID(msg["round_id"])))
+    except Exception:
+        logger.exception("finished rounds: failed to handle notification %r", payload)
+        finished_rounds.clear()
+
+
+pg_listener = PgListener()
+pg_listener.on(ROUND_CHANNEL, round_broker.dispatch)
+pg_listener.on(TEMPLATE_CHANNEL, template_cache.dispatch)
+pg_listener.on(ROUND_DELETE_CHANNEL, _drop_deleted_round)
+# Invalidations sent while we were disconnected are lost.
+pg_listener.on_connect(template_cache.clear)
+pg_listener.on_connect(finished_rounds.clear)
+
+retention_job = RetentionJob()
+
+SSE_KEEPALIVE_SECONDS = 15.0
+
+
+def round_etag(version: int) -> str:
+    # Every change to a round (items included) bumps its version.
+    return f'"round-{version}"'
+
+
+_ROUND_VERSION_SQL = "SELECT version FROM rounds WHERE id=%s AND game_set=%s"
+
+
+async def _round_version(round_id: uuid.UUID, game_set: str) -> int:
+    """Current version only: enough to answer a conditional GET without reading items."""
+    if hot_rounds is not None:
+        return (await hot_rounds.get(round_id, game_set)).version
+
+    async with async_db_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(_ROUND_VERSION_SQL, (round_id, game_set))
+            row = await cur.fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail="Round not found")
+    return int(row[0])
+
+
+_NIL_ID = uuid.UUID(int=0)
+
+
+async def warm_connection(conn) -> None:
+    """
+    Pool `configure` hook: prepare the statements behind eliminate and round
+    reads on every new connection, so the first requests it serves skip
+    parsing and planning. They run against a nil id, so they match no rows
+    (committing rather than rolling back keeps them prepared).
+    """
+    threshold = conn.prepare_threshold
+    if threshold is None:
+        return  # server-side prepared statements are turned off
+    conn.prepare_threshold = 0
+    try:
+        async with conn.transaction():
+            async with conn.cursor() as cur:
+                await repo_get_round(cur, round_id=_NIL_ID, game_set="", for_update=True)
+                for winner, loser in ((None, None), (1, 2)):
+                    await repo_eliminate_item(
+                        cur, item_id=_NIL_ID, round_id=_NIL_ID, team=1, version=1,
+                        current_team=2, status=STATUS_ACTIVE, winner_team=winner, loser_team=loser,
+                    )
+                await repo_load_round(cur, round_id=_NIL_ID, game_set="")
+                await cur.execute(_ROUND_ITEMS_SQL, (_NIL_ID,))
+                await cur.execute(_ROUND_ITEMS_SINCE_SQL, (_NIL_ID, 0))
+                await cur.execute(_ROUND_VERSION_SQL, (_NIL_ID, ""))
+    except Exception:
+        # A cold connection still works; don't let warm-up take it out of the pool.
+        logger.exception("failed to prepare statements on a new connection")
+    finally:
+        conn.prepare_threshold = threshold
+
+
+def _sse_event(version: int, payload: str) -> str:
+    return f"id: {version}\nevent: round\ndata: {payload}\n\n"
 
 
 # =========================
 # Core round endpoints
 # =========================
 @app.post("/api/rounds", response_model=RoundOut)
-def create_round(req: CreateRoundRequest, game_set: str = Depends(get_game_set),) -> Any:
-    category = req.category.strip().lower()
-    if category not in DATASETS:
+async def create_round(req: CreateRoundRequest, game_set: str = Depends(get_game_set),) -> Any:
+    dataset = get_dataset(req.category)
+    if dataset is None:
         raise HTTPException(status_code=400, detail="Unknown category")
-
-    prompt = str(DATASETS[category]["prompt"])
-    source_items = list(DATASETS[category]["items"])  # type: ignore[assignment]
-    if len(source_items) < 11:
+    if dataset.count < 11:
         raise HTTPException(status_code=500, detail="Dataset must have at least 11 items")
 
-    picked = random.sample(source_items, 11)
-    target = min(picked, key=lambda x: x.rating)
+    category = dataset.name
+    prompt = dataset.prompt
+    # The first draw loads (or maps) the dataset; keep that off the event loop.
+    picked = await asyncio.to_thread(dataset.sample, 11, req.difficulty)
 
-    with db_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO rounds (game_set, category, prompt, kind, current_team, status, target_item_id)
-                VALUES (%s, %s, %s, 'rated', 1, %s, '00000000-0000-0000-0000-000000000000')
-                RETURNING id
-                """,
-                (game_set, category, prompt, STATUS_ACTIVE),
+    async with async_db_conn() as conn:
+        async with conn.cursor() as cur:
+            round_id = await repo_create_round_from_items(
+                cur,
+                game_set=game_set,
+                category=category,
+                prompt=prompt,
+                titles=[it.title for it in picked],
+                ratings=[it.rating for it in picked],
             )
-            (round_id,) = cur.fetchone()
-            item_ids: Dict[str, uuid.UUID] = {}
-            for it in picked:
-                cur.execute(
-                    """
-                    INSERT INTO items (round_id, title, rating, secret_text, eliminated)
-                    VALUES (%s, %s, %s, NULL, false)
-                    RETURNING id
-                    """,
-                    (round_id, it.title, it.rating),
-                )
-                (iid,) = cur.fetchone()
-                item_ids[it.title] = iid
+            out = await _load_round_response(cur, round_id, game_set)
+        await conn.commit()
 
-            target_item_id = item_ids[target.title]
-            cur.execute(
-                "UPDATE rounds SET target_item_id = %s WHERE id = %s",
-                (target_item_id, round_id),
-            )
+    ROUNDS_CREATED.labels("rated").inc()
+    return FastJSONResponse(out)
+
+
+def _round_json(round_id: uuid.UUID, game_set: str, out: Dict[str, Any], since: Optional[int]) -> bytes:
+    """Encode a round payload, keeping full payloads of finished rounds for later reads."""
+    body = dumps(out)
+    if since is None and out["status"] == STATUS_FINISHED:
+        finished_rounds.put((game_set, round_id), (out["version"], body))
+    return body
 
-        conn.commit()
 
-    return _round_to_response(round_id, game_set)
+@app.get("/api/rounds/{round_id}", response_model=Union[RoundOut, RoundDelta])
+async def get_round(
+    round_id: uuid.UUID,
+    since: Optional[int] = Query(default=None, ge=0),
+    if_none_match: str | None = Header(default=None),
+    game_set: str = Depends(get_game_set),
+) -> Any:
+    finished = finished_rounds.get((game_set, round_id))
+    if finished is not None:
+        version, body = finished
+        etag = round_etag(version)
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        if since is None:
+            return FastJSONResponse(body, headers={"ETag": etag, **PRIVATE_REVALIDATE_HEADERS})
+    elif if_none_match:
+        etag = round_etag(await _round_version(round_id, game_set))
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    out = await _round_to_response(round_id, game_set, since)
+    return FastJSONResponse(
+        _round_json(round_id, game_set, out, since),
+        headers={"ETag": round_etag(out["version"]), **PRIVATE_REVALIDATE_HEADERS},
+    )
 
 
-@app.get("/api/rounds/{round_id}", response_model=RoundOut)
-def get_round(round_id: uuid.UUID, game_set: str = Depends(get_game_set)) -> Any:
-    return _round_to_response(round_id, game_set)
+@app.get("/api/rounds/{round_id}/events")
+async def round_events(
+    round_id: uuid.UUID,
+    request: Request,
+    since: Optional[int] = Query(default=None, ge=0),
+    last_event_id: str | None = Header(default=None),
+    game_set: str = Depends(get_stream_game_set),
+) -> StreamingResponse:
+    """
+    Server-Sent Events stream of round changes. The first event is the full
+    round (or a delta when `since` / Last-Event-ID is given); every later
+    event is a RoundDelta. The stream ends once the round is finished.
+    """
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+
+    # Subscribe first: a turn notified while the first event is being built
+    # is queued, then skipped below if that event already includes it.
+    sub = round_broker.subscribe(round_id, game_set, since or 0)
+    try:
+        first = await _round_to_response(round_id, game_set, since)
+    except BaseException:
+        round_broker.unsubscribe(sub)
+        raise
+    sub.version = first["version"]
+
+    async def stream():
+        try:
+            yield _sse_event(first["version"], dumps(first).decode())
+            status = first["status"]
+            while status == STATUS_ACTIVE:
+                try:
+                    msg = await asyncio.wait_for(sub.queue.get(), SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ": keepalive\n\n"
+                    continue
+                if msg is None:
+                    return
+
+                version, status, payload = msg
+                if version <= sub.version:
+                    continue
+                if version - 1 > sub.version:
+                    # Missed a turn (several landed at once): catch up from our own version.
+                    delta = await _round_to_response(round_id, game_set, sub.version)
+                    version, status, payload = delta["version"], delta["status"], dumps(delta).decode()
+
+                sub.version = version
+                yield _sse_event(version, payload)
+        finally:
+            round_broker.unsubscribe(sub)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
-@app.post("/api/rounds/{round_id}/eliminate", response_model=RoundOut)
-def eliminate(round_id: uuid.UUID, req: EliminateRequest, game_set: str = Depends(get_game_set)) -> Any:
-    with db_conn() as conn:
-        with conn.cursor() as cur:
-            row = repo_get_round(cur, round_id=round_id, game_set=game_set)
+@app.post("/api/rounds/{round_id}/eliminate", response_model=Union[RoundOut, RoundDelta])
+async def eliminate(
+    round_id: uuid.UUID,
+    req: EliminateRequest,
+    compact: bool = False,
+    since: Optional[int] = Query(default=None, ge=0),
+    game_set: str = Depends(get_game_set),
+) -> Any:
+    """
+    `compact=true` answers with a RoundDelta relative to `since`
+    (default: the version the round had before this turn).
+    """
+    if hot_rounds is not None:
+        prev_version = await hot_rounds.eliminate(round_id, game_set, req.item_id)
+        ROUND_ELIMINATIONS.labels((await hot_rounds.get(round_id, game_set)).kind).inc()
+        # Turns reach Postgres (and its NOTIFY) later; tell local streams now.
+        await round_broker.publish(round_id, game_set, prev_version + 1)
+        if not compact:
+            since = None
+        elif since is None:
+            since = prev_version
+        out = await _round_to_response(round_id, game_set, since)
+        return FastJSONResponse(_round_json(round_id, game_set, out, since))
+
+    async with async_db_conn() as conn:
+        async with conn.cursor() as cur:
+            row = await repo_get_round(cur, round_id=round_id, game_set=game_set, for_update=True)
             if not row:
                 raise HTTPException(status_code=404, detail="Round not found")
-            _rid, kind, status, current_team, target_item_id = row
+            _rid, kind, status, current_team, target_item_id, version, remaining = row
             if str(status) != STATUS_ACTIVE:
                 raise HTTPException(status_code=409, detail="Round already finished")
 
-            cur.execute(
-                """
-                SELECT eliminated
-                FROM items
-                WHERE id = %s AND round_id = %s
-                """,
-                (req.item_id, round_id),
+            current_team = int(current_team)
+            next_version = int(version) + 1
+            if not compact:
+                since = None
+            elif since is None:
+                since = int(version)
+
+            next_team, next_status, winner, loser = next_turn(
+                current_team, int(remaining), req.item_id == target_item_id
             )
-            item_row = cur.fetchone()
-            if not item_row:
-                raise HTTPException(status_code=404, detail="Item not found")
-            if bool(item_row[0]):
-                raise HTTPException(status_code=409, detail="Item already eliminated")
-            repo_eliminate_item(
+
+            applied = await repo_eliminate_item(
                 cur,
                 item_id=req.item_id,
                 round_id=round_id,
                 team=current_team,
+                version=next_version,
+                current_team=next_team,
+                status=next_status,
+                winner_team=winner,
+                loser_team=loser,
             )
+            if not applied:
+                await cur.execute("SELECT 1 FROM items WHERE id = %s AND round_id = %s", (req.item_id, round_id))
+                if not await cur.fetchone():
+                    raise HTTPException(status_code=404, detail="Item not found")
+                raise HTTPException(status_code=409, detail="Item already eliminated")
 
-            # Picked the target -> immediate loss for current team.
-            if req.item_id == target_item_id:
-                loser = int(current_team)
-                winner, loser = winner_loser_from_loser(loser)
-                _finish_round(
-                    cur,
-                    round_id=round_id,
-                    game_set=game_set,
-                    winner_team=winner,
-                    loser_team=loser,
-                )
-                conn.commit()
-                return _round_to_response(round_id, game_set)
+            # Release the round lock before building the response.
+            await conn.commit()
+            ROUND_ELIMINATIONS.labels(str(kind)).inc()
+            out = await _load_round_response(cur, round_id, game_set, since)
+            return FastJSONResponse(_round_json(round_id, game_set, out, since))
 
-            # Check remaining items
-            cur.execute(
-                """
-                SELECT COUNT(*)
-                FROM items
-                WHERE round_id = %s AND eliminated = false
-                """,
-                (round_id,),
-            )
-            (remaining,) = cur.fetchone()
 
-            if int(remaining) == 1:
-                cur.execute(
-                    "SELECT id FROM items WHERE round_id = %s AND eliminated = false",
-                    (round_id,),
-                )
-                remaining_row = cur.fetchone()
-                remaining_item_id = remaining_row[0] if remaining_row else None
-
-                if remaining_item_id == target_item_id:
-                    _finish_round(
-                        cur,
-                        round_id=round_id,
-                        game_set=game_set,
-                        winner_team=None,
-                        loser_team=None,
-                    )
-                    conn.commit()
-                    return _round_to_response(round_id, game_set)
-
-                winner = int(current_team)
-                loser = other_team(winner)
-                _finish_round(
-                    cur,
-                    round_id=round_id,
-                    game_set=game_set,
-                    winner_team=winner,
-                    loser_team=loser,
-                )
-                conn.commit()
-                return _round_to_response(round_id, game_set)
+ROUND_PAGE_SIZE = 50
+ROUND_PAGE_MAX = 500
 
-            next_team = other_team(current_team)
-            cur.execute(
-                "UPDATE rounds SET current_team=%s WHERE id=%s AND game_set=%s",
-                (next_team, round_id, game_set),
-            )
 
-        conn.commit()
+async def repo_list_rounds(
+    cur,
+    *,
+    game_set: str,
+    status: Optional[str],
+    kind: Optional[str],
+    after: Optional[tuple[int, uuid.UUID]],
+    limit: int,
+):
+    """
+    One keyset page of round summaries, newest first. Served by
+    idx_rounds_game_set_created, or idx_rounds_game_set_status with `status`.
+    """
+    where = ["game_set = %s"]
+    params: List[Any] = [game_set]
+    if status:
+        where.append("status = %s")
+        params.append(status)
+    if kind:
+        where.append("kind = %s")
+        params.append(kind)
+    if after is not None:
+        where.append("(created_at, id) < (timestamptz 'epoch' + %s * interval '1 microsecond', %s)")
+        params.extend(after)
+
+    await cur.execute(
+        f"""
+        SELECT id, kind, category, prompt, status, created_at, current_team, winner_team, loser_team,
+               item_count, remaining_count, template_id, plan_id, plan_index,
+               (extract(epoch FROM created_at) * 1000000)::bigint
+        FROM rounds
+        WHERE {" AND ".join(where)}
+        ORDER BY created_at DESC, id DESC
+        LIMIT %s
+        """,
+        (*params, limit),
+    )
+    return await cur.fetchall()
 
-    return _round_to_response(round_id, game_set)
+
+@app.get("/api/rounds", response_model=RoundPage)
+async def list_rounds(
+    status: Optional[RoundStatus] = None,
+    kind: Optional[RoundKind] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=ROUND_PAGE_SIZE, ge=1, le=ROUND_PAGE_MAX),
+    game_set: str = Depends(get_game_set),
+) -> Any:
+    """
+    The game set's rounds, newest first, as summaries; open one with GET /api/rounds/{id}.
+
+    With ROUND_ENGINE=memory the stored rows trail live rounds until the
+    write-behind flushes them. The state of each round on the page is taken
+    from the engine, and rounds the engine has finished are left out of
+    `status=active` pages. A round finished in memory only appears on
+    `status=finished` pages once flushed, so such a page can be short.
+    """
+    after = _decode_cursor(cursor) if cursor else None
+    async with async_db_conn() as conn:
+        async with conn.cursor() as cur:
+            rows = await repo_list_rounds(
+                cur, game_set=game_set, status=status, kind=kind, after=after, limit=limit + 1
+            )
+
+    summaries = []
+    for r in rows[:limit]:
+        summary = {
+            "id": r[0],
+            "kind": r[1],
+            "category": r[2],
+            "prompt": r[3],
+            "status": r[4],
+            "created_at": r[5],
+            "current_team": r[6],
+            "winner_team": r[7],
+            "loser_team": r[8],
+            "item_count": r[9],
+            "remaining_count": r[10],
+            "template_id": r[11],
+            "plan_id": r[12],
+            "plan_index": r[13],
+        }
+        live = hot_rounds.cached_state(r[0]) if hot_rounds is not None else None
+        if live is not None:
+            (
+                summary["remaining_count"],
+                summary["status"],
+                summary["current_team"],
+                summary["winner_team"],
+                summary["loser_team"],
+            ) = live
+            if status and summary["status"] != status:
+                continue
+        summaries.append(summary)
+
+    page = {
+        "rounds": summaries,
+        "next_cursor": _encode_cursor(rows[limit - 1][14], rows[limit - 1][0]) if len(rows) > limit else None,
+    }
+    return FastJSONResponse(page, headers=PRIVATE_REVALIDATE_HEADERS)
 
 
 # =========================
 # Templates endpoints
 # =========================
-@app.get("/api/templates", response_model=Dict[str, List[TemplateSummary]])
-def list_templates(game_set: str = Depends(get_game_set)) -> Dict[str, List[TemplateSummary]]:
-    with db_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                SELECT t.id, t.name, t.prompt, t.kind, COUNT(i.id) AS item_count
-                FROM templates t
-                LEFT JOIN template_items i ON i.template_id = t.id
-                WHERE t.game_set = %s
-                GROUP BY t.id, t.name, t.prompt, t.kind
-                ORDER BY t.updated_at DESC, t.created_at DESC
-                """,
-                (game_set,),
-            )
-            rows = cur.fetchall()
+def _template_item_columns(kind: str, it: TemplateItemIn):
+    """(title, rating, secret_text, is_target) as stored for a template of `kind`."""
+    is_manual_like = kind in ("manual", "carousel")
+    return (
+        it.title.strip(),
+        it.rating if kind == "rated" else None,
+        (it.secret_text.strip() if it.secret_text else None) if is_manual_like else None,
+        bool(it.is_target) if is_manual_like else False,
+    )
+
+
+async def repo_insert_template_items(
+    cur,
+    *,
+    template_id: uuid.UUID,
+    kind: str,
+    items: List[TemplateItemIn],
+    image_hashes: List[Optional[str]],
+) -> None:
+    """One set-based INSERT (the item_count trigger then runs once per statement)."""
+    if not items:
+        return
+    cols = [_template_item_columns(kind, it) for it in items]
+    await cur.execute(
+        """
+        INSERT INTO template_items (template_id, title, rating, secret_text, is_target, image_hash)
+        SELECT %s, v.title, v.rating, v.secret_text, v.is_target, v.image_hash
+        FROM unnest(%s::text[], %s::numeric[], %s::text[], %s::boolean[], %s::text[])
+             AS v(title, rating, secret_text, is_target, image_hash)
+        """,
+        (
+            template_id,
+            [c[0] for c in cols],
+            [c[1] for c in cols],
+            [c[2] for c in cols],
+            [c[3] for c in cols],
+            list(image_hashes),
+        ),
+    )
+
+
+def template_etag(updated_us: int) -> str:
+    # templates.updated_at (microseconds) is bumped by trigger on every edit.
+    return f'"tpl-{updated_us}"'
+
+
+async def repo_get_template_head(cur, *, template_id: uuid.UUID, game_set: str):
+    """Template row without items: (id, name, prompt, kind, image_hash, updated_at in microseconds)."""
+    await cur.execute(
+        """
+        SELECT id, name, prompt, kind, image_hash, (extract(epoch FROM updated_at) * 1000000)::bigint
+        FROM templates
+        WHERE id=%s AND game_set=%s
+        """,
+        (template_id, game_set),
+    )
+    return await cur.fetchone()
+
+
+async def _build_template_out(cur, tpl) -> Dict[str, Any]:
+    """TemplateOut payload, as a plain dict for FastJSONResponse."""
+    await cur.execute(
+        """
+        SELECT id, title, rating, secret_text, is_target, image_hash
+        FROM template_items
+        WHERE template_id=%s
+        ORDER BY title ASC
+        """,
+        (tpl[0],),
+    )
+    items = await cur.fetchall()
 
     return {
-        "templates": [
-            TemplateSummary(
-                id=r[0],
-                name=r[1],
-                prompt=r[2],
-                kind=r[3],
-                item_count=int(r[4]),
-            )
-            for r in rows
-        ]
+        "id": tpl[0],
+        "name": tpl[1],
+        "prompt": tpl[2],
+        "kind": tpl[3],
+        "items": [
+            {
+                "title": t,
+                "rating": r,
+                "secret_text": s,
+                "is_target": bool(is_target),
+                "image_data": thumb_url(img),
+                "id": item_id,
+            }
+            for (item_id, t, r, s, is_target, img) in items
+        ],
+        "image_data": thumb_url(tpl[4]),
     }
 
 
-@app.get("/api/templates/{template_id}", response_model=TemplateOut)
-def get_template(template_id: uuid.UUID, game_set: str = Depends(get_game_set),) -> Any:
-    with db_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                "SELECT id, name, prompt, kind, image_data FROM templates WHERE id=%s AND game_set=%s",
-                (template_id, game_set),
-            )
-            tpl = cur.fetchone()
+async def _template_to_response(template_id: uuid.UUID, game_set: str) -> Dict[str, Any]:
+    async with async_db_conn() as conn:
+        async with conn.cursor() as cur:
+            tpl = await repo_get_template_head(cur, template_id=template_id, game_set=game_set)
             if not tpl:
                 raise HTTPException(status_code=404, detail="Template not found")
+            return await _build_template_out(cur, tpl)
 
-            cur.execute(
-                """
-                SELECT title, rating, secret_text, is_target, image_data
-                FROM template_items
-                WHERE template_id=%s
-                ORDER BY title ASC
-                """,
-                (template_id,),
-            )
-            items = cur.fetchall()
-
-    return TemplateOut(
-        id=tpl[0],
-        name=tpl[1],
-        prompt=tpl[2],
-        kind=tpl[3],
-        image_data=tpl[4],
-        items=[
-            TemplateItemIn(
-                title=t,
-                rating=r,
-                secret_text=s,
-                is_target=bool(is_target),
-                image_data=img,
-            )
-            for (t, r, s, is_target, img) in items
-        ],
+
+TEMPLATE_PAGE_SIZE = 50
+TEMPLATE_PAGE_MAX = 200
+
+
+async def repo_list_templates(
+    cur,
+    *,
+    game_set: str,
+    q: Optional[str],
+    kind: Optional[str],
+    after: Optional[tuple[int, uuid.UUID]],
+    limit: int,
+):
+    """
+    One keyset page, newest first: (id, name, prompt, kind, item_count, updated_at in microseconds).
+    Served by idx_templates_game_set_updated; `q` by the trigram index on name/prompt.
+    """
+    where = ["game_set = %s"]
+    params: List[Any] = [game_set]
+    if kind:
+        where.append("kind = %s")
+        params.append(kind)
+    if q:
+        where.append("(name || ' ' || prompt) ILIKE %s")
+        params.append("%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+    if after is not None:
+        where.append("(updated_at, id) < (timestamptz 'epoch' + %s * interval '1 microsecond', %s)")
+        params.extend(after)
+
+    await cur.execute(
+        f"""
+        SELECT id, name, prompt, kind, item_count, (extract(epoch FROM updated_at) * 1000000)::bigint
+        FROM templates
+        WHERE {" AND ".join(where)}
+        ORDER BY updated_at DESC, id DESC
+        LIMIT %s
+        """,
+        (*params, limit),
     )
+    return await cur.fetchall()
+
+
+@app.get("/api/templates", response_model=TemplatePage)
+async def list_templates(
+    q: Optional[str] = Query(default=None, max_length=100),
+    kind: Optional[TemplateKind] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(default=TEMPLATE_PAGE_SIZE, ge=1, le=TEMPLATE_PAGE_MAX),
+    if_none_match: str | None = Header(default=None),
+    game_set: str = Depends(get_game_set),
+) -> Any:
+    q = q.strip() if q else None
+    after = _decode_cursor(cursor) if cursor else None
+    page_key = ("list", q, kind, cursor, limit)
+
+    cached = template_cache.get(game_set, page_key)
+    if cached is None:
+        generation = template_cache.generation(game_set)
+        async with async_db_conn() as conn:
+            async with conn.cursor() as cur:
+                # Bumped by trigger on every template insert/update/delete in the game set.
+                await cur.execute("SELECT templates_version FROM game_sets WHERE name = %s", (game_set,))
+                row = await cur.fetchone()
+                etag = f'"tpls-{row[0] if row else 0}"'
+                if etag_matches(if_none_match, etag):
+                    return not_modified(etag)
+
+                rows = await repo_list_templates(
+                    cur, game_set=game_set, q=q, kind=kind, after=after, limit=limit + 1
+                )
+
+        page = {
+            "templates": [
+                {"id": r[0], "name": r[1], "prompt": r[2], "kind": r[3], "item_count": int(r[4])}
+                for r in rows[:limit]
+            ],
+            "next_cursor": (
+                _encode_cursor(rows[limit - 1][5], rows[limit - 1][0]) if len(rows) > limit else None
+            ),
+        }
+        cached = (etag, dumps(page))
+        template_cache.put(game_set, page_key, cached, generation)
+
+    etag, body = cached
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return FastJSONResponse(body, headers={"ETag": etag, **PRIVATE_REVALIDATE_HEADERS})
+
+
+@app.get("/api/templates/{template_id}", response_model=TemplateOut)
+async def get_template(
+    template_id: uuid.UUID,
+    if_none_match: str | None = Header(default=None),
+    game_set: str = Depends(get_game_set),
+) -> Any:
+    cached = template_cache.get(game_set, template_id)
+    if cached is None:
+        generation = template_cache.generation(game_set)
+        async with async_db_conn() as conn:
+            async with conn.cursor() as cur:
+                tpl = await repo_get_template_head(cur, template_id=template_id, game_set=game_set)
+                if not tpl:
+                    raise HTTPException(status_code=404, detail="Template not found")
+
+                etag = template_etag(tpl[5])
+                if etag_matches(if_none_match, etag):
+                    return not_modified(etag)
+                cached = (etag, dumps(await _build_template_out(cur, tpl)))
+        template_cache.put(game_set, template_id, cached, generation)
+
+    etag, body = cached
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    return FastJSONResponse(body, headers={"ETag": etag, **PRIVATE_REVALIDATE_HEADERS})
 
 
 @app.post("/api/templates", response_model=TemplateOut)
-def create_template(body: TemplateCreate, game_set: str = Depends(get_game_set),) -> Any:
+async def create_template(body: TemplateCreate, game_set: str = Depends(get_game_set),) -> Any:
     _validate_template(body.kind, body.items)
 
-    with db_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
+    async with async_db_conn() as conn:
+        async with conn.cursor() as cur:
+            image_hash = await store_image(cur, body.image_data)
+            item_hashes = await store_images(cur, [it.image_data for it in body.items])
+
+            await cur.execute(
                 """
-                INSERT INTO templates (game_set, name, prompt, kind, image_data)
+                INSERT INTO templates (game_set, name, prompt, kind, image_hash)
                 VALUES (%s, %s, %s, %s, %s)
                 RETURNING id
                 """,
-                (game_set, body.name.strip(), body.prompt.strip(), body.kind, body.image_data),
+                (game_set, body.name.strip(), body.prompt.strip(), body.kind, image_hash),
             )
-            (tpl_id,) = cur.fetchone()
-
-            for it in body.items:
-                is_manual_like = body.kind in ("manual", "carousel")
-
-                rating = it.rating if body.kind == "rated" else None
-                secret_text = (it.secret_text.strip() if it.secret_text else None) if is_manual_like else None
-                is_target = bool(it.is_target) if is_manual_like else False
-                item_image = it.image_data
+            (tpl_id,) = await cur.fetchone()
 
-                cur.execute(
-                    """
-                    INSERT INTO template_items (template_id, title, rating, secret_text, is_target, image_data)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                    """,
-                    (tpl_id, it.title.strip(), rating, secret_text, is_target, item_image),
-                )
+            await repo_insert_template_items(
+                cur, template_id=tpl_id, kind=body.kind, items=body.items, image_hashes=item_hashes
+            )
 
-        conn.commit()
+        await conn.commit()
+    template_cache.invalidate(game_set, tpl_id)
 
-    return get_template(tpl_id, game_set)
+    return FastJSONResponse(await _template_to_response(tpl_id, game_set))
 
 
 @app.put("/api/templates/{template_id}", response_model=TemplateOut)
-def update_template(template_id: uuid.UUID, body: TemplateCreate, game_set: str = Depends(get_game_set),) -> Any:
+async def update_template(template_id: uuid.UUID, body: TemplateCreate, game_set: str = Depends(get_game_set),) -> Any:
     _validate_template(body.kind, body.items)
 
-    with db_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute("SELECT 1 FROM templates WHERE id=%s AND game_set=%s", (template_id, game_set))
-            if not cur.fetchone():
+    async with async_db_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT 1 FROM templates WHERE id=%s AND game_set=%s", (template_id, game_set))
+            if not await cur.fetchone():
                 raise HTTPException(status_code=404, detail="Template not found")
 
-            cur.execute(
+            image_hash = await store_image(cur, body.image_data)
+            item_hashes = await store_images(cur, [it.image_data for it in body.items])
+
+            await cur.execute(
                 """
                 UPDATE templates
-                SET name=%s, prompt=%s, kind=%s, image_data=%s
+                SET name=%s, prompt=%s, kind=%s, image_hash=%s
                 WHERE id=%s AND game_set=%s
                 """,
-                (body.name.strip(), body.prompt.strip(), body.kind, body.image_data, template_id, game_set)
+                (body.name.strip(), body.prompt.strip(), body.kind, image_hash, template_id, game_set)
+            )
+
+            await cur.execute("DELETE FROM template_items WHERE template_id=%s", (template_id,))
+
+            await repo_insert_template_items(
+                cur, template_id=template_id, kind=body.kind, items=body.items, image_hashes=item_hashes
             )
 
-            cur.execute("DELETE FROM template_items WHERE template_id=%s", (template_id,))
+        await conn.commit()
+    template_cache.invalidate(game_set, template_id)
 
-            for it in body.items:
-                is_manual_like = body.kind in ("manual", "carousel")
+    return FastJSONResponse(await _template_to_response(template_id, game_set))
 
-                rating = it.rating if body.kind == "rated" else None
-                secret_text = (it.secret_text.strip() if it.secret_text else None) if is_manual_like else None
-                is_target = bool(it.is_target) if is_manual_like else False
-                item_image = it.image_data
 
-                cur.execute(
+@app.patch("/api/templates/{template_id}", response_model=TemplateOut)
+async def patch_template(template_id: uuid.UUID, body: TemplatePatch, game_set: str = Depends(get_game_set),) -> Any:
+    touched = {u.id for u in body.update}
+    if len(touched) != len(body.update) or touched & set(body.remove):
+        raise HTTPException(status_code=400, detail="Each item may be updated or removed only once")
+
+    async with async_db_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                "SELECT kind FROM templates WHERE id=%s AND game_set=%s FOR UPDATE",
+                (template_id, game_set),
+            )
+            row = await cur.fetchone()
+            if not row:
+                raise HTTPException(status_code=404, detail="Template not found")
+            old_kind = str(row[0])
+            kind = body.kind or old_kind
+
+            await cur.execute(
+                """
+                SELECT id, title, rating, secret_text, is_target, image_hash
+                FROM template_items
+                WHERE template_id=%s
+                """,
+                (template_id,),
+            )
+            current = {
+                r[0]: TemplateItemIn(
+                    title=r[1],
+                    rating=r[2],
+                    secret_text=r[3],
+                    is_target=bool(r[4]),
+                    image_data=thumb_url(r[5]),
+                )
+                for r in await cur.fetchall()
+            }
+            if (touched | set(body.remove)) - current.keys():
+                raise HTTPException(status_code=404, detail="Template item not found")
+
+            # Validate the template as it will look after the patch.
+            for upd in body.update:
+                if "title" in upd.model_fields_set and upd.title is None:
+                    raise HTTPException(status_code=400, detail="Each item must have a title")
+                changes = upd.model_dump(include=upd.model_fields_set - {"id"})
+                current[upd.id] = current[upd.id].model_copy(update=changes)
+            for item_id in body.remove:
+                del current[item_id]
+            _validate_template(kind, list(current.values()) + body.add)
+
+            # A kind change renormalizes every kept item; otherwise only updated ones are written.
+            rewrite = list(current) if kind != old_kind else [u.id for u in body.update]
+            new_images = [u.id for u in body.update if "image_data" in u.model_fields_set]
+            image_hashes = await store_images(
+                cur,
+                [current[i].image_data for i in new_images] + [it.image_data for it in body.add],
+            )
+            updated_hashes = dict(zip(new_images, image_hashes))
+            added_hashes = image_hashes[len(new_images):]
+
+            if body.remove:
+                await cur.execute(
+                    "DELETE FROM template_items WHERE template_id=%s AND id = ANY(%s)",
+                    (template_id, body.remove),
+                )
+
+            if rewrite:
+                cols = [_template_item_columns(kind, current[i]) for i in rewrite]
+                await cur.execute(
                     """
-                    INSERT INTO template_items (template_id, title, rating, secret_text, is_target, image_data)
-                    VALUES (%s, %s, %s, %s, %s, %s)
+                    UPDATE template_items t
+                    SET title = v.title,
+                        rating = v.rating,
+                        secret_text = v.secret_text,
+                        is_target = v.is_target,
+                        image_hash = CASE WHEN v.image_changed THEN v.image_hash ELSE t.image_hash END
+                    FROM unnest(%s::uuid[], %s::text[], %s::numeric[], %s::text[], %s::boolean[],
+                                %s::boolean[], %s::text[])
+                         AS v(id, title, rating, secret_text, is_target, image_changed, image_hash)
+                    WHERE t.id = v.id AND t.template_id = %s
                     """,
-                    (template_id, it.title.strip(), rating, secret_text, is_target, item_image),
+                    (
+                        rewrite,
+                        [c[0] for c in cols],
+                        [c[1] for c in cols],
+                        [c[2] for c in cols],
+                        [c[3] for c in cols],
+                        [i in updated_hashes for i in rewrite],
+                        [updated_hashes.get(i) for i in rewrite],
+                        template_id,
+                    ),
                 )
 
-        conn.commit()
+            await repo_insert_template_items(
+                cur, template_id=template_id, kind=kind, items=body.add, image_hashes=added_hashes
+            )
 
-    return get_template(template_id, game_set)
+            # Always touch the template row: it bumps updated_at (ETag) and fires the cache NOTIFY.
+            image_changed = "image_data" in body.model_fields_set
+            template_image = await store_image(cur, body.image_data) if image_changed else None
+            await cur.execute(
+                """
+                UPDATE templates
+                SET name = coalesce(%s, name),
+                    prompt = coalesce(%s, prompt),
+                    kind = %s,
+                    image_hash = CASE WHEN %s THEN %s ELSE image_hash END
+                WHERE id=%s AND game_set=%s
+                """,
+                (
+                    body.name.strip() if body.name else None,
+                    body.prompt.strip() if body.prompt else None,
+                    kind,
+                    image_changed,
+                    template_image,
+                    template_id,
+                    game_set,
+                ),
+            )
+
+        await conn.commit()
+    template_cache.invalidate(game_set, template_id)
+
+    return FastJSONResponse(await _template_to_response(template_id, game_set))
 
 
 @app.delete("/api/templates/{template_id}")
-def delete_template(template_id: uuid.UUID, game_set: str = Depends(get_game_set),) -> Dict[str, str]:
-    with db_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute("DELETE FROM templates WHERE id=%s AND game_set=%s", (template_id, game_set))
-        conn.commit()
+async def delete_template(template_id: uuid.UUID, game_set: str = Depends(get_game_set),) -> Dict[str, str]:
+    async with async_db_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("DELETE FROM templates WHERE id=%s AND game_set=%s", (template_id, game_set))
+        await conn.commit()
+    template_cache.invalidate(game_set, template_id)
     return {"status": "deleted"}
 
 
+# =========================
+# Game set export / import (NDJSON)
+# =========================
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+EXPORT_FORMAT = 1
+# Images and templates the export reads per query; image rows carry whole blobs.
+EXPORT_IMAGE_ROWS = 8
+EXPORT_TEMPLATE_PAGE = 200
+# An import commits after this many templates or this much buffered input, whichever comes first.
+IMPORT_BATCH_TEMPLATES = 200
+IMPORT_BATCH_BYTES = 16 * 1024 * 1024
+# An image line carries an image (and, from older exports, its thumbnail), base64-encoded.
+IMPORT_MAX_LINE_BYTES = 3 * IMAGE_MAX_BYTES
+
+
+async def repo_insert_templates(
+    cur,
+    *,
+    game_set: str,
+    templates: List[TemplateCreate],
+    image_hashes: List[Optional[str]],
+) -> List[uuid.UUID]:
+    """
+    Set-based insert of whole templates: one INSERT for the templates and one
+    for all of their items. `image_hashes` holds the templates' images, then
+    every item's in order.
+    """
+    ids = [uuid.uuid4() for _ in templates]
+    await cur.execute(
+        """
+        INSERT INTO templates (id, game_set, name, prompt, kind, image_hash)
+        SELECT v.id, %s, v.name, v.prompt, v.kind, v.image_hash
+        FROM unnest(%s::uuid[], %s::text[], %s::text[], %s::text[], %s::text[])
+             AS v(id, name, prompt, kind, image_hash)
+        """,
+        (
+            game_set,
+            ids,
+            [t.name.strip() for t in templates],
+            [t.prompt.strip() for t in templates],
+            [t.kind for t in templates],
+            image_hashes[: len(templates)],
+        ),
+    )
+
+    owners = [tpl_id for tpl_id, t in zip(ids, templates) for _ in t.items]
+    cols = [_template_item_columns(t.kind, it) for t in templates for it in t.items]
+    await cur.execute(
+        """
+        INSERT INTO template_items (template_id, title, rating, secret_text, is_target, image_hash)
+        SELECT v.template_id, v.title, v.rating, v.secret_text, v.is_target, v.image_hash
+        FROM unnest(%s::uuid[], %s::text[], %s::numeric[], %s::text[], %s::boolean[], %s::text[])
+             AS v(template_id, title, rating, secret_text, is_target, image_hash)
+        """,
+        (
+            owners,
+            [c[0] for c in cols],
+            [c[1] for c in cols],
+            [c[2] for c in cols],
+            [c[3] for c in cols],
+            image_hashes[len(templates):],
+        ),
+    )
+    return ids
+
+
+async def _require_game_set(name: str) -> None:
+    _validate_game_set(name)
+    async with async_db_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT 1 FROM game_sets WHERE name=%s", (name,))
+            if await cur.fetchone() is None:
+                raise HTTPException(status_code=404, detail="Game set not found")
+
+
+def _data_url(mime: str, data: bytes) -> str:
+    return f"data:{mime};base64,{base64.b64encode(data).decode()}"
+
+
+async def _export_template_page(ids: List[uuid.UUID]) -> List[Tuple[Dict[str, Any], List[str]]]:
+    """(template line, image hashes it uses) for the templates still present, in `ids` order."""
+    async with async_db_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                """
+                SELECT t.id, t.name, t.prompt, t.kind, t.image_hash,
+                       i.title, i.rating, i.secret_text, i.is_target, i.image_hash
+                FROM templates t
+                JOIN template_items i ON i.template_id = t.id
+                WHERE t.id = ANY(%s)
+                ORDER BY i.title
+                """,
+                (ids,),
+            )
+            rows = await cur.fetchall()
+
+    page: Dict[uuid.UUID, Tuple[Dict[str, Any], List[str]]] = {}
+    for row in rows:
+        if row[0] not in page:
+            tpl = {
+                "type": "template",
+                "kind": row[3],
+                "name": row[1],
+                "prompt": row[2],
+                "image_data": image_url(row[4]),
+                "items": [],
+            }
+            page[row[0]] = (tpl, [row[4]] if row[4] else [])
+        tpl, hashes = page[row[0]]
+        tpl["items"].append(
+            {
+                "title": row[5],
+                "rating": row[6],
+                "secret_text": row[7],
+                "is_target": bool(row[8]),
+                "image_data": image_url(row[9]),
+            }
+        )
+        if row[9]:
+            hashes.append(row[9])
+    return [page[i] for i in ids if i in page]
+
+
+async def _export_image_page(hashes: List[str]) -> List[bytes]:
+    async with async_db_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT hash, mime, data FROM images WHERE hash = ANY(%s)", (hashes,))
+            rows = await cur.fetchall()
+    return [
+        dumps({"type": "image", "hash": h, "data": _data_url(mime, bytes(data))}) + b"\n"
+        for h, mime, data in rows
+    ]
+
+
+async def _export_lines(game_set: str) -> AsyncIterator[bytes]:
+    # Every page is read in its own short transaction and the connection goes
+    # back to the pool before the page is written out, so a slow download
+    # neither holds a pool slot nor an old snapshot. Templates deleted while
+    # the export runs are left out; the images of each page go out just
+    # before it, so templates edited in the meantime still find theirs.
+    async with async_db_conn() as conn:
+        cur = await conn.execute(
+            "SELECT id FROM templates WHERE game_set = %s ORDER BY created_at, id", (game_set,)
+        )
+        ids = [r[0] for r in await cur.fetchall()]
+    yield dumps({"type": "game_set", "name": game_set, "format": EXPORT_FORMAT}) + b"\n"
+
+    exported: set[str] = set()
+    for start in range(0, len(ids), EXPORT_TEMPLATE_PAGE):
+        templates = await _export_template_page(ids[start:start + EXPORT_TEMPLATE_PAGE])
+        needed = sorted({h for _, hashes in templates for h in hashes} - exported)
+        for i in range(0, len(needed), EXPORT_IMAGE_ROWS):
+            for line in await _export_image_page(needed[i:i + EXPORT_IMAGE_ROWS]):
+                yield line
+        exported.update(needed)
+        for tpl, _ in templates:
+            yield dumps(tpl) + b"\n"
+
+
+@app.get("/api/game-sets/{name}/export")
+async def export_game_set(name: str) -> StreamingResponse:
+    """
+    The game set's templates as NDJSON: a header line, then pages of
+    templates in the POST /api/templates shape with images referenced as
+    /api/images/<hash>, each page preceded by a line per image it uses that
+    was not sent yet (as a data URL). Only one page is held in memory at a
+    time, so memory use does not grow with the size of the set.
+    """
+    await _require_game_set(name)
+    return StreamingResponse(
+        _export_lines(name),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Cache-Control": "no-store", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _ndjson_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, bytes]]:
+    """(line number, line) of a streamed NDJSON body, blank lines skipped."""
+    buf = bytearray()
+    line_no = 0
+    async for chunk in chunks:
+        buf += chunk
+        start = 0
+        while (end := buf.find(b"\n", start)) >= 0:
+            if end - start > IMPORT_MAX_LINE_BYTES:
+                break
+            line_no += 1
+            line = bytes(buf[start:end])
+            start = end + 1
+            if line.strip():
+                yield line_no, line
+        del buf[:start]
+        if len(buf) > IMPORT_MAX_LINE_BYTES and buf.find(b"\n", 0, IMPORT_MAX_LINE_BYTES + 1) < 0:
+            raise HTTPException(status_code=413, detail="Line is too long")
+    if bytes(buf).strip():
+        yield line_no + 1, bytes(buf)
+
+
+def _parse_import_line(line: bytes) -> Tuple[Any, Optional[Tuple[bytes, str, str]]]:
+    """
+    (parsed line, (data, mime, sha256 hex) of an image line's blob). Lines hold
+    up to a whole base64-encoded image, so this runs in a thread.
+    """
+    try:
+        obj = orjson.loads(line)
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid JSON") from None
+    if not (isinstance(obj, dict) and obj.get("type") == "image" and isinstance(obj.get("data"), str)):
+        return obj, None
+    data, mime = decode_image_data(obj["data"])
+    return obj, (data, mime, hashlib.sha256(data).hexdigest())
+
+
+class _TemplateImport:
+    """
+    Lines of an import waiting for their transaction. Images are written
+    before the templates of the same batch, so templates can reference images
+    from earlier lines by the hash they had in the export.
+    """
+
+    def __init__(self, game_set: str):
+        self.game_set = game_set
+        # (export hash, data, mime, sha256 of data)
+        self.images: List[Tuple[str, bytes, str, str]] = []
+        self.templates: List[TemplateCreate] = []
+        self.size = 0
+        # export hash -> stored hash (they differ for blobs re-encoded on import)
+        self.stored: Dict[str, str] = {}
+        self.template_count = 0
+        self.image_count = 0
+
+    async def add(self, line: bytes) -> None:
+        obj, blob = await asyncio.to_thread(_parse_import_line, line)
+        kind = obj.get("type") if isinstance(obj, dict) else None
+
+        if kind == "game_set":
+            if obj.get("format", EXPORT_FORMAT) != EXPORT_FORMAT:
+                raise HTTPException(status_code=400, detail="Unsupported export format")
+        elif kind == "image":
+            if not (isinstance(obj.get("hash"), str) and blob is not None):
+                raise HTTPException(status_code=400, detail="Image lines need hash and data")
+            # Processed like any upload when the batch is written; a
+            # thumbnail on the line (older exports) is ignored.
+            self.images.append((obj["hash"].lower(), *blob))
+        elif kind == "template":
+            try:
+                body = TemplateCreate.model_validate(obj)
+            except ValidationError as e:
+                err = e.errors()[0]
+                where = ".".join(str(p) for p in err["loc"])
+                raise HTTPException(status_code=400, detail=f"{where}: {err['msg']}") from None
+            _validate_template(body.kind, body.items)
+            self.templates.append(body)
+        else:
+            raise HTTPException(status_code=400, detail="Unknown line type")
+        self.size += len(line)
+
+    def full(self) -> bool:
+        return len(self.templates) >= IMPORT_BATCH_TEMPLATES or self.size >= IMPORT_BATCH_BYTES
+
+    def _resolve(self, value: Optional[str]) -> Optional[str]:
+        ref = parse_image_ref(value) if value else None
+        return image_url(self.stored[ref]) if ref in self.stored else value
+
+    async def _store_images(self, cur) -> None:
+        # Blobs this deployment already holds (the same bytes) are reused, as
+        # on upload; everything else is validated and re-encoded.
+        await cur.execute(
+            "UPDATE images SET created_at = now() WHERE hash = ANY(%s) AND thumb_hash IS NOT NULL RETURNING hash",
+            ([digest for *_, digest in self.images],),
+        )
+        known = {r[0] for r in await cur.fetchall()}
+        fresh = [img for img in self.images if img[3] not in known]
+        processed = await asyncio.gather(*(process_upload(data, mime) for _, data, mime, _ in fresh))
+        self.stored.update((h, digest) for h, _, _, digest in self.images if digest in known)
+        self.stored.update(zip((h for h, *_ in fresh), await insert_processed(cur, processed)))
+
+    async def flush(self) -> None:
+        if not (self.images or self.templates):
+            return
+        async with async_db_conn() as conn:
+            async with conn.cursor() as cur:
+                if self.images:
+                    await self._store_images(cur)
+                ids: List[uuid.UUID] = []
+                if self.templates:
+                    values = [t.image_data for t in self.templates]
+                    values += [it.image_data for t in self.templates for it in t.items]
+                    image_hashes = await store_images(cur, [self._resolve(v) for v in values])
+                    ids = await repo_insert_templates(
+                        cur, game_set=self.game_set, templates=self.templates, image_hashes=image_hashes
+                    )
+            await conn.commit()
+        if ids:
+            # New templates: only the game set's listing pages are stale.
+            template_cache.invalidate(self.game_set, ids[0])
+        self.template_count += len(self.templates)
+        self.image_count += len(self.images)
+        self.images.clear()
+        self.templates.clear()
+        self.size = 0
+
+
+def _line_range(first: int, last: int) -> str:
+    return f"line {first}" if first == last else f"lines {first}-{last}"
+
+
+@app.post("/api/game-sets/{name}/import", response_model=GameSetImport)
+async def import_game_set(name: str, request: Request) -> Any:
+    """
+    Add the templates of an NDJSON export (see export_game_set) to a game set.
+    The body is read line by line and every template is validated like
+    POST /api/templates; lines are written in batches of IMPORT_BATCH_TEMPLATES
+    templates or IMPORT_BATCH_BYTES of input, one transaction per batch. A bad
+    line stops the import with an error naming it; earlier batches stay
+    imported, and the error says how many templates they held.
+    """
+    await _require_game_set(name)
+    batch = _TemplateImport(name)
+    first_line = line_no = 0
+    where = "line 1"
+    try:
+        async for line_no, line in _ndjson_lines(request.stream()):
+            if not batch.size:
+                first_line = line_no
+            where = f"line {line_no}"
+            await batch.add(line)
+            if batch.full():
+                where = _line_range(first_line, line_no)
+                await batch.flush()
+            where = f"after line {line_no}"
+        where = _line_range(first_line, line_no)
+        await batch.flush()
+    except HTTPException as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=f"{where}: {e.detail} ({batch.template_count} templates imported before)",
+        ) from None
+
+    return {"templates": batch.template_count, "images": batch.image_count}
+
+
 # =========================
 # Create runtime round from template (rated/manual/carousel)
 # =========================
 @app.post("/api/rounds/from-template", response_model=RoundOut)
-def create_round_from_template(
+async def create_round_from_template(
     req: CreateRoundFromTemplateRequest,
     game_set: str = Depends(get_game_set),
 ) -> Any:
-    with db_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                "SELECT id, name, prompt, kind, image_data FROM templates WHERE id=%s AND game_set=%s",
-                (req.template_id, game_set),
+    async with async_db_conn() as conn:
+        async with conn.cursor() as cur:
+            found, round_id = await repo_create_round_from_template(
+                cur,
+                template_id=req.template_id,
+                game_set=game_set,
             )
-            tpl = cur.fetchone()
-            if not tpl:
+            if not found:
                 raise HTTPException(status_code=404, detail="Template not found")
+            if round_id is None:
+                raise HTTPException(status_code=400, detail="Template is incomplete and cannot be played")
 
-            tpl_id, name, prompt, kind, image_data = tpl
+            out = await _load_round_response(cur, round_id, game_set)
+        await conn.commit()
 
-            cur.execute(
-                """
-                SELECT title, rating, secret_text, is_target, image_data
-                FROM template_items
-                WHERE template_id=%s
-                ORDER BY title ASC
-                """,
-                (tpl_id,),
-            )
-            rows = cur.fetchall()
-
-    items_obj = [
-        TemplateItemIn(
-            title=t,
-            rating=r,
-            secret_text=s,
-            is_target=bool(is_target),
-            image_data=img,
-        )
-        for (t, r, s, is_target, img) in rows
-    ]
-    _validate_template(str(kind), items_obj)
+    ROUNDS_CREATED.labels(out["kind"]).inc()
+    return FastJSONResponse(out)
 
-    if str(kind) == "rated":
-        target_title = min(rows, key=lambda x: x[1])[0]
-    else:
-        target_title = [r[0] for r in rows if bool(r[3])][0]
 
-    with db_conn() as conn:
-        with conn.cursor() as cur:
-            cur.execute(
-                """
-                INSERT INTO rounds (game_set, category, prompt, kind, image_data, current_team, status, target_item_id)
-                VALUES (%s, %s, %s, %s, %s, 1, %s, '00000000-0000-0000-0000-000000000000')
-                RETURNING id
-                """,
-                (game_set, str(name), str(prompt), str(kind), image_data, STATUS_ACTIVE),
+# =========================
+# Game plans (a match of several rounds, created at once)
+# =========================
+def _game_plan_response(plan_id: uuid.UUID, current_index: int, rounds) -> GamePlanOut:
+    handles = []
+    for round_id, kind, category, status in rounds:
+        if hot_rounds is not None:
+            status = hot_rounds.cached_status(round_id) or status
+        handles.append(RoundHandle(id=round_id, kind=kind, category=category, status=status))
+    return GamePlanOut(id=plan_id, current_index=current_index, rounds=handles)
+
+
+@app.post("/api/game-plans", response_model=GamePlanOut)
+async def create_game_plan(req: CreateGamePlanRequest, game_set: str = Depends(get_game_set),) -> Any:
+    """
+    Create every round of a match in one transaction and return lightweight
+    handles; the rounds themselves are read with GET /api/rounds/{id} when
+    they are played. Nothing is created unless every round can be.
+    """
+    templates: List[Tuple[int, uuid.UUID]] = []
+    datasets = []
+    for index, entry in enumerate(req.rounds):
+        if (entry.template_id is None) == (entry.category is None):
+            raise HTTPException(status_code=400, detail="Each round needs either template_id or category")
+        if entry.template_id is not None:
+            templates.append((index, entry.template_id))
+            continue
+        dataset = get_dataset(entry.category)
+        if dataset is None:
+            raise HTTPException(status_code=400, detail="Unknown category")
+        if dataset.count < 11:
+            raise HTTPException(status_code=500, detail="Dataset must have at least 11 items")
+        datasets.append((index, dataset, entry.difficulty))
+
+    def draw() -> List[Tuple[int, str, str, List[DatasetItem]]]:
+        return [(index, ds.name, ds.prompt, ds.sample(11, difficulty)) for index, ds, difficulty in datasets]
+
+    rated = await asyncio.to_thread(draw) if datasets else []
+
+    async with async_db_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                "INSERT INTO game_plans (game_set, round_count) VALUES (%s, %s) RETURNING id",
+                (game_set, len(req.rounds)),
             )
-            (round_id,) = cur.fetchone()
+            (plan_id,) = await cur.fetchone()
+
+            if rated:
+                await repo_create_plan_rated_rounds(cur, game_set=game_set, plan_id=plan_id, rounds=rated)
+            if templates:
+                for _, found, round_id in await repo_create_plan_template_rounds(
+                    cur, game_set=game_set, plan_id=plan_id, templates=templates
+                ):
+                    if not found:
+                        raise HTTPException(status_code=404, detail="Template not found")
+                    if round_id is None:
+                        raise HTTPException(status_code=400, detail="Template is incomplete and cannot be played")
+
+            current_index, rounds = await repo_load_game_plan(cur, plan_id=plan_id, game_set=game_set)
+        await conn.commit()
+
+    for _, kind, _, _ in rounds:
+        ROUNDS_CREATED.labels(kind).inc()
+    return _game_plan_response(plan_id, current_index, rounds)
+
+
+@app.get("/api/game-plans/{plan_id}", response_model=GamePlanOut)
+async def get_game_plan(plan_id: uuid.UUID, game_set: str = Depends(get_game_set),) -> Any:
+    async with async_db_conn() as conn:
+        async with conn.cursor() as cur:
+            plan = await repo_load_game_plan(cur, plan_id=plan_id, game_set=game_set)
+
+    if plan is None:
+        raise HTTPException(status_code=404, detail="Game plan not found")
+    return _game_plan_response(plan_id, *plan)
+
+
+@app.patch("/api/game-plans/{plan_id}", response_model=GamePlanOut)
+async def update_game_plan(plan_id: uuid.UUID, req: GamePlanPatch, game_set: str = Depends(get_game_set),) -> Any:
+    """Record the round the match is on, so a reloaded client resumes there."""
+    async with async_db_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                "SELECT round_count FROM game_plans WHERE id=%s AND game_set=%s FOR UPDATE",
+                (plan_id, game_set),
+            )
+            row = await cur.fetchone()
+            if row is None:
+                raise HTTPException(status_code=404, detail="Game plan not found")
+            if req.current_index >= row[0]:
+                raise HTTPException(status_code=400, detail="current_index is out of range")
+
+            await cur.execute(
+                "UPDATE game_plans SET current_index=%s WHERE id=%s",
+                (req.current_index, plan_id),
+            )
+            current_index, rounds = await repo_load_game_plan(cur, plan_id=plan_id, game_set=game_set)
+        await conn.commit()
 
-            target_item_id: Optional[uuid.UUID] = None
-            kind_s = str(kind)
+    return _game_plan_response(plan_id, current_index, rounds)
 
-            for (title, rating, secret_text, is_target, item_image_data) in rows:
-                ins_rating = rating if kind_s == "rated" else None
-                ins_secret = secret_text if kind_s in ("manual", "carousel") else None
-                ins_image = item_image_data if item_image_data else None
 
-                cur.execute(
-                    """
-                    INSERT INTO items (round_id, title, rating, secret_text, image_data, eliminated)
-                    VALUES (%s, %s, %s, %s, %s, false)
-                    RETURNING id
-                    """,
-                    (round_id, title, ins_rating, ins_secret, ins_image),
+# =========================
+# Images (content-addressed blobs)
+# =========================
+@app.post("/api/images", status_code=201)
+async def upload_image(request: Request) -> Dict[str, str]:
+    """
+    Upload one image as the raw request body (Content-Type: image/*), streamed
+    to disk rather than parsed into memory. The returned `url` (or `thumb_url`)
+    can be used as `image_data` in templates. Blobs are shared by every game
+    set, like GET /api/images/<hash>, so no X-Game-Set header is needed.
+    """
+    async with spool_upload(request.stream()) as (path, mime, digest):
+        # Same bytes already stored as-is (small enough to keep): nothing to do
+        # but restart the blob's retention grace period, as a fresh upload would.
+        async with async_db_conn() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    "UPDATE images SET created_at = now() WHERE hash=%s AND thumb_hash IS NOT NULL", (digest,)
                 )
-                (iid,) = cur.fetchone()
+                known = cur.rowcount > 0
+            await conn.commit()
+        processed = None if known else await process_upload(path, mime)
 
-                if kind_s == "rated":
-                    if title == target_title:
-                        target_item_id = iid
-                else:
-                    if bool(is_target):
-                        target_item_id = iid
+    if processed is None:
+        image_hash = digest
+    else:
+        async with async_db_conn() as conn:
+            async with conn.cursor() as cur:
+                (image_hash,) = await insert_processed(cur, [processed])
+            await conn.commit()
+
+    return {"hash": image_hash, "url": image_url(image_hash), "thumb_url": thumb_url(image_hash)}
+
+
+@app.get("/api/images/{image_hash}")
+async def get_image(image_hash: str, if_none_match: str | None = Header(default=None)) -> Response:
+    image_hash = image_hash.lower()
+    if not is_image_hash(image_hash):
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    headers = {
+        "ETag": image_etag(image_hash),
+        "Cache-Control": IMAGE_CACHE_CONTROL,
+        "X-Content-Type-Options": "nosniff",
+    }
 
-            if target_item_id is None:
-                raise HTTPException(status_code=500, detail="Failed to resolve target_item_id")
+    # The hash *is* the content, so a matching validator never needs the database.
+    if etag_matches(if_none_match, image_etag(image_hash)):
+        return Response(status_code=304, headers=headers)
+
+    async with async_db_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT mime, data FROM images WHERE hash=%s", (image_hash,))
+            row = await cur.fetchone()
+    if not row:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    mime, data = row
+    return Response(content=bytes(data), media_type=mime, headers=headers)
+
+
+@app.get("/api/images/{image_hash}/thumb")
+async def get_image_thumb(image_hash: str, if_none_match: str | None = Header(default=None)) -> Response:
+    """
+    Thumbnail of a stored image; round and template responses link here.
+    Blobs stored before image processing get their thumbnail on first request.
+    """
+    image_hash = image_hash.lower()
+    if not is_image_hash(image_hash):
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    headers = {
+        "ETag": image_etag(image_hash, thumb=True),
+        "Cache-Control": IMAGE_CACHE_CONTROL,
+        "X-Content-Type-Options": "nosniff",
+    }
+    if etag_matches(if_none_match, image_etag(image_hash, thumb=True)):
+        return Response(status_code=304, headers=headers)
 
-            cur.execute(
-                "UPDATE rounds SET target_item_id=%s WHERE id=%s AND game_set=%s",
-                (target_item_id, round_id, game_set),
+    async with async_db_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                """
+                SELECT t.mime, t.data
+                FROM images i
+                JOIN images t ON t.hash = i.thumb_hash
+                WHERE i.hash=%s
+                """,
+                (image_hash,),
             )
-        conn.commit()
+            row = await cur.fetchone()
+            if not row:
+                await cur.execute("SELECT mime, data FROM images WHERE hash=%s", (image_hash,))
+                original = await cur.fetchone()
+                if not original:
+                    raise HTTPException(status_code=404, detail="Image not found")
+                try:
+                    thumb, thumb_mime = await thumbnail_for(bytes(original[1]))
+                except ValueError:
+                    # Undecodable legacy blob: the original is the best we have.
+                    row = original
+                else:
+                    await insert_processed(cur, [((bytes(original[1]), original[0]), (thumb, thumb_mime))])
+                    await conn.commit()
+                    row = (thumb_mime, thumb)
 
-    return _round_to_response(round_id, game_set)
+    mime, data = row
+    return Response(content=bytes(data), media_type=mime, headers=headers)
 
 
 @app.exception_handler(HTTPException)
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import os
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from prometheus_client.core import GaugeMetricFamily
+
+from .tracing import SQL_TRACE, RequestStats, log_slow, request_stats, server_timing
+
+# Prometheus metrics for the API process, served by GET /metrics. The route
+# is not proxied by nginx; scrape the API container directly.
+#
+# With several workers (WEB_CONCURRENCY > 1) set PROMETHEUS_MULTIPROC_DIR to an
+# empty directory: every worker then writes its samples there and whichever
+# worker answers the scrape reports the sum of all of them.
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start to the last byte of the response, by route.",
+    ["method", "route", "status"],
+)
+HTTP_RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Response body size, by route.",
+    ["method", "route"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864),
+)
+HTTP_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request, by route.",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 4, 6, 8, 12, 16, 24, 32),
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Time spent waiting to check a connection out of the pool.",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+ROUNDS_CREATED = Counter("rounds_created", "Rounds created, by kind.", ["kind"])
+ROUND_ELIMINATIONS = Counter("round_eliminations", "Items eliminated, by round kind.", ["kind"])
+ROUNDS_ARCHIVED = Counter("rounds_archived", "Finished rounds compacted into round_archive by the retention job.")
+IMAGES_COLLECTED = Counter("images_collected", "Unreferenced image blobs deleted by the retention job.")
+ROUND_EVENTS_FAILED = Counter(
+    "round_events_failed", "Turns the round engine gave up persisting (moved to round_event_failures)."
+)
+
+
+class PoolCollector:
+    """Pool gauges, read from psycopg_pool's get_stats() at scrape time."""
+
+    def __init__(self, get_stats: Callable[[], Dict[str, int]]):
+        self._get_stats = get_stats
+
+    def collect(self) -> Iterator[GaugeMetricFamily]:
+        stats = self._get_stats()
+        size = stats.get("pool_size", 0)
+        available = stats.get("pool_available", 0)
+        yield GaugeMetricFamily("db_pool_size", "Connections currently open in the pool.", value=size)
+        yield GaugeMetricFamily("db_pool_max_size", "Upper bound on pool connections.", value=stats.get("pool_max", 0))
+        yield GaugeMetricFamily("db_pool_in_use", "Connections checked out of the pool.", value=size - available)
+        yield GaugeMetricFamily(
+            "db_pool_requests_waiting", "Requests queued for a connection.", value=stats.get("requests_waiting", 0)
+        )
+
+
+# Multiprocess mode cannot run collectors in the other workers, so there each
+# worker publishes its pool's numbers as gauges, refreshed after every request
+# and summed over the live workers.
+_POOL_GAUGES = (
+    {
+        "pool_size": Gauge("db_pool_size", "Connections currently open in the pool.", multiprocess_mode="livesum"),
+        "pool_max": Gauge("db_pool_max_size", "Upper bound on pool connections.", multiprocess_mode="livesum"),
+        "in_use": Gauge("db_pool_in_use", "Connections checked out of the pool.", multiprocess_mode="livesum"),
+        "requests_waiting": Gauge(
+            "db_pool_requests_waiting", "Requests queued for a connection.", multiprocess_mode="livesum"
+        ),
+    }
+    if MULTIPROCESS
+    else {}
+)
+_pool_stats: Optional[Callable[[], Dict[str, int]]] = None
+
+
+def register_pool_collector(get_stats: Callable[[], Dict[str, int]]) -> None:
+    global _pool_stats
+    if MULTIPROCESS:
+        _pool_stats = get_stats
+    else:
+        REGISTRY.register(PoolCollector(get_stats))
+
+
+def _refresh_pool_gauges() -> None:
+    if _pool_stats is None:
+        return
+    stats = _pool_stats()
+    _POOL_GAUGES["pool_size"].set(stats.get("pool_size", 0))
+    _POOL_GAUGES["pool_max"].set(stats.get("pool_max", 0))
+    _POOL_GAUGES["in_use"].set(stats.get("pool_size", 0) - stats.get("pool_available", 0))
+    _POOL_GAUGES["requests_waiting"].set(stats.get("requests_waiting", 0))
+
+
+def render() -> Tuple[bytes, str]:
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Drop this worker's live gauges on shutdown (multiprocess mode)."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, response size and statement count per
+    request. Routes are labelled by their path template (/api/rounds/{round_id}),
+    unmatched paths as "<unmatched>", so label cardinality stays bounded.
+
+    With SQL_TRACE on it also adds the Server-Timing header and logs slow
+    requests and statements (see tracing.py).
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        start = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if SQL_TRACE:
+                    timing = server_timing(stats, start, time.perf_counter()).encode("latin-1")
+                    message = {**message, "headers": [*message.get("headers", []), (b"server-timing", timing)]}
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            request_stats.reset(token)
+            elapsed = time.perf_counter() - start
+            method = scope["method"]
+            route = getattr(scope.get("route"), "path", "<unmatched>")
+            HTTP_LATENCY.labels(method, route, str(status)).observe(elapsed)
+            HTTP_RESPONSE_SIZE.labels(method, route).observe(size)
+            HTTP_DB_QUERIES.labels(method, route).observe(stats.queries)
+            if MULTIPROCESS:
+                _refresh_pool_gauges()
+            if SQL_TRACE:
+                log_slow(method, route, status, elapsed, stats)
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import orjson
+import psycopg
+
+from .db import get_direct_database_url
+from .fastjson import dumps
+
+logger = logging.getLogger(__name__)
+
+# Postgres channels fed by the trg_rounds_notify (migrate_009),
+# trg_templates_notify (migrate_010) and trg_rounds_delete_notify (migrate_021)
+# triggers.
+ROUND_CHANNEL = "round_updates"
+TEMPLATE_CHANNEL = "template_updates"
+ROUND_DELETE_CHANNEL = "round_deletes"
+
+# (round_id, game_set, since) -> RoundDelta payload (dict)
+BuildDelta = Callable[[uuid.UUID, str, int], Awaitable[Dict[str, Any]]]
+# NOTIFY payload -> None
+Handler = Callable[[str], Awaitable[None]]
+
+
+class PgListener:
+    """
+    One LISTEN connection per API process, dispatching NOTIFY payloads by channel.
+
+    The read loop only queues payloads; each channel's handler runs in its own
+    task, in arrival order. A handler waiting on the pool therefore delays its
+    own channel only, never the LISTEN connection or the other channels.
+
+    Notifications sent while the connection is down are lost, so `on_connect`
+    callbacks run after every (re)connect to drop state that relied on them.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, Handler] = {}
+        self._queues: Dict[str, "asyncio.Queue[str]"] = {}
+        self._on_connect: List[Callable[[], None]] = []
+        self._tasks: List[asyncio.Task] = []
+
+    def on(self, channel: str, handler: Handler) -> None:
+        self._handlers[channel] = handler
+
+    def on_connect(self, callback: Callable[[], None]) -> None:
+        self._on_connect.append(callback)
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        loop = asyncio.get_running_loop()
+        for channel, handler in self._handlers.items():
+            self._queues[channel] = asyncio.Queue()
+            self._tasks.append(loop.create_task(self._dispatch(channel, handler)))
+        self._tasks.append(loop.create_task(self._listen()))
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._tasks.clear()
+        self._queues.clear()
+
+    async def _dispatch(self, channel: str, handler: Handler) -> None:
+        queue = self._queues[channel]
+        while True:
+            payload = await queue.get()
+            try:
+                await handler(payload)
+            except Exception:
+                logger.exception("pg listener: %s handler failed on %r", channel, payload)
+
+    async def _listen(self) -> None:
+        delay = 1.0
+        while True:
+            try:
+                conn = await psycopg.AsyncConnection.connect(get_direct_database_url(), autocommit=True)
+                async with conn:
+                    for channel in self._handlers:
+                        await conn.execute(f"LISTEN {channel}")
+                    for callback in self._on_connect:
+                        callback()
+                    delay = 1.0
+                    async for notify in conn.notifies():
+                        queue = self._queues.get(notify.channel)
+                        if queue is not None:
+                            queue.put_nowait(notify.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("pg listener: LISTEN connection lost, reconnecting in %.0fs", delay)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30.0)
+
+
+class Subscription:
+    def __init__(self, round_id: uuid.UUID, game_set: str, version: int):
+        self.round_id = round_id
+        self.game_set = game_set
+        self.version = version
+        # (version, status, encoded delta); None closes the stream
+        self.queue: "asyncio.Queue[Optional[Tuple[int, str, str]]]" = asyncio.Queue()
+
+
+class RoundBroker:
+    """
+    Fans round changes out to local SSE subscribers.
+
+    The process's PgListener hands it a NOTIFY for every committed turn,
+    whichever worker or replica made it. The delta for that turn is built
+    once and handed to every subscriber of the round.
+    """
+
+    def __init__(self, build_delta: BuildDelta):
+        self._build_delta = build_delta
+        self._subs: Dict[uuid.UUID, Set[Subscription]] = {}
+
+    # ----- lifecycle -----
+    async def close(self) -> None:
+        """End every open stream."""
+        for subs in self._subs.values():
+            for sub in subs:
+                sub.queue.put_nowait(None)
+
+    # ----- subscribers -----
+    def subscribe(self, round_id: uuid.UUID, game_set: str, version: int) -> Subscription:
+        sub = Subscription(round_id, game_set, version)
+        self._subs.setdefault(round_id, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        subs = self._subs.get(sub.round_id)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._subs[sub.round_id]
+
+    # ----- publishing -----
+    async def publish(self, round_id: uuid.UUID, game_set: str, version: int) -> None:
+        subs = [s for s in self._subs.get(round_id, ()) if s.game_set == game_set and s.version < version]
+        if not subs:
+            return
+
+        delta = await self._build_delta(round_id, game_set, version - 1)
+        message = (int(delta["version"]), str(delta["status"]), dumps(delta).decode())
+        for sub in subs:
+            sub.queue.put_nowait(message)
+
+    async def dispatch(self, payload: str) -> None:
+        try:
+            msg = orjson.loads(payload)
+            round_id = uuid.UUID(msg["round_id"])
+            await self.publish(round_id, str(msg["game_set"]), int(msg["version"]))
+        except Exception:
+            logger.exception("round broker: failed to handle notification %r", payload)
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+from typing import Dict, List, Optional
+
+import psycopg
+
+from .db import async_db_conn, close_pools, get_direct_database_url, init_async_pool
+from .metrics import IMAGES_COLLECTED, ROUNDS_ARCHIVED
+
+logger = logging.getLogger(__name__)
+
+# Background retention job, run by every API process on a timer (one pass at a
+# time across processes, under an advisory lock) or once from the command line:
+#   - finished rounds older than ROUND_RETENTION_DAYS are compacted into
+#     round_archive and deleted with their items and turn log;
+#   - game plans left without rounds are deleted;
+#   - image blobs nothing references any more are deleted.
+RETENTION_INTERVAL_SECONDS = float(os.getenv("RETENTION_INTERVAL_SECONDS", "3600"))
+ROUND_RETENTION_DAYS = int(os.getenv("ROUND_RETENTION_DAYS", "0"))
+IMAGE_GC_GRACE_HOURS = float(os.getenv("IMAGE_GC_GRACE_HOURS", "24"))
+RETENTION_BATCH = int(os.getenv("RETENTION_BATCH", "500"))
+
+# pg_try_advisory_lock key ("retentn" in ASCII)
+_LOCK_KEY = 0x726574656E746E
+
+
+async def archive_rounds(days: int, batch: int = RETENTION_BATCH) -> int:
+    """Compact finished rounds created more than `days` ago, one short transaction per batch."""
+    total = 0
+    while True:
+        async with async_db_conn() as conn:
+            async with conn.cursor() as cur:
+                await cur.execute(
+                    """
+                    WITH doomed AS (
+                      SELECT id FROM rounds
+                      WHERE status = 'finished' AND created_at < now() - make_interval(days => %s)
+                      ORDER BY created_at
+                      LIMIT %s
+                      FOR UPDATE SKIP LOCKED
+                    ),
+                    archived AS (
+                      INSERT INTO round_archive (
+                        id, game_set, kind, category, prompt, created_at, finished_at,
+                        winner_team, loser_team, item_count, target_title, plan_id, plan_index, template_id, turns
+                      )
+                      SELECT r.id, r.game_set, r.kind, r.category, r.prompt, r.created_at, s.finished_at,
+                             r.winner_team, r.loser_team, s.item_count, t.title, r.plan_id, r.plan_index,
+                             r.template_id, s.turns
+                      FROM rounds r
+                      JOIN doomed d ON d.id = r.id
+                      CROSS JOIN LATERAL (
+                        SELECT count(*)::int AS item_count, max(i.eliminated_at) AS finished_at,
+                               count(*) FILTER (WHERE i.eliminated)::int AS turns
+                        FROM items i WHERE i.round_id = r.id
+                      ) s
+                      LEFT JOIN items t ON t.id = r.target_item_id
+                      ON CONFLICT (id) DO NOTHING
+                    )
+                    DELETE FROM rounds r
+                    USING doomed d
+                    WHERE r.id = d.id
+                    """,
+                    (days, batch),
+                )
+                done = cur.rowcount
+            await conn.commit()
+        total += done
+        ROUNDS_ARCHIVED.inc(done)
+        if done < batch:
+            return total
+
+
+async def delete_orphan_plans(days: int) -> int:
+    """Game plans older than `days` whose rounds have all been archived."""
+    async with async_db_conn() as conn:
+        async with conn.cursor() as cur:
+            await cur.execute(
+                """
+                DELETE FROM game_plans p
+                WHERE p.created_at < now() - make_interval(days => %s)
+                  AND NOT EXISTS (SELECT 1 FROM rounds r WHERE r.plan_id = p.id)
+                """,
+                (days,),
+            )
+            done = cur.rowcount
+        await conn.commit()
+    return done
+
+
+# True when a round, item or template uses the blob `{h}` (each probe uses an image_hash index).
+_IMAGE_REFERENCED = """(
+  EXISTS (SELECT 1 FROM rounds x WHERE x.image_hash = {h})
+  OR EXISTS (SELECT 1 FROM items x WHERE x.image_hash = {h})
+  OR EXISTS (SELECT 1 FROM templates x WHERE x.image_hash = {h})
+  OR EXISTS (SELECT 1 FROM template_items x WHERE x.image_hash = {h})
+)"""
+
+
+async def collect_images(grace_hours: float, batch: int = RETENTION_BATCH) -> int:
+    """
+    Delete blobs stored (or re-uploaded) more than `grace_hours` ago that no
+    round, item or template references, with the thumbnails they link. The
+    grace period covers uploads that a template has not been saved with yet.
+
+    One walk over `images` in hash order, `batch` blobs per transaction, so
+    each blob is looked at once per pass. A thumbnail whose parent sorts
+    after it is collected on the next pass.
+    """
+    total = 0
+    after = ""
+    while True:
+        try:
+            async with async_db_conn() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute(
+                        f"""
+                        WITH scanned AS (
+                          SELECT hash, created_at FROM images
+                          WHERE hash > %s
+                          ORDER BY hash
+                          LIMIT %s
+                        ),
+                        doomed AS (
+                          SELECT s.hash FROM scanned s
+                          WHERE s.created_at < now() - make_interval(secs => %s)
+                            AND NOT {_IMAGE_REFERENCED.format(h="s.hash")}
+                            -- thumbnail of a blob that is kept
+                            AND NOT EXISTS (
+                              SELECT 1 FROM images p
+                              WHERE p.thumb_hash = s.hash
+                                AND (p.created_at >= now() - make_interval(secs => %s)
+                                     OR {_IMAGE_REFERENCED.format(h="p.hash")})
+                            )
+                        ),
+                        deleted AS (
+                          DELETE FROM images i
+                          USING doomed d
+                          WHERE i.hash = d.hash
+                            -- a thumbnail goes with its last parent, never before it
+                            AND NOT EXISTS (
+                              SELECT 1 FROM images p
+                              WHERE p.thumb_hash = i.hash AND p.hash NOT IN (SELECT hash FROM doomed)
+                            )
+                          RETURNING 1
+                        )
+                        SELECT (SELECT max(hash) FROM scanned), (SELECT count(*) FROM deleted)
+                        """,
+                        (after, batch, grace_hours * 3600, grace_hours * 3600),
+                    )
+                    last, done = await cur.fetchone()
+                await conn.commit()
+        except psycopg.errors.ForeignKeyViolation:
+            # A blob got referenced while the batch ran; the next pass sees it.
+            logger.info("retention: image referenced concurrently, stopping this pass")
+            return total
+        total += done
+        IMAGES_COLLECTED.inc(done)
+        if last is None:
+            return total
+        after = last
+
+
+async def run_once(
+    days: int = ROUND_RETENTION_DAYS, grace_hours: float = IMAGE_GC_GRACE_HOURS
+) -> Optional[Dict[str, int]]:
+    """One full pass; None if another process is running one."""
+    # The lock is held by its own direct connection (a pooled one may sit
+    # behind PgBouncer) and released when that connection closes.
+    async with await psycopg.AsyncConnection.connect(get_direct_database_url(), autocommit=True) as lock_conn:
+        cur = await lock_conn.execute("SELECT pg_try_advisory_lock(%s)", (_LOCK_KEY,))
+        (locked,) = await cur.fetchone()
+        if not locked:
+            return None
+        result = {"rounds": 0, "plans": 0, "images": 0}
+        if days > 0:
+            result["rounds"] = await archive_rounds(days)
+            result["plans"] = await delete_orphan_plans(days)
+        # Archived rounds release their images, so collect after archiving.
+        if grace_hours >= 0:
+            result["images"] = await collect_images(grace_hours)
+        return result
+
+
+class RetentionJob:
+    """Runs `run_once` every RETENTION_INTERVAL_SECONDS in the API process (0 disables it)."""
+
+    def __init__(self, interval: float = RETENTION_INTERVAL_SECONDS):
+        self._interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None and self._interval > 0:
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            try:
+                result = await run_once()
+                if result and any(result.values()):
+                    logger.info(
+                        "retention: archived %(rounds)d rounds, deleted %(plans)d plans and %(images)d images",
+                        result,
+                    )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("retention: pass failed, retrying in %.0fs", self._interval)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.retention", description="Run one retention pass.")
+    parser.add_argument("--days", type=int, default=ROUND_RETENTION_DAYS, help="archive finished rounds older than this (0 = keep)")
+    parser.add_argument("--image-grace-hours", type=float, default=IMAGE_GC_GRACE_HOURS, help="negative skips image collection")
+    args = parser.parse_args(argv)
+
+    async def run() -> Optional[Dict[str, int]]:
+        await init_async_pool()
+        try:
+            return await run_once(args.days, args.image_grace_hours)
+        finally:
+            await close_pools()
+
+    result = asyncio.run(run())
+    if result is None:
+        print("another retention pass is running")
+    else:
+        print(f"archived {result['rounds']} rounds, deleted {result['plans']} plans and {result['images']} images")
+
+
+if __name__ == "__main__":
+    main()
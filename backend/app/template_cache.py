@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import logging
+import os
+import uuid
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Set, Tuple
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+# Entries kept across all game sets (template lists and full templates); 0 disables the cache.
+TEMPLATE_CACHE_SIZE = int(os.getenv("TEMPLATE_CACHE_SIZE", "1000"))
+
+# (game_set, template_id) for a template, (game_set, <page params tuple>) for a listing page
+CacheKey = Tuple[str, Hashable]
+
+
+class TemplateCache:
+    """
+    Bounded LRU of template reads, keyed by (game_set, template_id) or, for
+    listing pages, (game_set, page params).
+
+    Values are whatever the endpoints store, typically (etag, payload). A
+    change to any template drops that template and every listing page of its
+    game set: locally right after the write commits, and in every other API
+    process through the template_updates NOTIFY (see `dispatch`).
+
+    A read that started before an invalidation must not repopulate the
+    cache with what it loaded, so callers take `generation()` before
+    reading and hand it back to `put()`.
+    """
+
+    def __init__(self, max_entries: int = TEMPLATE_CACHE_SIZE):
+        self._max_entries = max_entries
+        self._entries: "OrderedDict[CacheKey, Any]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._pages: Dict[str, Set[CacheKey]] = {}
+        self._epoch = 0
+
+    def get(self, game_set: str, key_id: Hashable) -> Any:
+        key = (game_set, key_id)
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def generation(self, game_set: str) -> Hashable:
+        return self._epoch, self._generations.get(game_set, 0)
+
+    def put(self, game_set: str, key_id: Hashable, value: Any, generation: Hashable) -> None:
+        if self._max_entries <= 0 or generation != self.generation(game_set):
+            return
+        key = (game_set, key_id)
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if not isinstance(key_id, uuid.UUID):
+            self._pages.setdefault(game_set, set()).add(key)
+        while len(self._entries) > self._max_entries:
+            old_key, _ = self._entries.popitem(last=False)
+            pages = self._pages.get(old_key[0])
+            if pages is not None:
+                pages.discard(old_key)
+
+    def invalidate(self, game_set: str, template_id: uuid.UUID) -> None:
+        self._generations[game_set] = self._generations.get(game_set, 0) + 1
+        self._entries.pop((game_set, template_id), None)
+        for key in self._pages.pop(game_set, ()):
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self._entries.clear()
+        self._pages.clear()
+
+    async def dispatch(self, payload: str) -> None:
+        try:
+            msg = orjson.loads(payload)
+            self.invalidate(str(msg["game_set"]), uuid.UUID(msg["template_id"]))
+        except Exception:
+            logger.exception("template cache: failed to handle notification %r", payload)
+            self.clear()
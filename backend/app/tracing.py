@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import functools
+import logging
+import os
+import re
+import time
+from collections import Counter as Tally
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+
+logger = logging.getLogger(__name__)
+
+# Opt-in per-request SQL tracing. With SQL_TRACE=1 every statement run for a
+# request is timed, responses carry a Server-Timing header (DB time, handler
+# time outside the DB, response serialization) and slow requests/statements
+# are logged with their normalized SQL.
+SQL_TRACE = os.getenv("SQL_TRACE", "0").lower() in ("1", "true", "yes")
+SQL_TRACE_SLOW_REQUEST_MS = float(os.getenv("SQL_TRACE_SLOW_REQUEST_MS", "500"))
+SQL_TRACE_SLOW_STATEMENT_MS = float(os.getenv("SQL_TRACE_SLOW_STATEMENT_MS", "100"))
+
+# Statements listed in a slow-request log line, most expensive first.
+_SLOW_REQUEST_TOP = 5
+
+
+@dataclass
+class RequestStats:
+    """Database work done on behalf of the request being served."""
+    queries: int = 0
+    db_seconds: float = 0.0
+    # (sql, seconds, rowcount); only filled in with SQL_TRACE on
+    statements: List[Tuple[str, float, int]] = field(default_factory=list)
+    # perf_counter() when the endpoint function returned
+    handler_done: Optional[float] = None
+
+
+# Set by the metrics middleware for the duration of each HTTP request; the
+# pool's cursors (db.StatsCursor) record into it. Background tasks see None.
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(query: Any) -> str:
+    """One-line SQL with literals replaced by `?`, so repeated statements group together."""
+    text = _STRING_LITERAL.sub("?", str(query))
+    text = _NUMBER_LITERAL.sub("?", text)
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+class TracedRoute(APIRoute):
+    """APIRoute that notes when the endpoint returns, to split handler from serialization time."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        if SQL_TRACE:
+            endpoint = _mark_handler_done(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+
+def _mark_handler_done(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(endpoint)
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        try:
+            return await endpoint(*args, **kwargs)
+        finally:
+            stats = request_stats.get()
+            if stats is not None:
+                stats.handler_done = time.perf_counter()
+
+    return wrapper
+
+
+def server_timing(stats: RequestStats, start: float, now: float) -> str:
+    """Server-Timing value for a response whose headers are being sent at `now`."""
+    handler_done = stats.handler_done or now
+    db_ms = stats.db_seconds * 1000
+    app_ms = max(0.0, (handler_done - start) * 1000 - db_ms)
+    ser_ms = (now - handler_done) * 1000
+    return (
+        f'db;dur={db_ms:.1f};desc="{stats.queries} queries", '
+        f"app;dur={app_ms:.1f}, "
+        f"ser;dur={ser_ms:.1f}"
+    )
+
+
+def log_slow(method: str, route: str, status: int, seconds: float, stats: RequestStats) -> None:
+    """Log slow statements, and slow requests with their costliest statements."""
+    for sql, took, rows in stats.statements:
+        if took * 1000 >= SQL_TRACE_SLOW_STATEMENT_MS:
+            logger.warning(
+                "slow statement: %.1fms rows=%d in %s %s: %s", took * 1000, rows, method, route, normalize_sql(sql)
+            )
+
+    if seconds * 1000 < SQL_TRACE_SLOW_REQUEST_MS:
+        return
+    totals: "Tally[str]" = Tally()
+    counts: "Tally[str]" = Tally()
+    for sql, took, _ in stats.statements:
+        key = normalize_sql(sql)
+        totals[key] += took
+        counts[key] += 1
+    top = "; ".join(
+        f"{counts[sql]}x {total * 1000:.1f}ms {sql[:200]}" for sql, total in totals.most_common(_SLOW_REQUEST_TOP)
+    )
+    logger.warning(
+        "slow request: %s %s -> %d in %.1fms, %d queries, db %.1fms%s",
+        method, route, status, seconds * 1000, stats.queries, stats.db_seconds * 1000,
+        f" | {top}" if top else "",
+    )
@@ -0,0 +1,41 @@
+import random
+
+import pytest
+
+from app.datasets import Dataset
+
+
+def _dataset(tmp_path, ratings):
+    path = tmp_path / "set.csv"
+    path.write_text("title,rating\n" + "".join(f"item {i},{r}\n" for i, r in enumerate(ratings)), encoding="utf-8")
+    return Dataset("set", "Find the lowest.", path, len(ratings))
+
+
+def _assert_single_lowest(items, k):
+    ratings = sorted(it.rating for it in items)
+    assert len({it.title for it in items}) == k
+    assert ratings[0] < ratings[1]
+
+
+@pytest.mark.parametrize("difficulty", [None, 0.0, 0.5, 0.9, 1.0])
+def test_sample_has_single_lowest_with_tied_top(tmp_path, difficulty):
+    # 40 items, the top 20 all tied.
+    ds = _dataset(tmp_path, [f"{i / 10:.1f}" for i in range(20)] + ["9.0"] * 20)
+    rng = random.Random(7)
+    for _ in range(2000):
+        _assert_single_lowest(ds.sample(11, difficulty, rng), 11)
+
+
+@pytest.mark.parametrize("difficulty", [None, 0.3, 1.0])
+def test_sample_has_single_lowest_with_ties_everywhere(tmp_path, difficulty):
+    # One-decimal ratings, five items per value.
+    ds = _dataset(tmp_path, [f"{i // 5 / 10:.1f}" for i in range(200)])
+    rng = random.Random(11)
+    for _ in range(2000):
+        _assert_single_lowest(ds.sample(11, difficulty, rng), 11)
+
+
+def test_sample_rejects_set_without_single_lowest(tmp_path):
+    ds = _dataset(tmp_path, ["1.0"] * 15 + ["2.0"] * 5)
+    with pytest.raises(ValueError):
+        ds.sample(11, None, random.Random(1))
@@ -163,3 +163,458 @@ ALTER TABLE items
 -- Backfill existing rows into default game set (for older DBs)
 UPDATE templates SET game_set = 'EDUARD' WHERE game_set IS NULL;
 UPDATE rounds    SET game_set = 'EDUARD' WHERE game_set IS NULL;
+
+-- db/migrate_005_image_blobs.sql
+
+-- Content-addressed image store: one row per distinct image (sha256 of the bytes).
+CREATE TABLE IF NOT EXISTS images (
+  hash TEXT PRIMARY KEY,
+  mime TEXT NOT NULL,
+  data BYTEA NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Rounds/templates reference images by hash instead of carrying base64 copies
+ALTER TABLE rounds
+  ADD COLUMN IF NOT EXISTS image_hash TEXT REFERENCES images(hash);
+
+ALTER TABLE items
+  ADD COLUMN IF NOT EXISTS image_hash TEXT REFERENCES images(hash);
+
+ALTER TABLE templates
+  ADD COLUMN IF NOT EXISTS image_hash TEXT REFERENCES images(hash);
+
+ALTER TABLE template_items
+  ADD COLUMN IF NOT EXISTS image_hash TEXT REFERENCES images(hash);
+
+-- Backfill: move inline base64 / data URL values into images (idempotent)
+CREATE OR REPLACE FUNCTION migrate_image_blob(src TEXT) RETURNS TEXT AS $$
+DECLARE
+  mime TEXT;
+  raw BYTEA;
+  h TEXT;
+BEGIN
+  IF src IS NULL OR btrim(src) = '' THEN
+    RETURN NULL;
+  END IF;
+
+  mime := substring(src FROM '^data:([^;,]+)');
+  raw := decode(regexp_replace(regexp_replace(src, '^data:[^,]*,', ''), '\s', '', 'g'), 'base64');
+
+  IF mime IS NULL THEN
+    mime := CASE
+      WHEN substring(raw FROM 1 FOR 3) = '\xffd8ff'::bytea THEN 'image/jpeg'
+      WHEN substring(raw FROM 1 FOR 4) = '\x89504e47'::bytea THEN 'image/png'
+      WHEN substring(raw FROM 1 FOR 3) = '\x474946'::bytea THEN 'image/gif'
+      WHEN substring(raw FROM 9 FOR 4) = '\x57454250'::bytea THEN 'image/webp'
+      ELSE 'application/octet-stream'
+    END;
+  END IF;
+
+  h := encode(sha256(raw), 'hex');
+  INSERT INTO images (hash, mime, data) VALUES (h, mime, raw)
+  ON CONFLICT (hash) DO NOTHING;
+  RETURN h;
+EXCEPTION WHEN others THEN
+  -- undecodable legacy value: drop the image rather than fail the migration
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+  tbl TEXT;
+BEGIN
+  FOREACH tbl IN ARRAY ARRAY['rounds', 'items', 'templates', 'template_items'] LOOP
+    IF EXISTS (
+      SELECT 1 FROM information_schema.columns
+      WHERE table_schema = current_schema() AND table_name = tbl AND column_name = 'image_data'
+    ) THEN
+      EXECUTE format(
+        'UPDATE %I SET image_hash = migrate_image_blob(image_data)
+         WHERE image_data IS NOT NULL AND image_hash IS NULL',
+        tbl
+      );
+      EXECUTE format('ALTER TABLE %I DROP COLUMN image_data', tbl);
+    END IF;
+  END LOOP;
+END $$;
+
+DROP FUNCTION IF EXISTS migrate_image_blob(TEXT);
+
+-- db/migrate_006_round_versions.sql
+
+-- Monotonic per-round version: bumped on every turn. Items remember the
+-- version that last changed them so clients can fetch deltas (?since=N).
+ALTER TABLE rounds
+  ADD COLUMN IF NOT EXISTS version INT NOT NULL DEFAULT 0;
+
+ALTER TABLE items
+  ADD COLUMN IF NOT EXISTS version INT NOT NULL DEFAULT 0;
+
+-- db/migrate_007_remaining_count.sql
+
+-- Maintained count of non-eliminated items, so a turn never has to COUNT(*) items
+ALTER TABLE rounds
+  ADD COLUMN IF NOT EXISTS remaining_count INT;
+
+UPDATE rounds r
+SET remaining_count = (
+  SELECT count(*) FROM items i WHERE i.round_id = r.id AND NOT i.eliminated
+)
+WHERE remaining_count IS NULL;
+
+ALTER TABLE rounds ALTER COLUMN remaining_count SET DEFAULT 0;
+ALTER TABLE rounds ALTER COLUMN remaining_count SET NOT NULL;
+
+-- db/migrate_008_round_events.sql
+
+-- Append-only elimination log written by the in-process round engine
+-- (ROUND_ENGINE=memory). Each row is one turn and the round state it produced.
+CREATE TABLE IF NOT EXISTS round_events (
+  round_id UUID NOT NULL REFERENCES rounds(id) ON DELETE CASCADE,
+  version INT NOT NULL,
+  item_id UUID NOT NULL,
+  team INT NOT NULL,
+  current_team INT NOT NULL,
+  status TEXT NOT NULL,
+  winner_team INT,
+  loser_team INT,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (round_id, version)
+);
+
+-- db/migrate_009_round_notify.sql
+
+-- Every committed turn (version bump) is announced on the round_updates channel,
+-- so each API process can push it to the round's SSE subscribers.
+CREATE OR REPLACE FUNCTION notify_round_update() RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM pg_notify(
+    'round_updates',
+    json_build_object('round_id', NEW.id, 'game_set', NEW.game_set, 'version', NEW.version)::text
+  );
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_rounds_notify ON rounds;
+CREATE TRIGGER trg_rounds_notify
+AFTER UPDATE OF version ON rounds
+FOR EACH ROW
+WHEN (OLD.version IS DISTINCT FROM NEW.version)
+EXECUTE FUNCTION notify_round_update();
+
+-- db/migrate_010_template_notify.sql
+
+-- Any insert/update/delete of a template is announced on template_updates, so
+-- every API process can drop its cached copy (and its game set's list).
+CREATE OR REPLACE FUNCTION notify_template_change() RETURNS TRIGGER AS $$
+DECLARE
+  tpl templates%ROWTYPE;
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    tpl := OLD;
+  ELSE
+    tpl := NEW;
+  END IF;
+  PERFORM pg_notify(
+    'template_updates',
+    json_build_object('game_set', tpl.game_set, 'template_id', tpl.id)::text
+  );
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_templates_notify ON templates;
+CREATE TRIGGER trg_templates_notify
+AFTER INSERT OR UPDATE OR DELETE ON templates
+FOR EACH ROW
+EXECUTE FUNCTION notify_template_change();
+
+-- db/migrate_011_template_listing.sql
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Denormalized item count, kept in step by statement-level triggers on template_items.
+ALTER TABLE templates
+  ADD COLUMN IF NOT EXISTS item_count INT NOT NULL DEFAULT 0;
+
+-- Backfill without bumping updated_at (it orders the listing).
+ALTER TABLE templates DISABLE TRIGGER trg_templates_updated_at;
+UPDATE templates t
+SET item_count = c.n
+FROM (SELECT template_id, count(*)::int AS n FROM template_items GROUP BY template_id) c
+WHERE c.template_id = t.id AND t.item_count <> c.n;
+ALTER TABLE templates ENABLE TRIGGER trg_templates_updated_at;
+
+CREATE OR REPLACE FUNCTION template_items_count_added() RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE templates t
+  SET item_count = t.item_count + c.n
+  FROM (SELECT template_id, count(*)::int AS n FROM added_items GROUP BY template_id) c
+  WHERE t.id = c.template_id;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION template_items_count_removed() RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE templates t
+  SET item_count = t.item_count - c.n
+  FROM (SELECT template_id, count(*)::int AS n FROM removed_items GROUP BY template_id) c
+  WHERE t.id = c.template_id;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_template_items_count_added ON template_items;
+CREATE TRIGGER trg_template_items_count_added
+AFTER INSERT ON template_items
+REFERENCING NEW TABLE AS added_items
+FOR EACH STATEMENT
+EXECUTE FUNCTION template_items_count_added();
+
+DROP TRIGGER IF EXISTS trg_template_items_count_removed ON template_items;
+CREATE TRIGGER trg_template_items_count_removed
+AFTER DELETE ON template_items
+REFERENCING OLD TABLE AS removed_items
+FOR EACH STATEMENT
+EXECUTE FUNCTION template_items_count_removed();
+
+-- Per-game-set listing version: the ETag of every listing page.
+ALTER TABLE game_sets
+  ADD COLUMN IF NOT EXISTS templates_version BIGINT NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION bump_templates_version() RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE game_sets
+  SET templates_version = templates_version + 1
+  WHERE name = CASE WHEN TG_OP = 'DELETE' THEN OLD.game_set ELSE NEW.game_set END;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_templates_version ON templates;
+CREATE TRIGGER trg_templates_version
+AFTER INSERT OR UPDATE OR DELETE ON templates
+FOR EACH ROW
+EXECUTE FUNCTION bump_templates_version();
+
+-- Keyset pagination order and search.
+CREATE INDEX IF NOT EXISTS idx_templates_game_set_updated ON templates (game_set, updated_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_templates_search_trgm ON templates USING gin ((name || ' ' || prompt) gin_trgm_ops);
+
+-- db/migrate_012_image_thumbnails.sql
+
+-- Processed uploads link their thumbnail blob. Older blobs get one lazily
+-- the first time /api/images/<hash>/thumb is requested.
+ALTER TABLE images
+  ADD COLUMN IF NOT EXISTS thumb_hash TEXT REFERENCES images(hash);
+
+-- db/migrate_013_game_plans.sql
+
+-- A match of several rounds created up front by POST /api/game-plans.
+-- current_index is the round being played, so a reloaded client can resume.
+CREATE TABLE IF NOT EXISTS game_plans (
+  id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+  game_set TEXT NOT NULL REFERENCES game_sets(name) ON DELETE RESTRICT,
+  round_count INT NOT NULL,
+  current_index INT NOT NULL DEFAULT 0,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  CONSTRAINT chk_game_plans_index CHECK (current_index >= 0 AND current_index < round_count)
+);
+
+DROP TRIGGER IF EXISTS trg_game_plans_updated_at ON game_plans;
+CREATE TRIGGER trg_game_plans_updated_at
+BEFORE UPDATE ON game_plans
+FOR EACH ROW
+EXECUTE FUNCTION set_updated_at();
+
+ALTER TABLE rounds
+  ADD COLUMN IF NOT EXISTS plan_id UUID REFERENCES game_plans(id) ON DELETE SET NULL,
+  ADD COLUMN IF NOT EXISTS plan_index INT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_rounds_plan ON rounds (plan_id, plan_index) WHERE plan_id IS NOT NULL;
+
+-- db/migrate_014_round_archive.sql
+
+-- Summary of a finished round compacted by the retention job (ROUND_RETENTION_DAYS).
+-- The round itself, its items and turn log are deleted; this row is all that is kept.
+CREATE TABLE IF NOT EXISTS round_archive (
+  id UUID PRIMARY KEY,
+  game_set TEXT NOT NULL REFERENCES game_sets(name) ON DELETE RESTRICT,
+  kind TEXT NOT NULL,
+  category TEXT NOT NULL,
+  prompt TEXT NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL,
+  finished_at TIMESTAMPTZ,
+  winner_team INT,
+  loser_team INT,
+  item_count INT NOT NULL,
+  target_title TEXT,
+  plan_id UUID,
+  plan_index INT,
+  archived_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_round_archive_game_set ON round_archive (game_set, created_at);
+
+-- The retention job walks finished rounds oldest first.
+CREATE INDEX IF NOT EXISTS idx_rounds_finished_created ON rounds (created_at) WHERE status = 'finished';
+
+-- Image collection checks whether a blob is still some image's thumbnail.
+CREATE INDEX IF NOT EXISTS idx_images_thumb_hash ON images (thumb_hash) WHERE thumb_hash IS NOT NULL;
+
+-- db/migrate_015_game_set_stats.sql
+
+-- Rounds copied from a template remember it, so results can be grouped per template.
+-- A plain reference, like round_archive.template_id: it outlives the template, so
+-- deleting one neither touches its rounds nor moves their results to another key.
+ALTER TABLE rounds
+  ADD COLUMN IF NOT EXISTS template_id UUID;
+-- Names the results of deleted templates (GET /api/game-sets/<name>/stats).
+CREATE INDEX IF NOT EXISTS idx_rounds_template_id ON rounds (template_id) WHERE template_id IS NOT NULL;
+
+ALTER TABLE round_archive
+  ADD COLUMN IF NOT EXISTS template_id UUID,
+  ADD COLUMN IF NOT EXISTS turns INT;
+
+-- Finished-round counters per game set, maintained by trg_rounds_finished in the
+-- transaction that finishes the round. One row per source (template_id, or
+-- category for built-in rounds), kind and number of turns the round took, so
+-- GET /api/game-sets/<name>/stats never reads the rounds themselves.
+CREATE TABLE IF NOT EXISTS game_set_stats (
+  game_set TEXT NOT NULL REFERENCES game_sets(name) ON DELETE CASCADE,
+  template_id UUID,
+  category TEXT,
+  kind TEXT NOT NULL,
+  turns INT NOT NULL,
+  rounds INT NOT NULL DEFAULT 0,
+  team1_wins INT NOT NULL DEFAULT 0,
+  team2_wins INT NOT NULL DEFAULT 0,
+  draws INT NOT NULL DEFAULT 0,
+  CONSTRAINT uq_game_set_stats UNIQUE NULLS NOT DISTINCT (game_set, template_id, category, kind, turns)
+);
+
+CREATE OR REPLACE FUNCTION count_finished_round() RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO game_set_stats AS s (game_set, template_id, category, kind, turns, rounds, team1_wins, team2_wins, draws)
+  VALUES (
+    NEW.game_set,
+    NEW.template_id,
+    CASE WHEN NEW.template_id IS NULL THEN NEW.category END,
+    NEW.kind,
+    NEW.version,
+    1,
+    CASE WHEN NEW.winner_team = 1 THEN 1 ELSE 0 END,
+    CASE WHEN NEW.winner_team = 2 THEN 1 ELSE 0 END,
+    CASE WHEN NEW.winner_team IS NULL THEN 1 ELSE 0 END
+  )
+  ON CONFLICT ON CONSTRAINT uq_game_set_stats DO UPDATE
+  SET rounds = s.rounds + 1,
+      team1_wins = s.team1_wins + EXCLUDED.team1_wins,
+      team2_wins = s.team2_wins + EXCLUDED.team2_wins,
+      draws = s.draws + EXCLUDED.draws;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_rounds_finished ON rounds;
+CREATE TRIGGER trg_rounds_finished
+AFTER UPDATE OF status ON rounds
+FOR EACH ROW
+WHEN (OLD.status IS DISTINCT FROM NEW.status AND NEW.status = 'finished')
+EXECUTE FUNCTION count_finished_round();
+
+-- Backfill from the rounds finished (and archived) before the counters existed.
+INSERT INTO game_set_stats (game_set, template_id, category, kind, turns, rounds, team1_wins, team2_wins, draws)
+SELECT game_set, template_id, CASE WHEN template_id IS NULL THEN category END, kind, turns,
+       count(*),
+       count(*) FILTER (WHERE winner_team = 1),
+       count(*) FILTER (WHERE winner_team = 2),
+       count(*) FILTER (WHERE winner_team IS NULL)
+FROM (
+  SELECT r.game_set, r.template_id, r.category, r.kind, e.turns, r.winner_team
+  FROM rounds r
+  -- counted, not taken from version: rounds from before migrate_006 have version 0
+  CROSS JOIN LATERAL (
+    SELECT count(*)::int AS turns FROM items i WHERE i.round_id = r.id AND i.eliminated
+  ) e
+  WHERE r.status = 'finished'
+  UNION ALL
+  SELECT game_set, template_id, category, kind, coalesce(turns, 0), winner_team
+  FROM round_archive
+) finished
+WHERE NOT EXISTS (SELECT 1 FROM game_set_stats)
+GROUP BY 1, 2, 3, 4, 5;
+
+-- db/migrate_016_round_history.sql
+
+-- Keyset pages of GET /api/rounds, newest first, with and without ?status=.
+-- The second index also serves plain game_set lookups, replacing idx_rounds_game_set.
+CREATE INDEX IF NOT EXISTS idx_rounds_game_set_status ON rounds (game_set, status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_rounds_game_set_created ON rounds (game_set, created_at DESC, id DESC);
+
+DROP INDEX IF EXISTS idx_rounds_game_set;
+
+-- Items a round was created with, for the summaries (remaining_count only
+-- counts down). Set by every INSERT INTO rounds; older rounds are counted once.
+ALTER TABLE rounds
+  ADD COLUMN IF NOT EXISTS item_count INT;
+
+UPDATE rounds r
+SET item_count = (SELECT count(*) FROM items i WHERE i.round_id = r.id)
+WHERE item_count IS NULL;
+
+ALTER TABLE rounds ALTER COLUMN item_count SET DEFAULT 0;
+ALTER TABLE rounds ALTER COLUMN item_count SET NOT NULL;
+
+-- db/migrate_017_round_event_failures.sql
+
+-- Turns the in-process round engine (ROUND_ENGINE=memory) could not persist
+-- after ROUND_ENGINE_FLUSH_ATTEMPTS tries. Kept for inspection; no foreign
+-- keys, so a failure is recorded even when its round is gone.
+CREATE TABLE IF NOT EXISTS round_event_failures (
+  round_id UUID NOT NULL,
+  version INT NOT NULL,
+  item_id UUID NOT NULL,
+  team INT NOT NULL,
+  current_team INT NOT NULL,
+  status TEXT NOT NULL,
+  winner_team INT,
+  loser_team INT,
+  created_at TIMESTAMPTZ NOT NULL,
+  error TEXT NOT NULL,
+  failed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- db/migrate_020_image_refs.sql
+
+-- Image collection (retention.py) asks, blob by blob, whether anything still
+-- uses it; without these it scans the referencing tables.
+CREATE INDEX IF NOT EXISTS idx_rounds_image_hash ON rounds (image_hash) WHERE image_hash IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_items_image_hash ON items (image_hash) WHERE image_hash IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_templates_image_hash ON templates (image_hash) WHERE image_hash IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_template_items_image_hash ON template_items (image_hash) WHERE image_hash IS NOT NULL;
+
+-- db/migrate_021_round_delete_notify.sql
+
+-- Deleted rounds (retention, game set removal) are announced on round_deletes,
+-- so every API process can drop a cached copy of the finished round.
+CREATE OR REPLACE FUNCTION notify_round_delete() RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM pg_notify(
+    'round_deletes',
+    json_build_object('round_id', OLD.id, 'game_set', OLD.game_set)::text
+  );
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_rounds_delete_notify ON rounds;
+CREATE TRIGGER trg_rounds_delete_notify
+AFTER DELETE ON rounds
+FOR EACH ROW
+EXECUTE FUNCTION notify_round_delete();
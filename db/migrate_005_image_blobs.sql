@@ -0,0 +1,77 @@
+-- db/migrate_005_image_blobs.sql
+
+-- Content-addressed image store: one row per distinct image (sha256 of the bytes).
+CREATE TABLE IF NOT EXISTS images (
+  hash TEXT PRIMARY KEY,
+  mime TEXT NOT NULL,
+  data BYTEA NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Rounds/templates reference images by hash instead of carrying base64 copies
+ALTER TABLE rounds
+  ADD COLUMN IF NOT EXISTS image_hash TEXT REFERENCES images(hash);
+
+ALTER TABLE items
+  ADD COLUMN IF NOT EXISTS image_hash TEXT REFERENCES images(hash);
+
+ALTER TABLE templates
+  ADD COLUMN IF NOT EXISTS image_hash TEXT REFERENCES images(hash);
+
+ALTER TABLE template_items
+  ADD COLUMN IF NOT EXISTS image_hash TEXT REFERENCES images(hash);
+
+-- Backfill: move inline base64 / data URL values into images (idempotent)
+CREATE OR REPLACE FUNCTION migrate_image_blob(src TEXT) RETURNS TEXT AS $$
+DECLARE
+  mime TEXT;
+  raw BYTEA;
+  h TEXT;
+BEGIN
+  IF src IS NULL OR btrim(src) = '' THEN
+    RETURN NULL;
+  END IF;
+
+  mime := substring(src FROM '^data:([^;,]+)');
+  raw := decode(regexp_replace(regexp_replace(src, '^data:[^,]*,', ''), '\s', '', 'g'), 'base64');
+
+  IF mime IS NULL THEN
+    mime := CASE
+      WHEN substring(raw FROM 1 FOR 3) = '\xffd8ff'::bytea THEN 'image/jpeg'
+      WHEN substring(raw FROM 1 FOR 4) = '\x89504e47'::bytea THEN 'image/png'
+      WHEN substring(raw FROM 1 FOR 3) = '\x474946'::bytea THEN 'image/gif'
+      WHEN substring(raw FROM 9 FOR 4) = '\x57454250'::bytea THEN 'image/webp'
+      ELSE 'application/octet-stream'
+    END;
+  END IF;
+
+  h := encode(sha256(raw), 'hex');
+  INSERT INTO images (hash, mime, data) VALUES (h, mime, raw)
+  ON CONFLICT (hash) DO NOTHING;
+  RETURN h;
+EXCEPTION WHEN others THEN
+  -- undecodable legacy value: drop the image rather than fail the migration
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+  tbl TEXT;
+BEGIN
+  FOREACH tbl IN ARRAY ARRAY['rounds', 'items', 'templates', 'template_items'] LOOP
+    IF EXISTS (
+      SELECT 1 FROM information_schema.columns
+      WHERE table_schema = current_schema() AND table_name = tbl AND column_name = 'image_data'
+    ) THEN
+      EXECUTE format(
+        'UPDATE %I SET image_hash = migrate_image_blob(image_data)
+         WHERE image_data IS NOT NULL AND image_hash IS NULL',
+        tbl
+      );
+      EXECUTE format('ALTER TABLE %I DROP COLUMN image_data', tbl);
+    END IF;
+  END LOOP;
+END $$;
+
+DROP FUNCTION IF EXISTS migrate_image_blob(TEXT);
@@ -0,0 +1,9 @@
+-- db/migrate_006_round_versions.sql
+
+-- Monotonic per-round version: bumped on every turn. Items remember the
+-- version that last changed them so clients can fetch deltas (?since=N).
+ALTER TABLE rounds
+  ADD COLUMN IF NOT EXISTS version INT NOT NULL DEFAULT 0;
+
+ALTER TABLE items
+  ADD COLUMN IF NOT EXISTS version INT NOT NULL DEFAULT 0;
@@ -0,0 +1,14 @@
+-- db/migrate_007_remaining_count.sql
+
+-- Maintained count of non-eliminated items, so a turn never has to COUNT(*) items
+ALTER TABLE rounds
+  ADD COLUMN IF NOT EXISTS remaining_count INT;
+
+UPDATE rounds r
+SET remaining_count = (
+  SELECT count(*) FROM items i WHERE i.round_id = r.id AND NOT i.eliminated
+)
+WHERE remaining_count IS NULL;
+
+ALTER TABLE rounds ALTER COLUMN remaining_count SET DEFAULT 0;
+ALTER TABLE rounds ALTER COLUMN remaining_count SET NOT NULL;
@@ -0,0 +1,16 @@
+-- db/migrate_008_round_events.sql
+
+-- Append-only elimination log written by the in-process round engine
+-- (ROUND_ENGINE=memory). Each row is one turn and the round state it produced.
+CREATE TABLE IF NOT EXISTS round_events (
+  round_id UUID NOT NULL REFERENCES rounds(id) ON DELETE CASCADE,
+  version INT NOT NULL,
+  item_id UUID NOT NULL,
+  team INT NOT NULL,
+  current_team INT NOT NULL,
+  status TEXT NOT NULL,
+  winner_team INT,
+  loser_team INT,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (round_id, version)
+);
@@ -0,0 +1,20 @@
+-- db/migrate_009_round_notify.sql
+
+-- Every committed turn (version bump) is announced on the round_updates channel,
+-- so each API process can push it to the round's SSE subscribers.
+CREATE OR REPLACE FUNCTION notify_round_update() RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM pg_notify(
+    'round_updates',
+    json_build_object('round_id', NEW.id, 'game_set', NEW.game_set, 'version', NEW.version)::text
+  );
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_rounds_notify ON rounds;
+CREATE TRIGGER trg_rounds_notify
+AFTER UPDATE OF version ON rounds
+FOR EACH ROW
+WHEN (OLD.version IS DISTINCT FROM NEW.version)
+EXECUTE FUNCTION notify_round_update();
@@ -0,0 +1,26 @@
+-- db/migrate_010_template_notify.sql
+
+-- Any insert/update/delete of a template is announced on template_updates, so
+-- every API process can drop its cached copy (and its game set's list).
+CREATE OR REPLACE FUNCTION notify_template_change() RETURNS TRIGGER AS $$
+DECLARE
+  tpl templates%ROWTYPE;
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    tpl := OLD;
+  ELSE
+    tpl := NEW;
+  END IF;
+  PERFORM pg_notify(
+    'template_updates',
+    json_build_object('game_set', tpl.game_set, 'template_id', tpl.id)::text
+  );
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_templates_notify ON templates;
+CREATE TRIGGER trg_templates_notify
+AFTER INSERT OR UPDATE OR DELETE ON templates
+FOR EACH ROW
+EXECUTE FUNCTION notify_template_change();
@@ -0,0 +1,72 @@
+-- db/migrate_011_template_listing.sql
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Denormalized item count, kept in step by statement-level triggers on template_items.
+ALTER TABLE templates
+  ADD COLUMN IF NOT EXISTS item_count INT NOT NULL DEFAULT 0;
+
+-- Backfill without bumping updated_at (it orders the listing).
+ALTER TABLE templates DISABLE TRIGGER trg_templates_updated_at;
+UPDATE templates t
+SET item_count = c.n
+FROM (SELECT template_id, count(*)::int AS n FROM template_items GROUP BY template_id) c
+WHERE c.template_id = t.id AND t.item_count <> c.n;
+ALTER TABLE templates ENABLE TRIGGER trg_templates_updated_at;
+
+CREATE OR REPLACE FUNCTION template_items_count_added() RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE templates t
+  SET item_count = t.item_count + c.n
+  FROM (SELECT template_id, count(*)::int AS n FROM added_items GROUP BY template_id) c
+  WHERE t.id = c.template_id;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION template_items_count_removed() RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE templates t
+  SET item_count = t.item_count - c.n
+  FROM (SELECT template_id, count(*)::int AS n FROM removed_items GROUP BY template_id) c
+  WHERE t.id = c.template_id;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_template_items_count_added ON template_items;
+CREATE TRIGGER trg_template_items_count_added
+AFTER INSERT ON template_items
+REFERENCING NEW TABLE AS added_items
+FOR EACH STATEMENT
+EXECUTE FUNCTION template_items_count_added();
+
+DROP TRIGGER IF EXISTS trg_template_items_count_removed ON template_items;
+CREATE TRIGGER trg_template_items_count_removed
+AFTER DELETE ON template_items
+REFERENCING OLD TABLE AS removed_items
+FOR EACH STATEMENT
+EXECUTE FUNCTION template_items_count_removed();
+
+-- Per-game-set listing version: the ETag of every listing page.
+ALTER TABLE game_sets
+  ADD COLUMN IF NOT EXISTS templates_version BIGINT NOT NULL DEFAULT 0;
+
+CREATE OR REPLACE FUNCTION bump_templates_version() RETURNS TRIGGER AS $$
+BEGIN
+  UPDATE game_sets
+  SET templates_version = templates_version + 1
+  WHERE name = CASE WHEN TG_OP = 'DELETE' THEN OLD.game_set ELSE NEW.game_set END;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_templates_version ON templates;
+CREATE TRIGGER trg_templates_version
+AFTER INSERT OR UPDATE OR DELETE ON templates
+FOR EACH ROW
+EXECUTE FUNCTION bump_templates_version();
+
+-- Keyset pagination order and search.
+CREATE INDEX IF NOT EXISTS idx_templates_game_set_updated ON templates (game_set, updated_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_templates_search_trgm ON templates USING gin ((name || ' ' || prompt) gin_trgm_ops);
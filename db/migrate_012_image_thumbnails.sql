@@ -0,0 +1,6 @@
+-- db/migrate_012_image_thumbnails.sql
+
+-- Processed uploads link their thumbnail blob. Older blobs get one lazily
+-- the first time /api/images/<hash>/thumb is requested.
+ALTER TABLE images
+  ADD COLUMN IF NOT EXISTS thumb_hash TEXT REFERENCES images(hash);
@@ -0,0 +1,25 @@
+-- db/migrate_013_game_plans.sql
+
+-- A match of several rounds created up front by POST /api/game-plans.
+-- current_index is the round being played, so a reloaded client can resume.
+CREATE TABLE IF NOT EXISTS game_plans (
+  id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+  game_set TEXT NOT NULL REFERENCES game_sets(name) ON DELETE RESTRICT,
+  round_count INT NOT NULL,
+  current_index INT NOT NULL DEFAULT 0,
+  created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+  CONSTRAINT chk_game_plans_index CHECK (current_index >= 0 AND current_index < round_count)
+);
+
+DROP TRIGGER IF EXISTS trg_game_plans_updated_at ON game_plans;
+CREATE TRIGGER trg_game_plans_updated_at
+BEFORE UPDATE ON game_plans
+FOR EACH ROW
+EXECUTE FUNCTION set_updated_at();
+
+ALTER TABLE rounds
+  ADD COLUMN IF NOT EXISTS plan_id UUID REFERENCES game_plans(id) ON DELETE SET NULL,
+  ADD COLUMN IF NOT EXISTS plan_index INT;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_rounds_plan ON rounds (plan_id, plan_index) WHERE plan_id IS NOT NULL;
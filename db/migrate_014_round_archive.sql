@@ -0,0 +1,28 @@
+-- db/migrate_014_round_archive.sql
+
+-- Summary of a finished round compacted by the retention job (ROUND_RETENTION_DAYS).
+-- The round itself, its items and turn log are deleted; this row is all that is kept.
+CREATE TABLE IF NOT EXISTS round_archive (
+  id UUID PRIMARY KEY,
+  game_set TEXT NOT NULL REFERENCES game_sets(name) ON DELETE RESTRICT,
+  kind TEXT NOT NULL,
+  category TEXT NOT NULL,
+  prompt TEXT NOT NULL,
+  created_at TIMESTAMPTZ NOT NULL,
+  finished_at TIMESTAMPTZ,
+  winner_team INT,
+  loser_team INT,
+  item_count INT NOT NULL,
+  target_title TEXT,
+  plan_id UUID,
+  plan_index INT,
+  archived_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_round_archive_game_set ON round_archive (game_set, created_at);
+
+-- The retention job walks finished rounds oldest first.
+CREATE INDEX IF NOT EXISTS idx_rounds_finished_created ON rounds (created_at) WHERE status = 'finished';
+
+-- Image collection checks whether a blob is still some image's thumbnail.
+CREATE INDEX IF NOT EXISTS idx_images_thumb_hash ON images (thumb_hash) WHERE thumb_hash IS NOT NULL;
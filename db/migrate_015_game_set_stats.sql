@@ -0,0 +1,82 @@
+-- db/migrate_015_game_set_stats.sql
+
+-- Rounds copied from a template remember it, so results can be grouped per template.
+-- A plain reference, like round_archive.template_id: it outlives the template, so
+-- deleting one neither touches its rounds nor moves their results to another key.
+ALTER TABLE rounds
+  ADD COLUMN IF NOT EXISTS template_id UUID;
+-- Names the results of deleted templates (GET /api/game-sets/<name>/stats).
+CREATE INDEX IF NOT EXISTS idx_rounds_template_id ON rounds (template_id) WHERE template_id IS NOT NULL;
+
+ALTER TABLE round_archive
+  ADD COLUMN IF NOT EXISTS template_id UUID,
+  ADD COLUMN IF NOT EXISTS turns INT;
+
+-- Finished-round counters per game set, maintained by trg_rounds_finished in the
+-- transaction that finishes the round. One row per source (template_id, or
+-- category for built-in rounds), kind and number of turns the round took, so
+-- GET /api/game-sets/<name>/stats never reads the rounds themselves.
+CREATE TABLE IF NOT EXISTS game_set_stats (
+  game_set TEXT NOT NULL REFERENCES game_sets(name) ON DELETE CASCADE,
+  template_id UUID,
+  category TEXT,
+  kind TEXT NOT NULL,
+  turns INT NOT NULL,
+  rounds INT NOT NULL DEFAULT 0,
+  team1_wins INT NOT NULL DEFAULT 0,
+  team2_wins INT NOT NULL DEFAULT 0,
+  draws INT NOT NULL DEFAULT 0,
+  CONSTRAINT uq_game_set_stats UNIQUE NULLS NOT DISTINCT (game_set, template_id, category, kind, turns)
+);
+
+CREATE OR REPLACE FUNCTION count_finished_round() RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO game_set_stats AS s (game_set, template_id, category, kind, turns, rounds, team1_wins, team2_wins, draws)
+  VALUES (
+    NEW.game_set,
+    NEW.template_id,
+    CASE WHEN NEW.template_id IS NULL THEN NEW.category END,
+    NEW.kind,
+    NEW.version,
+    1,
+    CASE WHEN NEW.winner_team = 1 THEN 1 ELSE 0 END,
+    CASE WHEN NEW.winner_team = 2 THEN 1 ELSE 0 END,
+    CASE WHEN NEW.winner_team IS NULL THEN 1 ELSE 0 END
+  )
+  ON CONFLICT ON CONSTRAINT uq_game_set_stats DO UPDATE
+  SET rounds = s.rounds + 1,
+      team1_wins = s.team1_wins + EXCLUDED.team1_wins,
+      team2_wins = s.team2_wins + EXCLUDED.team2_wins,
+      draws = s.draws + EXCLUDED.draws;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_rounds_finished ON rounds;
+CREATE TRIGGER trg_rounds_finished
+AFTER UPDATE OF status ON rounds
+FOR EACH ROW
+WHEN (OLD.status IS DISTINCT FROM NEW.status AND NEW.status = 'finished')
+EXECUTE FUNCTION count_finished_round();
+
+-- Backfill from the rounds finished (and archived) before the counters existed.
+INSERT INTO game_set_stats (game_set, template_id, category, kind, turns, rounds, team1_wins, team2_wins, draws)
+SELECT game_set, template_id, CASE WHEN template_id IS NULL THEN category END, kind, turns,
+       count(*),
+       count(*) FILTER (WHERE winner_team = 1),
+       count(*) FILTER (WHERE winner_team = 2),
+       count(*) FILTER (WHERE winner_team IS NULL)
+FROM (
+  SELECT r.game_set, r.template_id, r.category, r.kind, e.turns, r.winner_team
+  FROM rounds r
+  -- counted, not taken from version: rounds from before migrate_006 have version 0
+  CROSS JOIN LATERAL (
+    SELECT count(*)::int AS turns FROM items i WHERE i.round_id = r.id AND i.eliminated
+  ) e
+  WHERE r.status = 'finished'
+  UNION ALL
+  SELECT game_set, template_id, category, kind, coalesce(turns, 0), winner_team
+  FROM round_archive
+) finished
+WHERE NOT EXISTS (SELECT 1 FROM game_set_stats)
+GROUP BY 1, 2, 3, 4, 5;
@@ -0,0 +1,20 @@
+-- db/migrate_016_round_history.sql
+
+-- Keyset pages of GET /api/rounds, newest first, with and without ?status=.
+-- The second index also serves plain game_set lookups, replacing idx_rounds_game_set.
+CREATE INDEX IF NOT EXISTS idx_rounds_game_set_status ON rounds (game_set, status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_rounds_game_set_created ON rounds (game_set, created_at DESC, id DESC);
+
+DROP INDEX IF EXISTS idx_rounds_game_set;
+
+-- Items a round was created with, for the summaries (remaining_count only
+-- counts down). Set by every INSERT INTO rounds; older rounds are counted once.
+ALTER TABLE rounds
+  ADD COLUMN IF NOT EXISTS item_count INT;
+
+UPDATE rounds r
+SET item_count = (SELECT count(*) FROM items i WHERE i.round_id = r.id)
+WHERE item_count IS NULL;
+
+ALTER TABLE rounds ALTER COLUMN item_count SET DEFAULT 0;
+ALTER TABLE rounds ALTER COLUMN item_count SET NOT NULL;
@@ -0,0 +1,18 @@
+-- db/migrate_017_round_event_failures.sql
+
+-- Turns the in-process round engine (ROUND_ENGINE=memory) could not persist
+-- after ROUND_ENGINE_FLUSH_ATTEMPTS tries. Kept for inspection; no foreign
+-- keys, so a failure is recorded even when its round is gone.
+CREATE TABLE IF NOT EXISTS round_event_failures (
+  round_id UUID NOT NULL,
+  version INT NOT NULL,
+  item_id UUID NOT NULL,
+  team INT NOT NULL,
+  current_team INT NOT NULL,
+  status TEXT NOT NULL,
+  winner_team INT,
+  loser_team INT,
+  created_at TIMESTAMPTZ NOT NULL,
+  error TEXT NOT NULL,
+  failed_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
@@ -0,0 +1,8 @@
+-- db/migrate_020_image_refs.sql
+
+-- Image collection (retention.py) asks, blob by blob, whether anything still
+-- uses it; without these it scans the referencing tables.
+CREATE INDEX IF NOT EXISTS idx_rounds_image_hash ON rounds (image_hash) WHERE image_hash IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_items_image_hash ON items (image_hash) WHERE image_hash IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_templates_image_hash ON templates (image_hash) WHERE image_hash IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_template_items_image_hash ON template_items (image_hash) WHERE image_hash IS NOT NULL;
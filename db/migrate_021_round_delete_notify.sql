@@ -0,0 +1,19 @@
+-- db/migrate_021_round_delete_notify.sql
+
+-- Deleted rounds (retention, game set removal) are announced on round_deletes,
+-- so every API process can drop a cached copy of the finished round.
+CREATE OR REPLACE FUNCTION notify_round_delete() RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM pg_notify(
+    'round_deletes',
+    json_build_object('round_id', OLD.id, 'game_set', OLD.game_set)::text
+  );
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_rounds_delete_notify ON rounds;
+CREATE TRIGGER trg_rounds_delete_notify
+AFTER DELETE ON rounds
+FOR EACH ROW
+EXECUTE FUNCTION notify_round_delete();
@@ -15,6 +15,7 @@ function setGameSet(name) {
   currentTemplateId = null;
   itemImageCacheRoundId = null;
   itemImageCache = new Map();
+  httpCache = new Map();
 }
 
 function initCarouselControls(onPickItem) {
@@ -68,9 +69,13 @@ let teamNames = {
 let templatesCache = [];
 let currentTemplateId = null;
 let currentTemplateKind = "rated";
+let editorTemplate = null; // template as last loaded into the editor (for PATCH diffs)
 
 let templatesLoadedAt = 0;
 
+// Conditional GET: last body + ETag per path, revalidated with If-None-Match.
+let httpCache = new Map(); // path -> { etag, data }
+
 // Cache item images locally so UI (Show image) doesn't disappear
 // when backend returns "light" items (without image_data) after actions.
 let itemImageCacheRoundId = null;
@@ -102,10 +107,60 @@ function syncRoundItemImages(r, { reset = false } = {}) {
   return r;
 }
 
+// Merge a compact eliminate/GET ?since= response into the round we already hold.
+function applyRoundDelta(r, delta) {
+  if (!r || !delta || String(r.id) !== String(delta.id)) return delta;
+
+  const changed = new Map((delta.items || []).map((it) => [String(it.id), it]));
+  return {
+    ...r,
+    version: delta.version,
+    current_team: delta.current_team,
+    status: delta.status,
+    winner_team: delta.winner_team,
+    loser_team: delta.loser_team,
+    items: (r.items || []).map((it) => changed.get(String(it.id)) || it),
+  };
+}
+
+// Live updates for the round on screen (turns made from another device/tab).
+let roundEvents = null;
+
+function closeRoundEvents() {
+  if (roundEvents) {
+    roundEvents.close();
+    roundEvents = null;
+  }
+}
+
+function subscribeRoundEvents(r) {
+  closeRoundEvents();
+  if (!r || r.id == null || r.status !== "active" || !gameSet || typeof EventSource === "undefined") return;
+
+  const qs = `since=${r.version ?? 0}&game_set=${encodeURIComponent(gameSet)}`;
+  const es = new EventSource(`/api/rounds/${r.id}/events?${qs}`);
+  es.addEventListener("round", (e) => {
+    let delta;
+    try {
+      delta = JSON.parse(e.data);
+    } catch {
+      return;
+    }
+    if (!round || String(round.id) !== String(delta.id)) return;
+    if ((delta.version ?? 0) <= (round.version ?? 0)) return;
+
+    round = syncRoundItemImages(applyRoundDelta(round, delta));
+    renderGame();
+    if (round.status !== "active") closeRoundEvents();
+  });
+  roundEvents = es;
+}
+
 /* Multi-round match state */
 let gamePlanDraft = []; // what host selects on Teams screen (ordered)
 let gamePlan = [];      // frozen plan for current match
 let gameIndex = 0;      // current round index in gamePlan
+let matchPlan = null;   // server-side plan for the match: { id, current_index, rounds: [handles] }
 let scores = { 1: 0, 2: 0 };
 
 const el = (id) => document.getElementById(id);
@@ -161,6 +216,8 @@ function showScreen(name) {
   // menu button only inside game/editor/teams
   el("menuBtn")?.classList.toggle("hidden", name === "screenMenu" || name === "screenLogin");
   document.body.classList.toggle("modeGame", name === "screenGame");
+  if (name !== "screenGame") closeRoundEvents();
+  if (name === "screenMenu") renderResumeButton();
 }
 
 function openItemModal({ title, image_data, text }) {
@@ -172,7 +229,7 @@ function openItemModal({ title, image_data, text }) {
   if (!modal || !img || !ttl || !txt) return;
 
   ttl.textContent = title || "";
-  img.src = detectDataUrl(image_data || "");
+  img.src = detectDataUrl(fullImageUrl(image_data));
   txt.textContent = text || "";
 
   modal.classList.remove("hidden");
@@ -231,8 +288,8 @@ async function api(path, options = {}) {
   const isGameSetEndpoint = String(path || "").startsWith("/api/game-sets");
 
   const headers = {
+    ...(typeof options.body === "string" ? { "Content-Type": "application/json" } : {}),
     ...(options.headers || {}),
-    ...(options.body ? { "Content-Type": "application/json" } : {}),
   };
 
   if (!isGameSetEndpoint) {
@@ -240,11 +297,17 @@ async function api(path, options = {}) {
     headers["X-Game-Set"] = gameSet;
   }
 
+  const isGet = !options.method || options.method === "GET";
+  const cached = isGet ? httpCache.get(path) : null;
+  if (cached) headers["If-None-Match"] = cached.etag;
+
   const res = await fetch(path, {
     ...options,
     headers,
   });
 
+  if (res.status === 304 && cached) return cached.data;
+
   if (!res.ok) {
     let msg = `${res.status} ${res.statusText}`;
     try {
@@ -257,7 +320,12 @@ async function api(path, options = {}) {
   // Some endpoints might be empty responses
   const ct = res.headers.get("content-type") || "";
   if (!ct.includes("application/json")) return null;
-  return res.json();
+  const data = await res.json();
+
+  const etag = res.headers.get("ETag");
+  if (isGet && etag) httpCache.set(path, { etag, data });
+  else if (!isGet) httpCache.delete(path);
+  return data;
 }
 
 /* ---------- Templates loading ---------- */
@@ -265,8 +333,17 @@ async function loadTemplates({ force = false } = {}) {
   const now = Date.now();
   if (!force && templatesCache.length && (now - templatesLoadedAt) < 30000) return templatesCache;
 
-  const data = await api("/api/templates");
-  templatesCache = data.templates || [];
+  // The listing is keyset-paginated; the round picker needs every template.
+  const all = [];
+  let cursor = null;
+  do {
+    const qs = new URLSearchParams({ limit: "200" });
+    if (cursor) qs.set("cursor", cursor);
+    const data = await api(`/api/templates?${qs}`);
+    all.push(...(data.templates || []));
+    cursor = data.next_cursor;
+  } while (cursor);
+  templatesCache = all;
   templatesLoadedAt = now;
   return templatesCache;
 }
@@ -362,15 +439,95 @@ function getCurrentRoundSetId() {
   return gamePlan[gameIndex] || "builtin:movies";
 }
 
-async function createRoundFor(roundSetId) {
+function planEntryFor(roundSetId) {
   if (roundSetId && roundSetId.startsWith("template:")) {
-    const templateId = roundSetId.slice("template:".length);
+    return { template_id: roundSetId.slice("template:".length) };
+  }
+  return { category: (roundSetId || "").slice("builtin:".length) || "movies" };
+}
 
-    // Create the round instance.
-    const created = await api("/api/rounds/from-template", {
-      method: "POST",
-      body: JSON.stringify({ template_id: templateId }),
-    });
+// Creates every round of the match in one request; rounds are then loaded by id.
+async function createMatchPlan() {
+  matchPlan = await api("/api/game-plans", {
+    method: "POST",
+    body: JSON.stringify({ rounds: gamePlan.map(planEntryFor) }),
+  });
+  rememberMatch();
+}
+
+function saveMatchProgress() {
+  if (!matchPlan) return;
+  rememberMatch();
+  api(`/api/game-plans/${matchPlan.id}`, {
+    method: "PATCH",
+    body: JSON.stringify({ current_index: gameIndex }),
+  }).catch((e) => console.warn("Could not save match progress", e));
+}
+
+// The running match (plan id, picked round sets, scores) survives a reload;
+// the rounds themselves are read back from the server plan.
+function rememberMatch() {
+  if (!matchPlan) return;
+  localStorage.setItem("match", JSON.stringify({ gameSet, id: matchPlan.id, plan: gamePlan, scores }));
+}
+
+function forgetMatch() {
+  localStorage.removeItem("match");
+  renderResumeButton();
+}
+
+function savedMatch() {
+  try {
+    const saved = JSON.parse(localStorage.getItem("match") || "null");
+    return saved && saved.id && saved.gameSet === gameSet ? saved : null;
+  } catch (_) {
+    return null;
+  }
+}
+
+function renderResumeButton() {
+  el("goResumeGame")?.classList.toggle("hidden", !savedMatch());
+}
+
+// Continues the saved match from its first unfinished round.
+async function resumeMatch() {
+  const saved = savedMatch();
+  if (!saved) return;
+
+  let plan;
+  try {
+    plan = await api(`/api/game-plans/${saved.id}`);
+  } catch (e) {
+    if (String(e.message) === "Game plan not found") forgetMatch();
+    openModal("Error", escapeHtml(String(e.message || e)));
+    return;
+  }
+
+  const next = (plan.rounds || []).findIndex((r) => r.status !== "finished");
+  if (next < 0) {
+    forgetMatch();
+    openModal("Match over", "Every round of this match has been played.");
+    return;
+  }
+
+  matchPlan = plan;
+  gamePlan = Array.isArray(saved.plan) && saved.plan.length === plan.rounds.length
+    ? saved.plan
+    : plan.rounds.map((r) => `builtin:${r.category}`);
+  gameIndex = next;
+  scores = { 1: saved.scores?.[1] ?? 0, 2: saved.scores?.[2] ?? 0 };
+  renderScores();
+  if (next !== plan.current_index) saveMatchProgress();
+  await startRound();
+}
+
+async function loadRoundFor(roundSetId) {
+  const handle = matchPlan?.rounds?.[gameIndex];
+  if (!handle) throw new Error("Round is missing from the match plan.");
+  const created = await api(`/api/rounds/${handle.id}`);
+
+  if (roundSetId && roundSetId.startsWith("template:")) {
+    const templateId = roundSetId.slice("template:".length);
 
     // Some backends return "light" items for active rounds (without item.image_data).
     // Hydrate images from the template so "Show image" is available immediately.
@@ -403,15 +560,9 @@ async function createRoundFor(roundSetId) {
     } catch (_) {
       // If hydration fails we still can play the round; "Show image" just won't appear.
     }
-
-    return created;
   }
 
-  // builtin
-  return api("/api/rounds", {
-    method: "POST",
-    body: JSON.stringify({ category: "movies" }),
-  });
+  return created;
 }
 
 
@@ -428,7 +579,7 @@ function renderRoundImage() {
   }
 
   frame.classList.remove("hidden");
-  img.src = detectDataUrl(data);
+  img.src = detectDataUrl(fullImageUrl(data));
 }
 
 function renderGame() {
@@ -586,10 +737,11 @@ async function startRound() {
   carouselIndex = 0;
 
   try {
-    round = await createRoundFor(getCurrentRoundSetId());
+    round = await loadRoundFor(getCurrentRoundSetId());
     round = syncRoundItemImages(round, { reset: true });
     showScreen("screenGame");
     renderGame();
+    subscribeRoundEvents(round);
   } catch (e) {
     openModal("Error", escapeHtml(String(e.message || e)));
   }
@@ -599,12 +751,19 @@ async function startMatch() {
   scores = { 1: 0, 2: 0 };
   gameIndex = 0;
   renderScores();
+  try {
+    await createMatchPlan();
+  } catch (e) {
+    openModal("Error", escapeHtml(String(e.message || e)));
+    return;
+  }
   await startRound();
 }
 
 async function goNextRound() {
   if (!hasNextRound()) return;
   gameIndex += 1;
+  saveMatchProgress();
   await startRound();
 }
 
@@ -613,17 +772,20 @@ async function eliminate(itemId) {
     const actingTeam = round.current_team;
     const prevKind = round.kind || "rated";
 
-    round = await api(`/api/rounds/${round.id}/eliminate`, {
+    const delta = await api(`/api/rounds/${round.id}/eliminate?compact=true&since=${round.version ?? 0}`, {
       method: "POST",
       body: JSON.stringify({ item_id: itemId }),
     });
-    round = syncRoundItemImages(round);
+    round = syncRoundItemImages(applyRoundDelta(round, delta));
+    if (round.status !== "active") closeRoundEvents();
     const picked = round.items.find((x) => String(x.id) === String(itemId));
     const isFinished = round.status !== "active";
     const pickedWasTarget = !!(picked && isFinished && picked.is_target === true);
 
     if (pickedWasTarget) scores[actingTeam] = (scores[actingTeam] || 0) - 4;
     else scores[actingTeam] = (scores[actingTeam] || 0) + 1;
+    if (isFinished && !hasNextRound()) forgetMatch();
+    else rememberMatch();
 
     renderGame();
 
@@ -649,6 +811,8 @@ function detectDataUrl(data) {
   const s = String(data || "").trim();
   if (!s) return "";
   if (s.startsWith("data:")) return s;
+  // Stored images come back as /api/images/<hash> references.
+  if (s.startsWith("/") || /^https?:\/\//.test(s)) return s;
 
   let mime = "image/png";
   if (s.startsWith("/9j/")) mime = "image/jpeg";
@@ -659,41 +823,26 @@ function detectDataUrl(data) {
   return `data:${mime};base64,${s}`;
 }
 
-function fileToDataUrl(file) {
-  return new Promise((resolve, reject) => {
-    const r = new FileReader();
-    r.onload = () => resolve(String(r.result || ""));
-    r.onerror = () => reject(new Error("Failed to read image file."));
-    r.readAsDataURL(file);
-  });
+// Responses link thumbnails (/api/images/<hash>/thumb); large views want the full image.
+function fullImageUrl(data) {
+  const s = String(data || "");
+  return /^\/api\/images\/[0-9a-f]{64}\/thumb$/.test(s) ? s.slice(0, -"/thumb".length) : s;
 }
 
-async function fileToOptimizedDataUrl(file, { maxWidth = 1280, quality = 0.82 } = {}) {
-  const src = await fileToDataUrl(file);
+// Must match the server's IMAGE_MAX_BYTES; the server downsizes and re-encodes.
+const MAX_IMAGE_UPLOAD_BYTES = 20 * 1024 * 1024;
 
-  const img = await new Promise((resolve, reject) => {
-    const i = new Image();
-    i.onload = () => resolve(i);
-    i.onerror = () => reject(new Error("Failed to decode image."));
-    i.src = src;
+// Upload the file as the raw request body; returns a reference usable as image_data.
+async function uploadImage(file) {
+  if (file.size > MAX_IMAGE_UPLOAD_BYTES) {
+    throw new Error("Image is too large. Please pick an image under 20MB.");
+  }
+  const res = await api("/api/images", {
+    method: "POST",
+    body: file,
+    headers: { "Content-Type": file.type || "application/octet-stream" },
   });
-
-  const w = img.naturalWidth || img.width || 1;
-  const h = img.naturalHeight || img.height || 1;
-
-  const outW = Math.min(w, maxWidth);
-  const outH = Math.round(outW * (h / w));
-
-  const canvas = document.createElement("canvas");
-  canvas.width = outW;
-  canvas.height = outH;
-
-  const ctx = canvas.getContext("2d");
-  if (!ctx) return src;
-
-  ctx.drawImage(img, 0, 0, outW, outH);
-
-  return canvas.toDataURL("image/jpeg", quality);
+  return res.thumb_url;
 }
 
 function applyTemplateImage(data) {
@@ -814,6 +963,7 @@ function normalizeItemsTo11(items, kind) {
   for (const it of items || []) {
     if (isManualLike) {
       rows.push({
+        id: it.id ?? "",
         title: it.title ?? "",
         secret_text: it.secret_text ?? "",
         is_target: !!it.is_target,
@@ -821,6 +971,7 @@ function normalizeItemsTo11(items, kind) {
       });
     } else {
       rows.push({
+        id: it.id ?? "",
         title: it.title ?? "",
         rating: it.rating ?? "",
         image_data: it.image_data ?? "",
@@ -861,6 +1012,13 @@ function renderTemplateItemsForm(items, kind) {
     row.style.gridTemplateColumns =
       (kind === "rated") ? "1fr 140px 160px" : "1fr 1fr 44px 160px";
 
+    const itemId = document.createElement("input");
+    itemId.type = "hidden";
+    itemId.value = it.id ?? "";
+    itemId.dataset.idx = String(idx);
+    itemId.dataset.field = "id";
+    row.appendChild(itemId);
+
     const title = document.createElement("input");
     title.className = "input";
     title.placeholder = `Item ${idx + 1} title`;
@@ -930,15 +1088,8 @@ function renderTemplateItemsForm(items, kind) {
       try {
         if (!file.files || !file.files[0]) return;
 
-        const f = file.files[0];
-        const maxBytes = 2.5 * 1024 * 1024;
-        if (f.size > maxBytes) {
-          setEditorStatus("Image is too large. Please pick an image under ~2.5MB.");
-          return;
-        }
-
-        const dataUrl = await fileToOptimizedDataUrl(f);
-        imgHidden.value = String(dataUrl || "");
+        setEditorStatus("Uploading image...");
+        imgHidden.value = String((await uploadImage(file.files[0])) || "");
         if (imgHidden.value) thumb.src = detectDataUrl(imgHidden.value);
 
         setEditorStatus("");
@@ -963,6 +1114,7 @@ function readTemplateItemsFromForm(kind) {
   if (!container) return [];
 
   const rows = new Array(11).fill(0).map(() => ({
+    id: "",
     title: "",
     rating: "",
     secret_text: "",
@@ -997,16 +1149,17 @@ function readTemplateItemsFromForm(kind) {
 
     if (!hasAny) continue;
     if (!title) throw new Error("Each item must have a title.");
+    const id = r.id ? { id: r.id } : {};
 
     if (isManualLike) {
       const secret = String(r.secret_text || "").trim();
       if (!secret) throw new Error("Manual/carousel round: each item must have hidden info.");
-      items.push({ title, secret_text: secret, is_target: !!r.is_target, image_data });
+      items.push({ ...id, title, secret_text: secret, is_target: !!r.is_target, image_data });
     } else {
       const ratingRaw = String(r.rating || "").trim();
       const rating = Number(ratingRaw);
       if (!Number.isFinite(rating)) throw new Error("Rated round: each item must have a numeric rating.");
-      items.push({ title, rating, image_data });
+      items.push({ ...id, title, rating, image_data });
     }
   }
 
@@ -1021,6 +1174,7 @@ async function selectTemplate(id) {
   ensureTemplateKindControl();
 
   const tpl = await api(`/api/templates/${id}`);
+  editorTemplate = tpl;
   el("tplName").value = tpl.name || "";
   el("tplPrompt").value = tpl.prompt || "";
 
@@ -1034,6 +1188,7 @@ async function selectTemplate(id) {
 
 function clearEditorForm() {
   currentTemplateId = null;
+  editorTemplate = null;
   el("tplName").value = "";
   el("tplPrompt").value = "";
 
@@ -1048,6 +1203,35 @@ function clearEditorForm() {
   applyTemplateImage("");
 }
 
+// PATCH body with only what changed since `prev` (the template as loaded).
+function diffTemplate(prev, next) {
+  const same = (a, b) => String(a ?? "") === String(b ?? "");
+  const patch = { add: [], update: [], remove: [] };
+
+  for (const f of ["name", "prompt", "image_data"]) {
+    if (!same(prev[f], next[f])) patch[f] = next[f];
+  }
+
+  const before = new Map((prev.items || []).map((it) => [String(it.id), it]));
+  for (const it of next.items) {
+    const old = it.id ? before.get(String(it.id)) : null;
+    if (!old) {
+      const { id, ...fields } = it;
+      patch.add.push(fields);
+      continue;
+    }
+    before.delete(String(it.id));
+
+    const changes = {};
+    for (const f of ["title", "rating", "secret_text", "is_target", "image_data"]) {
+      if (f in it && !same(it[f], old[f])) changes[f] = it[f];
+    }
+    if (Object.keys(changes).length) patch.update.push({ id: it.id, ...changes });
+  }
+  patch.remove = [...before.keys()];
+  return patch;
+}
+
 async function saveTemplate() {
   setEditorStatus("");
   ensureTemplateKindControl();
@@ -1074,6 +1258,9 @@ async function saveTemplate() {
   if (!currentTemplateId) {
     const created = await api("/api/templates", { method: "POST", body: JSON.stringify(body) });
     currentTemplateId = created.id;
+  } else if (editorTemplate && editorTemplate.id === currentTemplateId && editorTemplate.kind === kind) {
+    const patch = diffTemplate(editorTemplate, body);
+    await api(`/api/templates/${currentTemplateId}`, { method: "PATCH", body: JSON.stringify(patch) });
   } else {
     await api(`/api/templates/${currentTemplateId}`, { method: "PUT", body: JSON.stringify(body) });
   }
@@ -1208,6 +1395,8 @@ function wireUI() {
     if (warn) warn.classList.add("hidden");
   });
 
+  on("goResumeGame", "click", resumeMatch);
+
   on("goNewGame", "click", async () => {
     el("team1Input").value = teamNames[1];
     el("team2Input").value = teamNames[2];
@@ -1254,15 +1443,8 @@ function wireUI() {
         applyTemplateImage("");
         return;
       }
-      const file = input.files[0];
-      const maxBytes = 2.5 * 1024 * 1024;
-      if (file.size > maxBytes) {
-        setEditorStatus("Image is too large. Please pick an image under ~2.5MB.");
-        applyTemplateImage("");
-        return;
-      }
-      const dataUrl = await fileToOptimizedDataUrl(file);
-      applyTemplateImage(dataUrl);
+      setEditorStatus("Uploading image...");
+      applyTemplateImage(await uploadImage(input.files[0]));
       setEditorStatus("");
     } catch (e) {
       setEditorStatus(String(e.message || e));
@@ -1451,7 +1633,7 @@ function renderCarousel(items) {
 
   track.innerHTML = carouselItems.map((it) => {
     const title = escapeHtml(it.title || "");
-    const img = detectDataUrl(it.image_data || "");
+    const img = detectDataUrl(fullImageUrl(it.image_data));
 
     const classes = [
       "carouselItem",